@@ -1,6 +1,6 @@
 {
     "name": "Project Notebook",
-    "version": "1.0.0",
+    "version": "1.0.2",
     "summary": "Project notebooks with data sources and run history",
     "description": """Interactive notebooks with multi-database data sources and scheduling, integrated under Project.""",
     "author": "In-house",
@@ -17,6 +17,7 @@
         "views/devops_data_source_views.xml",
         "views/res_config_settings_views.xml",
         "views/devops_training_views.xml",
+        "views/notebook_transfer_views.xml",
         "views/devops_menu.xml",
         "views/project_project_views.xml",
         "views/mail_mail_views.xml",
@@ -29,7 +30,13 @@
         "project_notebook/static/src/js/notebook_modal_resize.js",
         "project_notebook/static/src/js/view_type_alias.js",
         "project_notebook/static/src/js/error_dialog_clipboard_safe.js",
-        "project_notebook/static/src/js/notebook_toggle_inputs.js",
+        "project_notebook/static/src/js/result_grid.js",
+        "project_notebook/static/src/js/result_chart.js",
+        "project_notebook/static/src/js/notebook_cells.js",
+        "project_notebook/static/src/js/catalog.js",
+        "project_notebook/static/src/xml/notebook_cells.xml",
+        "project_notebook/static/src/xml/result_grid.xml",
+        "project_notebook/static/src/xml/catalog.xml",
     ],
 },
     "post_init_hook": "post_init_hook",
@@ -1,2 +1,3 @@
 from . import odoo_redirect
 from . import devops_mail_api
+from . import notebook_transfer
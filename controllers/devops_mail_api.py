@@ -1,190 +1,543 @@
 import base64
+import binascii
+import hashlib
 import json
+import math
+import threading
+import time
 
 from odoo import http, SUPERUSER_ID, registry as registry_get, api
 from odoo.http import request
 from odoo.tools import html_escape
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Upper bound of messages accepted by one /mail/api/send_batch call.
+MAX_BATCH_SIZE = 1000
+
+
+def _json_response(data, status=200, headers=None):
+    return http.Response(
+        json.dumps(data),
+        status=status,
+        headers=headers,
+        content_type="application/json",
+    )
+
+
+class _TokenBucketLimiter:
+    """In-process token buckets keyed by (db, token, client).
+
+    Each Odoo worker keeps its own buckets, so the effective limit is per
+    worker process; that is enough to stop one trigger from monopolizing it.
+    """
+
+    _MAX_KEYS = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, key, per_minute, burst):
+        """Take one token; return 0 when allowed, else seconds to wait."""
+        rate = per_minute / 60.0
+        capacity = max(burst, 1)
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                if len(self._buckets) > self._MAX_KEYS:
+                    self._prune(now, rate, capacity)
+                return 0
+            self._buckets[key] = (tokens, now)
+            return max(1, math.ceil((1 - tokens) / rate))
+
+    def _prune(self, now, rate, capacity):
+        # Drop buckets that have refilled completely; they hold no state.
+        for key, (tokens, stamp) in list(self._buckets.items()):
+            if tokens + (now - stamp) * rate >= capacity:
+                del self._buckets[key]
+
+
+_rate_limiter = _TokenBucketLimiter()
+
+
+class _PayloadTooLarge(Exception):
+    pass
+
+
+class _AttachmentStore:
+    """Store API attachments once per content within a request byte budget.
+
+    Uploads are hashed chunk by chunk so oversized files are rejected before
+    they are read into memory, and content already stored under the same
+    name is reused instead of being written to the filestore again.
+    """
+
+    _CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, env, max_bytes):
+        self.env = env
+        self.remaining = max_bytes or None
+
+    def _consume(self, size):
+        if self.remaining is None:
+            return
+        self.remaining -= size
+        if self.remaining < 0:
+            raise _PayloadTooLarge()
+
+    def from_base64(self, name, data):
+        """Return an attachment id for base64 ``data``, or None if invalid."""
+        try:
+            raw = base64.b64decode(data)
+        except (binascii.Error, ValueError):
+            return None
+        self._consume(len(raw))
+        return self._store(name, hashlib.sha1(raw).hexdigest(), lambda: raw)
+
+    def from_upload(self, storage):
+        """Return an attachment id for a multipart file upload."""
+        stream = storage.stream
+        stream.seek(0)
+        checksum = hashlib.sha1()
+        for chunk in iter(lambda: stream.read(self._CHUNK_SIZE), b""):
+            self._consume(len(chunk))
+            checksum.update(chunk)
+
+        def read():
+            stream.seek(0)
+            return stream.read()
+
+        return self._store(storage.filename, checksum.hexdigest(), read)
+
+    def _store(self, name, checksum, read):
+        # ir.attachment uses sha1 checksums too; only standalone API
+        # attachments are reused so record attachments keep their lifecycle.
+        Attachment = self.env["ir.attachment"]
+        existing = Attachment.search(
+            [
+                ("checksum", "=", checksum),
+                ("name", "=", name),
+                ("res_model", "=", False),
+                ("type", "=", "binary"),
+            ],
+            limit=1,
+        )
+        if existing:
+            return existing.id
+        return Attachment.create({"name": name, "raw": read()}).id
+
+
+def _normalize(value):
+    if not value:
+        return False
+    if isinstance(value, (list, tuple, set)):
+        return ",".join([str(v).strip() for v in value if v])
+    return str(value).replace(";", ",")
+
+
+def _to_int(val):
+    try:
+        return int(val)
+    except Exception:
+        return None
+
+
+def _to_bool(val):
+    if isinstance(val, str):
+        return val.strip().lower() in ("1", "true", "yes", "on")
+    return bool(val)
+
+
+def _to_ids(val):
+    """Accept ``[1, 2]``, ``"1,2"`` or a single id."""
+    if isinstance(val, (list, tuple)):
+        items = val
+    elif isinstance(val, str):
+        items = val.split(",")
+    else:
+        items = [val]
+    return [i for i in (_to_int(item) for item in items) if i]
 
 
 class DevOpsMailApiController(http.Controller):
     @http.route("/mail/api/ping", type="http", auth="none", csrf=False)
     def ping(self, **kwargs):
-        return http.Response(
-            json.dumps({"status": "ok"}),
-            status=200,
-            content_type="application/json",
-        )
+        return _json_response({"status": "ok"})
 
-    @http.route(
-        ["/mail/api/send_mail", "/odoo/mail/api/send_mail"],
-        type="http",  # allow plain HTTP/POST for pg_http, curl, etc.
-        auth="none",  # nodb route; we'll select db manually
-        methods=["POST"],
-        csrf=False,
-    )
-    def send_mail(self, **kwargs):
-        """Minimal mail API for pg_http或curl。
+    def _read_request(self, env, kwargs):
+        """Check the body size, parse it and authorize the call.
 
-        支持 application/json 请求；返回 JSON。
-        Body 示例：
-        {
-            "token": "...必填...",
-            "subject": "Hello",
-            "email_to": "a@x.com,b@y.com",
-            "email_cc": "...",
-            "email_bcc": "...",
-            "body_html": "<p>hi</p>",
-            "body": "hi text",
-            "attachments": [{"name": "file.txt", "data": "base64"}]
-        }
+        Returns ``(settings, payload, error_response)``. The size limit is
+        enforced before the body is read, so oversized uploads are never
+        buffered.
         """
-        # 解析 JSON 或表单参数
+        settings = env["mail.mail"]._devops_mail_api_settings()
+        limit = settings["max_payload_bytes"]
+        if limit:
+            if (request.httprequest.content_length or 0) > limit:
+                return settings, None, self._payload_too_large(settings)
+            # Bodies sent without Content-Length stop being read past the limit.
+            request.httprequest.max_content_length = limit
+        try:
+            payload = self._read_payload(kwargs)
+        except RequestEntityTooLarge:
+            return settings, None, self._payload_too_large(settings)
+        settings, error = self._authorize(env, payload)
+        return settings, payload, error
+
+    def _read_payload(self, kwargs):
+        """Parse the JSON body, falling back to form/query parameters."""
         payload = None
         try:
             if hasattr(request, "get_json_data"):
                 payload = request.get_json_data()
+        except RequestEntityTooLarge:
+            raise
         except Exception:
             payload = None
         if not payload and request.httprequest.data:
             try:
                 payload = json.loads(request.httprequest.data.decode("utf-8"))
+            except RequestEntityTooLarge:
+                raise
             except Exception:
                 payload = None
         if not payload:
-            payload = kwargs or {}
+            # multipart/form-data: files are read from request.httprequest.files
+            payload = {
+                key: value for key, value in kwargs.items()
+                if not isinstance(value, FileStorage)
+            }
+        return payload or {}
 
+    def _get_registry(self):
+        """Return ``(registry, error_response)`` for the ``db`` parameter."""
         db = request.params.get("db")
         if not db:
-            return http.Response(
-                json.dumps({"error": "missing db"}),
-                status=400,
-                content_type="application/json",
-            )
-
+            return None, _json_response({"error": "missing db"}, status=400)
         registry = registry_get(db)
         if registry is None:
-            return http.Response(
-                json.dumps({"error": "invalid db"}),
-                status=400,
-                content_type="application/json",
-            )
+            return None, _json_response({"error": "invalid db"}, status=400)
+        return registry, None
 
+    def _authorize(self, env, payload):
+        """Check token and rate limit; return ``(settings, error_response)``."""
+        settings = env["mail.mail"]._devops_mail_api_settings()
         token = payload.get("token")
-        with registry.cursor() as cr:
-            env = api.Environment(cr, SUPERUSER_ID, {})
-            expected = env["ir.config_parameter"].get_param("devops.mail_api_token") or "devops-mail-token"
-            sender_user_id = env["ir.config_parameter"].get_param("devops.mail_sender_user_id")
-            mail_server_param = env["ir.config_parameter"].get_param("devops.mail_server_id")
-        if not expected or token != expected:
-            return http.Response(
-                json.dumps({"error": "unauthorized"}),
-                status=403,
-                content_type="application/json",
+        if not settings["token"] or token != settings["token"]:
+            return settings, _json_response({"error": "unauthorized"}, status=403)
+        if settings["rate_per_minute"] > 0:
+            key = (env.cr.dbname, token, request.httprequest.remote_addr)
+            retry_after = _rate_limiter.consume(
+                key, settings["rate_per_minute"], settings["rate_burst"]
             )
+            if retry_after:
+                return settings, _json_response(
+                    {"error": "rate limit exceeded", "retry_after": retry_after},
+                    status=429,
+                    headers={"Retry-After": str(retry_after)},
+                )
+        return settings, None
 
-        subject = payload.get("subject")
-        email_to = payload.get("email_to")
-        if not subject or not email_to:
-            return http.Response(
-                json.dumps({"error": "subject and email_to are required"}),
-                status=400,
-                content_type="application/json",
-            )
+    def _payload_too_large(self, settings):
+        return _json_response(
+            {
+                "error": "payload too large",
+                "max_bytes": settings["max_payload_bytes"],
+            },
+            status=413,
+        )
 
-        def normalize(value):
-            if not value:
-                return False
-            if isinstance(value, (list, tuple, set)):
-                return ",".join([str(v).strip() for v in value if v])
-            return str(value).replace(";", ",")
+    def _default_mail_values(self, env, settings):
+        """Sender and outgoing server shared by every mail of one request."""
+        defaults = {}
+        if settings["sender_user_id"]:
+            sender_user = env["res.users"].browse(settings["sender_user_id"]).exists()
+            if sender_user and (sender_user.email_formatted or sender_user.email):
+                defaults["email_from"] = sender_user.email_formatted or sender_user.email
+        if settings["mail_server_id"]:
+            server = env["ir.mail_server"].browse(settings["mail_server_id"]).exists()
+            if server:
+                defaults["mail_server_id"] = server.id
+        return defaults
 
-        def to_int(val):
-            try:
-                return int(val)
-            except Exception:
-                return None
+    def _prepare_mail_vals(self, message, defaults, store, uploads=()):
+        """Return ``(vals, error)`` for one API message.
 
-        attachments_vals = []
-        for att in payload.get("attachments") or []:
-            name = att.get("name")
-            data = att.get("data")
-            if not name or not data:
-                continue
-            try:
-                base64.b64decode(data)
-            except Exception:
+        Raises ``_PayloadTooLarge`` once the attachments exceed the budget
+        of ``store``.
+        """
+        subject = message.get("subject")
+        email_to = message.get("email_to")
+        if not subject or not email_to:
+            return None, "subject and email_to are required"
+
+        attachment_ids = []
+        attachments = message.get("attachments") or []
+        for att in attachments if isinstance(attachments, list) else []:
+            name = isinstance(att, dict) and att.get("name")
+            data = name and att.get("data")
+            if not data:
                 continue
-            attachments_vals.append((0, 0, {"name": name, "datas": data}))
+            attachment_id = store.from_base64(name, data)
+            if attachment_id:
+                attachment_ids.append(attachment_id)
+        for upload in uploads:
+            if upload.filename:
+                attachment_ids.append(store.from_upload(upload))
 
         vals = {
             "subject": subject,
-            "email_to": normalize(email_to),
-            "email_cc": normalize(payload.get("email_cc")),
-            "body_html": payload.get("body_html")
-            or (payload.get("body") and html_escape(payload.get("body")))
+            "email_to": _normalize(email_to),
+            "email_cc": _normalize(message.get("email_cc")),
+            "body_html": message.get("body_html")
+            or (message.get("body") and html_escape(message.get("body")))
             or "",
-            "body": payload.get("body") or "",
+            "body": message.get("body") or "",
+            # Keep delivered mails so callers can poll /mail/api/status.
+            "auto_delete": False,
         }
-        email_from = payload.get("email_from")
-        sender_user_email = False
-        if sender_user_id:
-            try:
-                sender_user = env["res.users"].browse(int(sender_user_id)).exists()
-                if sender_user:
-                    sender_user_email = sender_user.email_formatted or sender_user.email
-            except Exception:
-                sender_user_email = False
-        email_from = email_from or sender_user_email
-        if email_from:
-            vals["email_from"] = email_from
-        if attachments_vals:
-            vals["attachment_ids"] = attachments_vals
-        notebook_id = to_int(payload.get("notebook_id"))
-        run_id = to_int(payload.get("run_id"))
+        for key, value in defaults.items():
+            vals.setdefault(key, value)
+        if message.get("email_from"):
+            vals["email_from"] = message["email_from"]
+        if attachment_ids:
+            vals["attachment_ids"] = [(6, 0, list(dict.fromkeys(attachment_ids)))]
+        notebook_id = _to_int(message.get("notebook_id"))
         if notebook_id:
             vals["model"] = "devops.notebook"
             vals["res_id"] = notebook_id
+        return vals, None
 
-        with registry.cursor() as cr:
-            env = api.Environment(cr, SUPERUSER_ID, {})
-            server_id = False
-            if mail_server_param:
-                try:
-                    server_id = int(mail_server_param)
-                except Exception:
-                    server_id = False
-                if server_id:
-                    server = env["ir.mail_server"].browse(server_id).exists()
-                    if not server:
-                        server_id = False
-            if server_id:
-                vals["mail_server_id"] = server_id
-            mail = env["mail.mail"].create(vals)
-            # 关联运行/笔记本并记录到 chatter
+    def _link_mails(self, env, mails, messages):
+        """Attach mails to their runs; return the mails grouped by notebook id."""
+        by_notebook = {}
+        for mail, message in zip(mails, messages):
+            notebook_id = _to_int(message.get("notebook_id"))
+            run_id = _to_int(message.get("run_id"))
             if run_id:
-                run = env["devops.notebook.run"].browse(run_id)
+                run = env["devops.notebook.run"].browse(run_id).exists()
                 if run:
-                    mail.devops_run_ids = [(4, run.id)]
+                    run.mail_ids = [(4, mail.id)]
                     notebook_id = notebook_id or run.notebook_id.id
             if notebook_id:
-                notebook = env["devops.notebook"].browse(notebook_id)
-                if notebook:
-                    recipients = vals.get("email_to") or ""
-                    if vals.get("email_cc"):
-                        recipients = ",".join([recipients, vals["email_cc"]]) if recipients else vals["email_cc"]
-                    notebook.message_post(
-                        body=(
-                            "<p><b>邮件已发送</b></p>"
-                            f"<p>主题：{html_escape(subject)}</p>"
-                            f"<p>收件人：{html_escape(recipients or '')}</p>"
-                        ),
-                        attachment_ids=mail.attachment_ids.ids,
-                        message_type="comment",
-                        subtype_xmlid="mail.mt_note",
-                    )
-            mail.send()
-        return http.Response(
-            json.dumps({"status": "sent", "mail_id": mail.id}),
-            status=200,
-            content_type="application/json",
+                by_notebook.setdefault(notebook_id, env["mail.mail"])
+                by_notebook[notebook_id] |= mail
+        return by_notebook
+
+    def _post_on_notebooks(self, env, by_notebook, title):
+        for notebook_id, mails in by_notebook.items():
+            notebook = env["devops.notebook"].browse(notebook_id).exists()
+            if not notebook:
+                continue
+            lines = []
+            for mail in mails:
+                recipients = ",".join(filter(None, [mail.email_to, mail.email_cc]))
+                lines.append(
+                    f"<p>主题：{html_escape(mail.subject or '')}</p>"
+                    f"<p>收件人：{html_escape(recipients)}</p>"
+                )
+            notebook.message_post(
+                body=f"<p><b>{title}</b></p>" + "".join(lines),
+                attachment_ids=mails.attachment_ids.ids,
+                message_type="comment",
+                subtype_xmlid="mail.mt_note",
+            )
+
+    def _queue_delivery(self, env):
+        """Let the mail queue cron pick up new mails right after commit."""
+        cron = env.ref("mail.ir_cron_mail_scheduler_action", raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @http.route(
+        ["/mail/api/send_mail", "/odoo/mail/api/send_mail"],
+        type="http",  # allow plain HTTP/POST for pg_http, curl, etc.
+        auth="none",  # nodb route; we'll select db manually
+        methods=["POST"],
+        csrf=False,
+    )
+    def send_mail(self, **kwargs):
+        """Minimal mail API for pg_http或curl。
+
+        支持 application/json 与 multipart/form-data 请求；返回 JSON。
+        JSON Body 示例：
+        {
+            "token": "...必填...",
+            "subject": "Hello",
+            "email_to": "a@x.com,b@y.com",
+            "email_cc": "...",
+            "email_bcc": "...",
+            "body_html": "<p>hi</p>",
+            "body": "hi text",
+            "attachments": [{"name": "file.txt", "data": "base64"}],
+            "sync": false
+        }
+        multipart/form-data 时字段同上（db 放在 URL 查询参数中），附件以文件
+        字段上传，流式写入文件存储；附件按内容校验和去重，请求体与附件总大小
+        超过设置上限时返回 413。
+        默认异步：只落库并交给邮件队列，返回 202 与 mail_id，可通过
+        /mail/api/status 查询投递状态；传 "sync": true 则保持原有的同步发送，
+        发送完成后返回 200。
+        """
+        registry, error = self._get_registry()
+        if error:
+            return error
+
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            settings, payload, error = self._read_request(env, kwargs)
+            if error:
+                return error
+            sync = _to_bool(payload.get("sync"))
+            store = _AttachmentStore(env, settings["max_payload_bytes"])
+            uploads = [
+                upload
+                for files in request.httprequest.files.listvalues()
+                for upload in files
+            ]
+            try:
+                vals, error = self._prepare_mail_vals(
+                    payload, self._default_mail_values(env, settings), store, uploads
+                )
+            except _PayloadTooLarge:
+                cr.rollback()
+                return self._payload_too_large(settings)
+            if error:
+                return _json_response({"error": error}, status=400)
+            mail = env["mail.mail"].create(vals)
+            # 关联运行/笔记本并记录到 chatter
+            by_notebook = self._link_mails(env, mail, [payload])
+            self._post_on_notebooks(env, by_notebook, "邮件已发送" if sync else "邮件已排队发送")
+            if sync:
+                mail.send()
+                state = mail.state
+            else:
+                self._queue_delivery(env)
+        if not sync:
+            return _json_response({"status": "queued", "mail_id": mail.id}, status=202)
+        return _json_response({"status": "sent", "mail_id": mail.id, "state": state})
+
+    @http.route(
+        ["/mail/api/status", "/odoo/mail/api/status"],
+        type="http",
+        auth="none",
+        methods=["GET", "POST"],
+        csrf=False,
+    )
+    def mail_status(self, **kwargs):
+        """查询邮件投递状态：token 必填，ids 为 id 列表或逗号分隔字符串。
+
+        返回 {"mails": [{"id": 12, "state": "sent", "failure_reason": false}, ...]}，
+        不存在的 id 返回 state "not_found"。
+        """
+        registry, error = self._get_registry()
+        if error:
+            return error
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            settings, payload, error = self._read_request(env, kwargs)
+            if error:
+                return error
+            ids = _to_ids(payload.get("ids") or payload.get("id") or [])
+            if not ids:
+                return _json_response({"error": "ids are required"}, status=400)
+            if len(ids) > MAX_BATCH_SIZE:
+                return _json_response(
+                    {"error": f"at most {MAX_BATCH_SIZE} ids per request"}, status=413
+                )
+            found = {
+                mail["id"]: mail
+                for mail in env["mail.mail"].browse(ids).exists().read(
+                    ["state", "failure_type", "failure_reason"]
+                )
+            }
+        mails = []
+        for mail_id in ids:
+            mail = found.get(mail_id)
+            if not mail:
+                mails.append({"id": mail_id, "state": "not_found"})
+                continue
+            mails.append(
+                {
+                    "id": mail_id,
+                    "state": mail["state"],
+                    "failure_type": mail["failure_type"],
+                    "failure_reason": mail["failure_reason"],
+                }
+            )
+        return _json_response({"mails": mails})
+
+    @http.route(
+        ["/mail/api/send_batch", "/odoo/mail/api/send_batch"],
+        type="http",
+        auth="none",
+        methods=["POST"],
+        csrf=False,
+    )
+    def send_batch(self, **kwargs):
+        """批量邮件接口：一次校验 token，单事务批量创建并交给邮件队列发送。
+
+        Body 示例：
+        {
+            "token": "...必填...",
+            "messages": [
+                {"subject": "A", "email_to": "a@x.com", "body": "..."},
+                {"subject": "B", "email_to": "b@y.com", "notebook_id": 3}
+            ]
+        }
+        返回 202，results 与 messages 一一对应：{"index": 0, "mail_id": 12} 或
+        {"index": 1, "error": "..."}。
+        """
+        registry, error = self._get_registry()
+        if error:
+            return error
+
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            settings, payload, error = self._read_request(env, kwargs)
+            if error:
+                return error
+            messages = payload.get("messages")
+            if not isinstance(messages, list) or not messages:
+                return _json_response(
+                    {"error": "messages must be a non-empty list"}, status=400
+                )
+            if len(messages) > MAX_BATCH_SIZE:
+                return _json_response(
+                    {"error": f"at most {MAX_BATCH_SIZE} messages per batch"}, status=413
+                )
+            defaults = self._default_mail_values(env, settings)
+            store = _AttachmentStore(env, settings["max_payload_bytes"])
+
+            results = [None] * len(messages)
+            vals_list, accepted = [], []
+            for index, message in enumerate(messages):
+                if not isinstance(message, dict):
+                    results[index] = {"index": index, "error": "message must be an object"}
+                    continue
+                try:
+                    vals, error = self._prepare_mail_vals(message, defaults, store)
+                except _PayloadTooLarge:
+                    cr.rollback()
+                    return self._payload_too_large(settings)
+                if error:
+                    results[index] = {"index": index, "error": error}
+                    continue
+                vals_list.append(vals)
+                accepted.append(index)
+            mails = env["mail.mail"].create(vals_list)
+            for index, mail in zip(accepted, mails):
+                results[index] = {"index": index, "mail_id": mail.id}
+            by_notebook = self._link_mails(env, mails, [messages[i] for i in accepted])
+            self._post_on_notebooks(env, by_notebook, "邮件已排队发送")
+            if mails:
+                self._queue_delivery(env)
+        return _json_response(
+            {"status": "queued", "queued": len(accepted), "results": results},
+            status=202,
         )
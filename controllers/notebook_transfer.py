@@ -0,0 +1,40 @@
+import tempfile
+
+from werkzeug.wsgi import wrap_file
+
+from odoo import http
+from odoo.http import content_disposition, request
+
+from odoo.addons.project_notebook.wizard.notebook_transfer import NotebookArchiveWriter
+
+
+class NotebookTransferController(http.Controller):
+    @http.route("/devops/notebooks/export", type="http", auth="user", methods=["GET"])
+    def export_notebooks(self, ids="", outputs=None, filename=None, **kwargs):
+        """Download the given notebooks as one zip archive.
+
+        The archive is written to a temporary file cell batch by cell batch
+        and streamed from there, so memory use does not depend on how many
+        notebooks are exported.
+        """
+        notebook_ids = [int(i) for i in ids.split(",") if i.strip().isdigit()]
+        notebooks = request.env["devops.notebook"].search([("id", "in", notebook_ids)])
+        if not notebooks:
+            return request.not_found()
+        fileobj = tempfile.TemporaryFile()
+        writer = NotebookArchiveWriter(fileobj, "zip", include_outputs=outputs == "1")
+        for notebook in notebooks:
+            writer.add(notebook)
+        writer.close()
+        size = fileobj.tell()
+        fileobj.seek(0)
+        headers = [
+            ("Content-Type", "application/zip"),
+            ("Content-Length", str(size)),
+            ("Content-Disposition", content_disposition(filename or "notebooks.zip")),
+        ]
+        return http.Response(
+            wrap_file(request.httprequest.environ, fileobj),
+            headers=headers,
+            direct_passthrough=True,
+        )
@@ -0,0 +1,20 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Dispatcher crons are now woken by triggers; keep only a daily poll."""
+    cr.execute(
+        """
+        UPDATE ir_cron
+           SET interval_number = 1, interval_type = 'days'
+         WHERE id IN (
+                SELECT res_id
+                  FROM ir_model_data
+                 WHERE module = 'project_notebook'
+                   AND model = 'ir.cron'
+                   AND name = 'ir_cron_devops_notebook_schedule'
+         )
+        """
+    )
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["devops.notebook.schedule"]._arm_dispatchers()
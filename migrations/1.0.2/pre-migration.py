@@ -0,0 +1,14 @@
+def migrate(cr, version):
+    """Create and backfill mail_mail.notebook_id before the ORM sees the
+    new stored field, so it is not recomputed mail by mail on upgrade."""
+    cr.execute("ALTER TABLE mail_mail ADD COLUMN IF NOT EXISTS notebook_id integer")
+    cr.execute(
+        """
+        UPDATE mail_mail mail
+           SET notebook_id = msg.res_id
+          FROM mail_message msg
+          JOIN devops_notebook notebook ON notebook.id = msg.res_id
+         WHERE mail.mail_message_id = msg.id
+           AND msg.model = 'devops.notebook'
+        """
+    )
@@ -1,6 +1,9 @@
 from . import devops_notebook
 from . import devops_training
 from . import devops_data_source
+from . import devops_data_source_catalog
+from . import devops_data_source_health
 from . import res_config_settings
 from . import project_project
 from . import mail_mail
+from . import devops_notebook_run_daily
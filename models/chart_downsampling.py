@@ -0,0 +1,54 @@
+"""Downsampling of chart series before they are sent to the browser.
+
+Points are ``(x, y)`` tuples with numeric coordinates, ordered by ``x``.
+``lttb`` (Largest-Triangle-Three-Buckets) keeps the visual shape of line
+series; ``minmax`` keeps the extremes of each bucket, which suits bars and
+scatter plots where spikes must not disappear.
+"""
+
+
+def lttb(points, threshold):
+    """Return at most ``threshold`` points chosen with LTTB."""
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        # Average of the next bucket is the third corner of the triangle.
+        avg_start = int((bucket + 1) * bucket_size) + 1
+        avg_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        span = avg_end - avg_start
+        avg_x = sum(point[0] for point in points[avg_start:avg_end]) / span
+        avg_y = sum(point[1] for point in points[avg_start:avg_end]) / span
+
+        prev_x, prev_y = points[previous]
+        best, best_area = avg_start - 1, -1.0
+        for index in range(int(bucket * bucket_size) + 1, int((bucket + 1) * bucket_size) + 1):
+            x, y = points[index]
+            area = abs((prev_x - avg_x) * (y - prev_y) - (prev_x - x) * (avg_y - prev_y))
+            if area > best_area:
+                best, best_area = index, area
+        sampled.append(points[best])
+        previous = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax(points, threshold):
+    """Return at most ``threshold`` points: the min and max of each bucket."""
+    count = len(points)
+    if threshold >= count or threshold < 2:
+        return list(points)
+    buckets = threshold // 2
+    bucket_size = count / buckets
+    sampled = []
+    for bucket in range(buckets):
+        start, end = int(bucket * bucket_size), int((bucket + 1) * bucket_size)
+        if start >= end:
+            continue
+        low = min(range(start, end), key=lambda index: points[index][1])
+        high = max(range(start, end), key=lambda index: points[index][1])
+        sampled.extend(points[index] for index in sorted({low, high}))
+    return sampled
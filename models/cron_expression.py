@@ -0,0 +1,107 @@
+"""Minimal 5-field cron expression support for notebook schedules.
+
+Fields are ``minute hour day-of-month month day-of-week`` with the usual
+``*``, ``a-b``, ``*/n``, ``a-b/n`` and comma lists, month/day names and the
+``@hourly``/``@daily``/``@weekly``/``@monthly``/``@yearly`` shortcuts.
+As in Vixie cron, when both day fields are restricted a day matches if
+either of them does. Times are naive wall-clock times; timezone handling
+is left to the caller.
+"""
+from datetime import datetime, timedelta
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_DAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+# (low, high, names offset by low) per field
+_FIELDS = [
+    (0, 59, None),
+    (0, 23, None),
+    (1, 31, None),
+    (1, 12, _MONTHS),
+    (0, 7, _DAYS),
+]
+# Give up if nothing matches within this many years (e.g. "0 0 30 2 *").
+_SEARCH_YEARS = 5
+
+
+class CronExpression:
+    def __init__(self, expression):
+        text = (expression or "").strip().lower()
+        text = _MACROS.get(text, text)
+        parts = text.split()
+        if len(parts) != 5:
+            raise ValueError("A cron expression needs 5 fields: minute hour day month weekday.")
+        sets = [
+            self._parse_field(part, low, high, names)
+            for part, (low, high, names) in zip(parts, _FIELDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = sets
+        # cron uses 0 and 7 for Sunday; datetime.weekday() uses 0 for Monday.
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_value(token, low, names):
+        if names and token in names:
+            return names.index(token) + low
+        return int(token)
+
+    def _parse_field(self, text, low, high, names):
+        values = set()
+        for chunk in text.split(","):
+            step = 1
+            if "/" in chunk:
+                chunk, step_text = chunk.split("/", 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ValueError("Invalid cron step: %s" % step_text)
+            if chunk == "*":
+                start, end = low, high
+            elif "-" in chunk:
+                start_text, end_text = chunk.split("-", 1)
+                start = self._parse_value(start_text, low, names)
+                end = self._parse_value(end_text, low, names)
+            else:
+                start = self._parse_value(chunk, low, names)
+                end = high if step > 1 else start
+            if not (low <= start <= high and low <= end <= high) or start > end:
+                raise ValueError("Cron value out of range: %s" % chunk)
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt):
+        in_days = dt.day in self.days
+        in_weekdays = dt.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, dt):
+        """Return the first matching minute strictly after the naive datetime ``dt``."""
+        current = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = datetime(current.year + _SEARCH_YEARS, 1, 1)
+        while current < limit:
+            if current.month not in self.months:
+                year, month = divmod(current.month, 12)
+                current = datetime(current.year + year, month + 1, 1)
+                continue
+            if not self._day_matches(current):
+                current = datetime(current.year, current.month, current.day) + timedelta(days=1)
+                continue
+            if current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+                continue
+            if current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+                continue
+            return current
+        raise ValueError("Cron expression never matches.")
@@ -0,0 +1,643 @@
+"""Database drivers behind ``devops.data.source``.
+
+Each backend implements one small interface over plain parameter dicts
+(``host``, ``port``, ``database``, ``schema``, ``username``, ``password``,
+``dsn``, ``csv_path``): connect, execute with params, batched fetch,
+cancel, explain, type mapping and a version probe. Client libraries are
+imported when a source of that type is first used, so a missing optional
+driver only breaks its own sources.
+
+Connections of network backends are pooled per process and parameter set
+(Oracle uses python-oracledb session pools), and endpoint health/load is
+tracked per process for replica routing.
+"""
+import contextlib
+import csv
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+_DRIVERS = {}
+
+
+class SourceUnavailable(ConnectionError):
+    """The source is known to be down; raised instead of waiting on a connect."""
+
+
+def register_driver(cls):
+    _DRIVERS[cls.source_type] = cls()
+    return cls
+
+
+def get_driver(source_type):
+    try:
+        return _DRIVERS[source_type]
+    except KeyError:
+        raise ValueError("Data source type %s not supported yet." % source_type) from None
+
+
+class _ConnectionPool:
+    """Idle connections per (source type, parameters), reused for a while."""
+
+    def __init__(self, max_idle=4, idle_seconds=300):
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._idle = defaultdict(list)
+
+    def acquire(self, key):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle[key]
+            while idle:
+                conn, since = idle.pop()
+                if now - since < self.idle_seconds:
+                    return conn
+                _close_quietly(conn)
+        return None
+
+    def release(self, key, conn):
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle:
+                idle.append((conn, time.monotonic()))
+                return
+        _close_quietly(conn)
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pool = _ConnectionPool()
+
+
+class _EndpointHealth:
+    """Process-wide health and in-flight load of data source endpoints.
+
+    Endpoints are keyed by ``(source_type, host, port)``. A failed endpoint
+    is considered down until its cooldown expires.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._down_until = {}
+        self._in_flight = defaultdict(int)
+
+    def is_up(self, key):
+        return self._down_until.get(key, 0) <= time.monotonic()
+
+    def mark_down(self, key, cooldown):
+        with self._lock:
+            self._down_until[key] = time.monotonic() + cooldown
+
+    def mark_up(self, key):
+        with self._lock:
+            self._down_until.pop(key, None)
+
+    def load(self, key):
+        return self._in_flight[key]
+
+    @contextlib.contextmanager
+    def track(self, key):
+        with self._lock:
+            self._in_flight[key] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight[key] -= 1
+
+
+endpoint_health = _EndpointHealth()
+
+_SQL_NOISE = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'", re.S)
+_READ_START = re.compile(r"^\s*(select|with|show|explain|values|describe|desc|table)\b", re.I)
+_WRITE_WORDS = re.compile(
+    r"\b(insert|update|delete|merge|upsert|create|alter|drop|truncate|grant|revoke|"
+    r"call|exec|execute|into|lock|nextval|setval)\b",
+    re.I,
+)
+
+
+def strip_sql_noise(query):
+    """Blank out comments and string literals of ``query``, keeping offsets."""
+    return _SQL_NOISE.sub(lambda match: " " * len(match.group()), query or "")
+
+
+def is_read_only(query):
+    """Conservatively tell whether ``query`` only reads data."""
+    text = strip_sql_noise(query)
+    return bool(_READ_START.match(text)) and not _WRITE_WORDS.search(text)
+
+
+class Driver:
+    source_type = None
+    #: Whether connections may be kept in the process pool.
+    pooled = True
+    #: Catalog queries: tables, columns, indexes (see devops_data_source_catalog).
+    catalog_queries = None
+
+    def connect(self, params):
+        raise NotImplementedError
+
+    def acquire(self, params):
+        key = (self.source_type, tuple(sorted(params.items())))
+        conn = _pool.acquire(key) if self.pooled else None
+        return key, conn or self.connect(params)
+
+    def release(self, key, conn, broken=False):
+        """Return a connection to the pool, or close it if it failed."""
+        if broken or not self.pooled:
+            _close_quietly(conn)
+            return
+        try:
+            conn.rollback()
+        except Exception:
+            _close_quietly(conn)
+            return
+        _pool.release(key, conn)
+
+    def execute(self, cursor, query, params=None):
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+
+    def fetch_batches(self, cursor, size=1000):
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+
+    def cancel(self, params, conn, cursor):
+        """Abort the statement running on ``cursor``; called from another thread."""
+        conn.cancel()
+
+    def explain(self, cursor, query):
+        """Return the plan of ``query`` as text lines."""
+        self.execute(cursor, "EXPLAIN " + query)
+        return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+
+    def column_type(self, type_code):
+        """Map a DB-API ``type_code`` to a result column type, if known."""
+        return None
+
+    def version(self, conn):
+        raise NotImplementedError
+
+    def catalog_params(self, params):
+        return None
+
+    def _scalar(self, conn, query):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+
+@register_driver
+class PostgresDriver(Driver):
+    source_type = "postgresql"
+    _NUMBER_OIDS = {20, 21, 23, 26, 700, 701, 1700}
+    _DATETIME_OIDS = {1082, 1083, 1114, 1184}
+    catalog_queries = (
+        """
+        SELECT n.nspname, c.relname,
+               CASE WHEN c.relkind IN ('v', 'm') THEN 'view' ELSE 'table' END,
+               GREATEST(c.reltuples, 0)::bigint
+          FROM pg_class c
+          JOIN pg_namespace n ON n.oid = c.relnamespace
+         WHERE c.relkind IN ('r', 'p', 'v', 'm')
+           AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+           AND n.nspname NOT LIKE 'pg_toast%%'
+        """,
+        """
+        SELECT table_schema, table_name, column_name, data_type,
+               is_nullable = 'YES', ordinal_position
+          FROM information_schema.columns
+         WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
+        """,
+        """
+        SELECT schemaname, tablename, indexname, indexdef
+          FROM pg_indexes
+         WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
+        """,
+    )
+
+    def connect(self, params):
+        import psycopg2
+
+        if params.get("connect_timeout"):
+            return psycopg2.connect(params["dsn"], connect_timeout=params["connect_timeout"])
+        return psycopg2.connect(params["dsn"])
+
+    def column_type(self, type_code):
+        if type_code == 16:
+            return "boolean"
+        if type_code in self._NUMBER_OIDS:
+            return "number"
+        if type_code in self._DATETIME_OIDS:
+            return "datetime"
+        return "string"
+
+    def version(self, conn):
+        return self._scalar(conn, "SELECT version()")
+
+
+@register_driver
+class OracleDriver(Driver):
+    source_type = "oracle"
+    catalog_queries = (
+        """
+        SELECT owner, table_name, 'table', NVL(num_rows, 0) FROM all_tables WHERE owner = :owner
+        UNION ALL
+        SELECT owner, view_name, 'view', 0 FROM all_views WHERE owner = :owner
+        """,
+        """
+        SELECT owner, table_name, column_name, data_type,
+               CASE nullable WHEN 'Y' THEN 1 ELSE 0 END, column_id
+          FROM all_tab_columns
+         WHERE owner = :owner
+        """,
+        """
+        SELECT table_owner, table_name, index_name, index_type
+          FROM all_indexes
+         WHERE table_owner = :owner
+        """,
+    )
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._module = None
+        self._pools = {}
+        #: "thin" or "thick" once the client library is loaded.
+        self.mode = None
+        self.settings = {
+            "lib_dir": os.environ.get("ORACLE_CLIENT", "/opt/oracle/instantclient"),
+            "stmtcachesize": None,
+            "pool_min": 1,
+            "pool_max": 8,
+            "pool_wait_ms": 30000,
+        }
+
+    def configure(self, **settings):
+        """Update client settings; ``lib_dir`` and ``stmtcachesize`` only apply before ``load``."""
+        with self._lock:
+            self.settings.update(
+                (name, value) for name, value in settings.items() if value not in (None, "", False)
+            )
+
+    def load(self):
+        """python-oracledb, initialised once per process.
+
+        Thick mode is enabled when an Oracle Client is found in ``lib_dir``;
+        the first call decides the mode for the lifetime of the process.
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = self._init_client()
+        return self._module
+
+    def _init_client(self):
+        import oracledb
+
+        lib_dir = self.settings["lib_dir"]
+        if lib_dir and os.path.isdir(lib_dir) and oracledb.is_thin_mode():
+            try:
+                oracledb.init_oracle_client(lib_dir=lib_dir)
+            except oracledb.Error:
+                # Unusable client libraries: stay in thin mode.
+                pass
+        if self.settings["stmtcachesize"]:
+            oracledb.defaults.stmtcachesize = int(self.settings["stmtcachesize"])
+        self.mode = "thin" if oracledb.is_thin_mode() else "thick"
+        return oracledb
+
+    def make_dsn(self, params):
+        return self.load().makedsn(
+            params.get("host") or "localhost",
+            int(params.get("port") or 1521),
+            service_name=params.get("database") or None,
+        )
+
+    def connect(self, params):
+        extra = {}
+        if params.get("connect_timeout"):
+            extra["tcp_connect_timeout"] = params["connect_timeout"]
+        return self.load().connect(
+            user=params.get("username") or "",
+            password=params.get("password") or "",
+            dsn=self.make_dsn(params),
+            **extra,
+        )
+
+    def session_pool(self, params):
+        """The process-wide session pool for ``params``, created on first use."""
+        key = tuple(sorted(params.items()))
+        pool = self._pools.get(key)
+        if pool is None:
+            oracledb = self.load()
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = oracledb.create_pool(
+                        user=params.get("username") or "",
+                        password=params.get("password") or "",
+                        dsn=self.make_dsn(params),
+                        min=int(self.settings["pool_min"]),
+                        max=int(self.settings["pool_max"]),
+                        increment=1,
+                        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                        wait_timeout=int(self.settings["pool_wait_ms"]),
+                    )
+                    self._pools[key] = pool
+        return pool
+
+    def acquire(self, params):
+        pool = self.session_pool(params)
+        return pool, pool.acquire()
+
+    def release(self, key, conn, broken=False):
+        """Give the session back to its pool, dropping it if it failed."""
+        try:
+            if broken:
+                key.drop(conn)
+            else:
+                key.release(conn)
+        except Exception:
+            _close_quietly(conn)
+
+    def explain(self, cursor, query):
+        cursor.execute("EXPLAIN PLAN FOR " + query)
+        cursor.execute("SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY())")
+        return [row[0] for row in cursor.fetchall()]
+
+    def column_type(self, type_code):
+        name = getattr(type_code, "name", "")
+        if name in ("DB_TYPE_NUMBER", "DB_TYPE_BINARY_DOUBLE", "DB_TYPE_BINARY_FLOAT",
+                    "DB_TYPE_BINARY_INTEGER"):
+            return "number"
+        if name.startswith(("DB_TYPE_DATE", "DB_TYPE_TIMESTAMP")):
+            return "datetime"
+        if name == "DB_TYPE_BOOLEAN":
+            return "boolean"
+        return "string"
+
+    def version(self, conn):
+        return conn.version or "driver ready"
+
+    def catalog_params(self, params):
+        return {"owner": (params.get("schema") or params.get("username") or "").upper()}
+
+
+@register_driver
+class MSSQLDriver(Driver):
+    source_type = "mssql"
+    catalog_queries = (
+        """
+        SELECT s.name, o.name, CASE WHEN o.type = 'V' THEN 'view' ELSE 'table' END,
+               COALESCE(SUM(p.rows), 0)
+          FROM sys.objects o
+          JOIN sys.schemas s ON s.schema_id = o.schema_id
+          LEFT JOIN sys.partitions p ON p.object_id = o.object_id AND p.index_id IN (0, 1)
+         WHERE o.type IN ('U', 'V')
+         GROUP BY s.name, o.name, o.type
+        """,
+        """
+        SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE,
+               CASE WHEN IS_NULLABLE = 'YES' THEN 1 ELSE 0 END, ORDINAL_POSITION
+          FROM INFORMATION_SCHEMA.COLUMNS
+        """,
+        """
+        SELECT s.name, t.name, i.name, i.type_desc
+          FROM sys.indexes i
+          JOIN sys.tables t ON t.object_id = i.object_id
+          JOIN sys.schemas s ON s.schema_id = t.schema_id
+         WHERE i.name IS NOT NULL
+        """,
+    )
+
+    def connect(self, params):
+        import pyodbc
+
+        return pyodbc.connect(params["dsn"], timeout=params.get("connect_timeout") or 5)
+
+    def cancel(self, params, conn, cursor):
+        cursor.cancel()
+
+    def explain(self, cursor, query):
+        cursor.execute("SET SHOWPLAN_TEXT ON")
+        try:
+            cursor.execute(query)
+            lines = []
+            while True:
+                lines += [row[0] for row in cursor.fetchall()]
+                if not cursor.nextset():
+                    return lines
+        finally:
+            cursor.execute("SET SHOWPLAN_TEXT OFF")
+
+    def column_type(self, type_code):
+        if type_code is bool:
+            return "boolean"
+        if type_code in (int, float, Decimal):
+            return "number"
+        if type_code in (date, datetime, dt_time):
+            return "datetime"
+        return "string"
+
+    def version(self, conn):
+        return self._scalar(conn, "SELECT @@VERSION")
+
+
+@register_driver
+class MySQLDriver(Driver):
+    source_type = "mysql"
+    # pymysql FIELD_TYPE codes
+    _NUMBER_TYPES = {0, 1, 2, 3, 4, 5, 8, 9, 13, 246}
+    _DATETIME_TYPES = {7, 10, 11, 12}
+    catalog_queries = (
+        """
+        SELECT table_schema, table_name,
+               CASE table_type WHEN 'VIEW' THEN 'view' ELSE 'table' END,
+               COALESCE(table_rows, 0)
+          FROM information_schema.tables
+         WHERE table_schema = DATABASE()
+        """,
+        """
+        SELECT table_schema, table_name, column_name, data_type,
+               is_nullable = 'YES', ordinal_position
+          FROM information_schema.columns
+         WHERE table_schema = DATABASE()
+        """,
+        """
+        SELECT table_schema, table_name, index_name,
+               GROUP_CONCAT(column_name ORDER BY seq_in_index)
+          FROM information_schema.statistics
+         WHERE table_schema = DATABASE()
+         GROUP BY table_schema, table_name, index_name
+        """,
+    )
+
+    def connect(self, params):
+        import pymysql
+
+        return pymysql.connect(
+            host=params.get("host") or "localhost",
+            port=int(params.get("port") or 3306),
+            user=params.get("username") or "",
+            password=params.get("password") or "",
+            database=params.get("database") or None,
+            connect_timeout=params.get("connect_timeout") or 5,
+        )
+
+    def cancel(self, params, conn, cursor):
+        # MySQL has no out-of-band cancel: kill the query from a second session.
+        killer = self.connect(params)
+        try:
+            killer.cursor().execute("KILL QUERY %s", (conn.thread_id(),))
+        finally:
+            killer.close()
+
+    def column_type(self, type_code):
+        if type_code in self._NUMBER_TYPES:
+            return "number"
+        if type_code in self._DATETIME_TYPES:
+            return "datetime"
+        return "string"
+
+    def version(self, conn):
+        return self._scalar(conn, "SELECT VERSION()")
+
+
+@register_driver
+class SQLiteDriver(Driver):
+    source_type = "sqlite"
+    pooled = False
+    catalog_queries = (
+        """
+        SELECT 'main', name, CASE type WHEN 'view' THEN 'view' ELSE 'table' END, 0
+          FROM sqlite_master
+         WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'
+        """,
+        """
+        SELECT 'main', m.name, p.name, p.type, NOT p."notnull", p.cid + 1
+          FROM sqlite_master m
+          JOIN pragma_table_info(m.name) p
+         WHERE m.type IN ('table', 'view')
+        """,
+        """
+        SELECT 'main', tbl_name, name, COALESCE(sql, '')
+          FROM sqlite_master
+         WHERE type = 'index'
+        """,
+    )
+
+    def connect(self, params):
+        import sqlite3
+
+        return sqlite3.connect(params.get("database") or ":memory:")
+
+    def cancel(self, params, conn, cursor):
+        conn.interrupt()
+
+    def explain(self, cursor, query):
+        cursor.execute("EXPLAIN QUERY PLAN " + query)
+        return [row[-1] for row in cursor.fetchall()]
+
+    def version(self, conn):
+        return "SQLite " + self._scalar(conn, "SELECT sqlite_version()")
+
+
+@register_driver
+class CSVDriver(SQLiteDriver):
+    """A CSV file loaded into an in-memory SQLite table named after the file.
+
+    The table is also reachable as ``csv``; all columns are text.
+    """
+
+    source_type = "csv"
+
+    @staticmethod
+    def table_name(path):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return re.sub(r"\W", "_", stem) or "csv"
+
+    def connect(self, params):
+        path = params.get("csv_path")
+        if not path or not os.path.exists(path):
+            raise ValueError("CSV path does not exist.")
+        conn = super().connect({"database": ":memory:"})
+        table = self.table_name(path)
+        with open(path, newline="", encoding="utf-8") as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, None) or ["value"]
+            columns = ", ".join('"%s"' % name.replace('"', '""') for name in header)
+            conn.execute('CREATE TABLE "%s" (%s)' % (table, columns))
+            placeholders = ", ".join("?" * len(header))
+            conn.executemany(
+                'INSERT INTO "%s" VALUES (%s)' % (table, placeholders),
+                (row[: len(header)] + [None] * (len(header) - len(row)) for row in reader),
+            )
+        if table != "csv":
+            conn.execute('CREATE VIEW csv AS SELECT * FROM "%s"' % table)
+        return conn
+
+    def version(self, conn):
+        return "CSV via " + super().version(conn)
+
+
+@register_driver
+class DuckDBDriver(Driver):
+    source_type = "duckdb"
+    pooled = False
+    catalog_queries = (
+        """
+        SELECT schema_name, table_name, 'table', COALESCE(estimated_size, 0)
+          FROM duckdb_tables()
+        UNION ALL
+        SELECT schema_name, view_name, 'view', 0 FROM duckdb_views() WHERE NOT internal
+        """,
+        """
+        SELECT table_schema, table_name, column_name, data_type,
+               is_nullable = 'YES', ordinal_position
+          FROM information_schema.columns
+        """,
+        """
+        SELECT schema_name, table_name, index_name, COALESCE(sql, '') FROM duckdb_indexes()
+        """,
+    )
+
+    def connect(self, params):
+        import duckdb
+
+        return duckdb.connect(params.get("database") or ":memory:")
+
+    def cancel(self, params, conn, cursor):
+        conn.interrupt()
+
+    def column_type(self, type_code):
+        name = str(type_code).upper()
+        if name == "BOOLEAN":
+            return "boolean"
+        if name.startswith(("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT",
+                            "USMALLINT", "UINTEGER", "UBIGINT", "FLOAT", "DOUBLE", "DECIMAL")):
+            return "number"
+        if name.startswith(("DATE", "TIME")):
+            return "datetime"
+        return "string"
+
+    def version(self, conn):
+        return "DuckDB " + self._scalar(conn, "SELECT version()")
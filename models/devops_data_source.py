@@ -1,7 +1,14 @@
-import csv
-import os
+import contextlib
+import logging
+import re
+import threading
+
 from odoo import _, api, fields, models
-from odoo.exceptions import UserError
+from odoo.exceptions import ValidationError
+
+from .data_source_drivers import endpoint_health, get_driver
+
+_logger = logging.getLogger(__name__)
 
 
 class DevOpsDataSource(models.Model):
@@ -22,19 +29,62 @@ class DevOpsDataSource(models.Model):
             ("oracle", "Oracle"),
             ("csv", "CSV File"),
             ("mssql", "Microsoft SQL Server"),
+            ("mysql", "MySQL"),
+            ("sqlite", "SQLite"),
+            ("duckdb", "DuckDB"),
         ],
         required=True,
         default="postgresql",
     )
+    sql_alias = fields.Char(
+        string="SQL Alias",
+        help="Name of the source in federated SQL cells, e.g. erp for FROM erp.customers.",
+    )
     connection_string = fields.Char(help="Legacy connection string.")
     host = fields.Char(string="Host")
     port = fields.Char(string="Port", default=lambda self: self._get_default_port())
-    database = fields.Char(string="Database")
+    database = fields.Char(
+        string="Database", help="Database name, or the database file for SQLite and DuckDB."
+    )
     schema = fields.Char(string="Schema")
     username = fields.Char(string="Username")
     password = fields.Char(string="Password")
     csv_path = fields.Char(help="Absolute path to CSV file when type is CSV.")
     description = fields.Text()
+    endpoint_ids = fields.One2many(
+        "devops.data.source.endpoint",
+        "data_source_id",
+        string="Endpoints",
+        help="Extra hosts: replicas serve read-only queries, primaries are failover targets.",
+    )
+    oracle_client_mode = fields.Selection(
+        [("thin", "Thin"), ("thick", "Thick (Oracle Client)"), ("missing", "Driver Not Installed")],
+        string="Oracle Client Mode",
+        compute="_compute_oracle_client_mode",
+        help="Mode python-oracledb runs in for this server process; chosen once, on first use.",
+    )
+    max_concurrent_runs = fields.Integer(
+        string="Max Concurrent Scheduled Runs",
+        default=0,
+        help="Cap on scheduled notebook runs hitting this source at the same time; 0 means no cap.",
+    )
+
+    _sql_constraints = [
+        ("sql_alias_uniq", "unique(sql_alias)", "The SQL alias of a data source must be unique."),
+    ]
+
+    # Advisory lock namespace for per-source run slots (slot index is added).
+    _RUN_SLOT_NAMESPACE = 0x44530000
+    # Source types that are not reached over the network.
+    _LOCAL_TYPES = ("csv", "sqlite", "duckdb")
+
+    @api.constrains("sql_alias")
+    def _check_sql_alias(self):
+        for source in self:
+            if source.sql_alias and not re.fullmatch(r"[A-Za-z_]\w*", source.sql_alias):
+                raise ValidationError(
+                    _("The SQL alias must be a plain identifier (letters, digits, underscore).")
+                )
 
     def _get_default_port(self, source_type=None):
         stype = source_type or self.source_type or "postgresql"
@@ -47,75 +97,163 @@ class DevOpsDataSource(models.Model):
             if not self.port or self.port in self._PORT_DEFAULTS.values():
                 self.port = default_port
 
-    def action_test_connection(self):
-        messages = []
+    def _compute_oracle_client_mode(self):
+        mode = False
+        if "oracle" in self.mapped("source_type"):
+            driver = get_driver("oracle")
+            try:
+                driver.load()
+                mode = driver.mode
+            except ImportError:
+                mode = "missing"
         for source in self:
-            if source.source_type == "postgresql":
-                try:
-                    import psycopg2
-
-                    conn_str = source._build_postgres_dsn()
-                    with psycopg2.connect(conn_str) as conn:
-                        with conn.cursor() as cur:
-                            cur.execute("SELECT version();")
-                            version = cur.fetchone()[0]
-                        messages.append(_("PostgreSQL connection OK: %s") % version)
-                except Exception as exc:  # pragma: no cover
-                    raise UserError(_("PostgreSQL connection failed: %s") % exc)
-            elif source.source_type == "oracle":
-                try:
-                    oracledb = source._load_oracle_driver()
-                except ImportError as exc:
-                    raise UserError(
-                        _("Oracle test not available: %s. Install python-oracledb.")
-                        % exc
-                    )
-                try:
-                    dsn = source._build_oracle_dsn()
-                    with oracledb.connect(
-                        user=source.username or "",
-                        password=source.password or "",
-                        dsn=dsn,
-                    ) as conn:
-                        messages.append(
-                            _("Oracle connection OK: %s")
-                            % (conn.version or "driver ready")
-                        )
-                except Exception as exc:
-                    raise UserError(_("Oracle connection failed: %s") % exc)
-            elif source.source_type == "csv":
-                if not source.csv_path or not os.path.exists(source.csv_path):
-                    raise UserError(_("CSV path does not exist."))
-                try:
-                    with open(source.csv_path, newline="", encoding="utf-8") as csvfile:
-                        csv.reader(csvfile).__next__()
-                except Exception as exc:
-                    raise UserError(_("CSV file read failed: %s") % exc)
-                messages.append(_("CSV file reachable: %s") % source.csv_path)
-            elif source.source_type == "mssql":
+            source.oracle_client_mode = mode if source.source_type == "oracle" else False
+
+    def _register_hook(self):
+        """Configure the Oracle client and load it when Oracle sources exist."""
+        super()._register_hook()
+        ICP = self.env["ir.config_parameter"].sudo()
+        driver = get_driver("oracle")
+        driver.configure(
+            lib_dir=ICP.get_param("devops.oracle_client_lib_dir"),
+            stmtcachesize=ICP.get_param("devops.oracle_stmtcachesize"),
+            pool_min=ICP.get_param("devops.oracle_pool_min"),
+            pool_max=ICP.get_param("devops.oracle_pool_max"),
+        )
+        if self.sudo().search_count([("source_type", "=", "oracle")], limit=1):
+            try:
+                driver.load()
+            except ImportError:
+                _logger.warning("Oracle data sources exist but python-oracledb is not installed")
+            else:
+                _logger.info("python-oracledb loaded in %s mode", driver.mode)
+
+    def _get_driver(self):
+        self.ensure_one()
+        return get_driver(self.source_type)
+
+    def _driver_params(self, endpoint=None):
+        """Plain connection parameters handed to the driver.
+
+        ``endpoint`` is a ``(host, port)`` pair replacing the source's own.
+        """
+        self.ensure_one()
+        host, port = endpoint or (self.host, self.port)
+        params = {
+            "host": host or "",
+            "port": port or "",
+            "database": self.database or "",
+            "schema": self.schema or "",
+            "username": self.username or "",
+            "password": self.password or "",
+            "csv_path": self.csv_path or "",
+        }
+        if self.source_type == "postgresql":
+            params["dsn"] = self._build_postgres_dsn(endpoint)
+        elif self.source_type == "mssql":
+            params["dsn"] = self._build_mssql_dsn(endpoint)
+        return params
+
+    def _route_endpoints(self, readonly=False):
+        """Endpoints to try in order: ``[None]`` means the source's own settings.
+
+        Read-only work goes to the least loaded replica first and falls back
+        to the primaries; endpoints that failed recently are tried last.
+        """
+        self.ensure_one()
+        if self.source_type in self._LOCAL_TYPES or not self.host:
+            return [None]
+        endpoints = self.endpoint_ids.filtered("active").sorted("sequence")
+        primaries = [(self.host, self.port)] + [
+            (endpoint.host, endpoint.port) for endpoint in endpoints if endpoint.role == "primary"
+        ]
+        candidates = primaries
+        if readonly:
+            replicas = [
+                (endpoint.host, endpoint.port) for endpoint in endpoints if endpoint.role == "replica"
+            ]
+            replicas.sort(key=lambda hp: endpoint_health.load((self.source_type,) + hp))
+            candidates = replicas + primaries
+        return sorted(
+            candidates, key=lambda hp: not endpoint_health.is_up((self.source_type,) + hp)
+        )
+
+    def _endpoint_cooldown(self):
+        return int(
+            self.env["ir.config_parameter"].sudo().get_param("devops.endpoint_cooldown_seconds")
+            or 60
+        )
+
+    @contextlib.contextmanager
+    def _connection(self, readonly=False, timeout=0):
+        """Yield ``(connection, cursor)`` on the source, committing on success.
+
+        PostgreSQL sources without connection details run on the Odoo
+        database itself; the connection is then ``None``. With several
+        endpoints, connection failures move on to the next one. After
+        ``timeout`` seconds, the running statement is cancelled on the
+        endpoint actually connected to.
+        """
+        driver = self._get_driver()
+        if self.source_type == "postgresql" and not self._build_postgres_dsn():
+            yield None, self.env.cr
+            return
+        errors = []
+        for endpoint in self._route_endpoints(readonly):
+            health_key = (self.source_type,) + endpoint if endpoint else None
+            params = self._driver_params(endpoint)
+            try:
+                key, conn = driver.acquire(params)
+            except ImportError:
+                raise
+            except Exception as exc:
+                if not endpoint:
+                    raise
+                endpoint_health.mark_down(health_key, self._endpoint_cooldown())
+                errors.append("%s:%s: %s" % (endpoint[0], endpoint[1] or "", exc))
+                continue
+            if health_key:
+                endpoint_health.mark_up(health_key)
+            break
+        else:
+            raise ConnectionError("All endpoints failed: %s" % "; ".join(errors))
+        with contextlib.ExitStack() as stack:
+            if health_key:
+                stack.enter_context(endpoint_health.track(health_key))
+            try:
+                cursor = conn.cursor()
+                timer = None
+                if timeout:
+                    timer = threading.Timer(timeout, driver.cancel, (params, conn, cursor))
+                    timer.start()
                 try:
-                    import pyodbc
-
-                    dsn = source._build_mssql_dsn()
-                    with pyodbc.connect(dsn, timeout=5) as conn:
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT @@VERSION")
-                        version = cursor.fetchone()[0]
-                        messages.append(_("MSSQL connection OK: %s") % version)
-                except Exception as exc:
-                    raise UserError(_("MSSQL connection failed: %s") % exc)
-        if messages:
-            return {
-                "type": "ir.actions.client",
-                "tag": "display_notification",
-                "params": {
-                    "title": _("Connection Test"),
-                    "message": "\n".join(messages),
-                    "type": "success",
-                    "sticky": False,
-                },
-            }
-        return True
+                    yield conn, cursor
+                finally:
+                    if timer:
+                        timer.cancel()
+                conn.commit()
+            except BaseException:
+                driver.release(key, conn, broken=True)
+                raise
+            driver.release(key, conn)
+
+    def _try_acquire_run_slot(self):
+        """Take one of the source's run slots for the current transaction.
+
+        Slots are transaction-scoped advisory locks, so they are released
+        automatically when the run commits or rolls back.
+        """
+        if not self or self.max_concurrent_runs <= 0:
+            return True
+        self.ensure_one()
+        for slot in range(self.max_concurrent_runs):
+            self.env.cr.execute(
+                "SELECT pg_try_advisory_xact_lock(%s, %s)",
+                (self._RUN_SLOT_NAMESPACE + slot, self.id),
+            )
+            if self.env.cr.fetchone()[0]:
+                return True
+        return False
 
     def _convert_jdbc_to_psycopg(self, url):
         # jdbc:postgresql://host:port/db?user=X&password=Y
@@ -139,11 +277,12 @@ class DevOpsDataSource(models.Model):
         password = params.get("password", "")
         return f"host={host} port={port} dbname={database} user={user} password={password}"
 
-    def _build_postgres_dsn(self):
-        if self.host and self.database:
-            parts = [f"host={self.host}"]
-            if self.port:
-                parts.append(f"port={self.port}")
+    def _build_postgres_dsn(self, endpoint=None):
+        host, port = endpoint or (self.host, self.port)
+        if host and self.database:
+            parts = [f"host={host}"]
+            if port:
+                parts.append(f"port={port}")
             parts.append(f"dbname={self.database}")
             if self.username:
                 parts.append(f"user={self.username}")
@@ -162,9 +301,10 @@ class DevOpsDataSource(models.Model):
             conn_str += f" options='-c search_path={self.schema}'"
         return conn_str
 
-    def _build_mssql_dsn(self):
-        host = self.host or "localhost"
-        port = self.port or "1433"
+    def _build_mssql_dsn(self, endpoint=None):
+        host, port = endpoint or (self.host, self.port)
+        host = host or "localhost"
+        port = port or "1433"
         database = self.database or "master"
         driver = "ODBC Driver 17 for SQL Server"
         parts = [f"DRIVER={{{driver}}}", f"SERVER={host},{port}", f"DATABASE={database}"]
@@ -176,31 +316,11 @@ class DevOpsDataSource(models.Model):
 
     def _build_oracle_dsn(self):
         self.ensure_one()
-        oracledb = self._load_oracle_driver()
-        return oracledb.makedsn(
-            self.host or "localhost",
-            int(self.port or 1521),
-            service_name=self.database or None,
-        )
+        return get_driver("oracle").make_dsn(self._driver_params())
 
     def _load_oracle_driver(self):
-        import oracledb
-        try:
-            from oracledb import driver_mode
-
-            thin_mode = driver_mode.is_thin_mode()
-        except Exception:
-            thin_mode = True
-        if thin_mode:
-            lib_dir = os.environ.get("ORACLE_CLIENT", "/opt/oracle/instantclient")
-            if lib_dir and os.path.isdir(lib_dir):
-                init_client = getattr(oracledb, "init_oracle_client", None)
-                if init_client:
-                    try:
-                        init_client(lib_dir=lib_dir)
-                    except oracledb.ProgrammingError:
-                        pass
-        return oracledb
+        """python-oracledb, initialised once per process by the driver."""
+        return get_driver("oracle").load()
 
     def action_duplicate(self):
         self.ensure_one()
@@ -214,3 +334,22 @@ class DevOpsDataSource(models.Model):
             "view_mode": "form",
             "res_id": new_ds.id,
         }
+
+
+class DevOpsDataSourceEndpoint(models.Model):
+    _name = "devops.data.source.endpoint"
+    _description = "DevOps Data Source Endpoint"
+    _order = "sequence, id"
+
+    data_source_id = fields.Many2one(
+        "devops.data.source", required=True, ondelete="cascade", index=True
+    )
+    sequence = fields.Integer(default=10)
+    role = fields.Selection(
+        [("replica", "Read Replica"), ("primary", "Failover Primary")],
+        required=True,
+        default="replica",
+    )
+    host = fields.Char(required=True)
+    port = fields.Char()
+    active = fields.Boolean(default=True)
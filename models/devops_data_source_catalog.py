@@ -0,0 +1,254 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+class DevOpsDataSourceTable(models.Model):
+    _name = "devops.data.source.table"
+    _description = "Data Source Catalog Table"
+    _order = "schema_name, name"
+
+    data_source_id = fields.Many2one(
+        "devops.data.source", required=True, ondelete="cascade", index=True
+    )
+    schema_name = fields.Char(string="Schema")
+    name = fields.Char(required=True)
+    table_type = fields.Selection([("table", "Table"), ("view", "View")], default="table")
+    row_count = fields.Integer(string="Approx. Rows")
+    column_ids = fields.One2many("devops.data.source.column", "table_id", string="Columns")
+    indexes = fields.Json()
+    signature = fields.Char(help="Hash of columns and indexes, used to skip unchanged tables.")
+
+    _sql_constraints = [
+        (
+            "source_table_uniq",
+            "unique(data_source_id, schema_name, name)",
+            "A table appears only once in a data source catalog.",
+        ),
+    ]
+
+    @api.depends("schema_name", "name")
+    def _compute_display_name(self):
+        for table in self:
+            table.display_name = (
+                f"{table.schema_name}.{table.name}" if table.schema_name else table.name
+            )
+
+
+class DevOpsDataSourceColumn(models.Model):
+    _name = "devops.data.source.column"
+    _description = "Data Source Catalog Column"
+    _order = "table_id, position"
+
+    table_id = fields.Many2one(
+        "devops.data.source.table", required=True, ondelete="cascade", index=True
+    )
+    name = fields.Char(required=True)
+    data_type = fields.Char(string="Type")
+    nullable = fields.Boolean(default=True)
+    position = fields.Integer()
+
+
+class DevOpsDataSource(models.Model):
+    _inherit = "devops.data.source"
+
+    catalog_table_ids = fields.One2many(
+        "devops.data.source.table", "data_source_id", string="Catalog"
+    )
+    catalog_table_count = fields.Integer(compute="_compute_catalog_table_count")
+    catalog_refreshed_at = fields.Datetime(string="Catalog Refreshed", readonly=True)
+    catalog_error = fields.Text(readonly=True)
+
+    def _compute_catalog_table_count(self):
+        counts = dict(
+            self.env["devops.data.source.table"]._read_group(
+                [("data_source_id", "in", self.ids)], ["data_source_id"], ["__count"]
+            )
+        )
+        for source in self:
+            source.catalog_table_count = counts.get(source, 0)
+
+    def action_refresh_catalog(self):
+        for source in self:
+            source._refresh_catalog()
+        return True
+
+    def action_open_catalog(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": self.name,
+            "res_model": "devops.data.source.table",
+            "view_mode": "list,form",
+            "domain": [("data_source_id", "=", self.id)],
+            "context": {"default_data_source_id": self.id},
+        }
+
+    def _fetch_catalog(self):
+        """Read tables, columns and indexes from the source.
+
+        Returns ``{(schema, table): {"type", "rows", "columns", "indexes"}}``.
+        """
+        self.ensure_one()
+        if self.source_type == "csv":
+            return self._fetch_csv_catalog()
+        driver = self._get_driver()
+        queries = driver.catalog_queries
+        if not queries:
+            return {}
+        params = driver.catalog_params(self._driver_params())
+        tables = {}
+        with self._connection(readonly=True) as (_conn, cursor):
+
+            def fetch(query):
+                driver.execute(cursor, query, params)
+                return cursor.fetchall()
+
+            for schema, name, kind, rows in fetch(queries[0]):
+                tables[(schema, name)] = {
+                    "type": kind,
+                    "rows": int(rows or 0),
+                    "columns": [],
+                    "indexes": [],
+                }
+            for schema, table, name, data_type, nullable, position in fetch(queries[1]):
+                if (schema, table) in tables:
+                    tables[(schema, table)]["columns"].append(
+                        [name, data_type, bool(nullable), int(position or 0)]
+                    )
+            for schema, table, name, definition in fetch(queries[2]):
+                if (schema, table) in tables:
+                    tables[(schema, table)]["indexes"].append([name, definition])
+        for table in tables.values():
+            table["columns"].sort(key=lambda column: column[3])
+            table["indexes"].sort()
+        return tables
+
+    def _fetch_csv_catalog(self):
+        import csv
+        import os
+
+        if not self.csv_path or not os.path.exists(self.csv_path):
+            return {}
+        with open(self.csv_path, newline="", encoding="utf-8") as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, [])
+            rows = sum(1 for _row in reader)
+        columns = [[name, "text", True, position] for position, name in enumerate(header, 1)]
+        name = os.path.splitext(os.path.basename(self.csv_path))[0]
+        return {(False, name): {"type": "table", "rows": rows, "columns": columns, "indexes": []}}
+
+    def _refresh_catalog(self):
+        """Sync the stored catalog with the source, touching only what changed."""
+        self.ensure_one()
+        try:
+            fetched = self._fetch_catalog()
+        except Exception as exc:
+            self.write({"catalog_error": str(exc), "catalog_refreshed_at": fields.Datetime.now()})
+            return False
+        Table = self.env["devops.data.source.table"].sudo()
+        existing = {
+            (table.schema_name or False, table.name): table
+            for table in Table.search([("data_source_id", "=", self.id)])
+        }
+        to_create = []
+        for (schema, name), info in fetched.items():
+            signature = hashlib.sha1(
+                json.dumps([info["type"], info["columns"], info["indexes"]]).encode()
+            ).hexdigest()
+            table = existing.pop((schema or False, name), None)
+            if table and table.signature == signature:
+                if table.row_count != info["rows"]:
+                    table.row_count = info["rows"]
+                continue
+            columns = [
+                (0, 0, {"name": col, "data_type": data_type, "nullable": nullable, "position": pos})
+                for col, data_type, nullable, pos in info["columns"]
+            ]
+            vals = {
+                "table_type": info["type"],
+                "row_count": info["rows"],
+                "indexes": info["indexes"],
+                "signature": signature,
+            }
+            if table:
+                table.write(dict(vals, column_ids=[(5, 0, 0)] + columns))
+            else:
+                to_create.append(
+                    dict(
+                        vals,
+                        data_source_id=self.id,
+                        schema_name=schema,
+                        name=name,
+                        column_ids=columns,
+                    )
+                )
+        Table.create(to_create)
+        Table.browse([table.id for table in existing.values()]).unlink()
+        self.write({"catalog_error": False, "catalog_refreshed_at": fields.Datetime.now()})
+        return True
+
+    @api.model
+    def _cron_refresh_catalogs(self, limit=10):
+        """Refresh the stalest catalogs, ``limit`` sources per call."""
+        hours = int(
+            self.env["ir.config_parameter"].sudo().get_param("devops.catalog_refresh_hours") or 24
+        )
+        domain = [
+            ("source_type", "!=", "none"),
+            "|",
+            ("catalog_refreshed_at", "=", False),
+            ("catalog_refreshed_at", "<", fields.Datetime.now() - timedelta(hours=hours)),
+        ]
+        sources = self.search(domain, order="catalog_refreshed_at asc nulls first", limit=limit)
+        for source in sources:
+            source._refresh_catalog()
+            self.env.cr.commit()
+        self.env["ir.cron"]._notify_progress(
+            done=len(sources), remaining=self.search_count(domain)
+        )
+        return len(sources)
+
+    def _catalog_columns(self, schema, table):
+        """``[(name, type)]`` of a catalog table, empty when it is unknown."""
+        self.ensure_one()
+        def exact(name):
+            return name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+        domain = [("data_source_id", "=", self.id), ("name", "=ilike", exact(table))]
+        if schema:
+            domain.append(("schema_name", "=ilike", exact(schema)))
+        found = self.env["devops.data.source.table"].sudo().search(domain, limit=1)
+        return [(column.name, column.data_type) for column in found.column_ids]
+
+    def _get_catalog(self):
+        """Compact catalog used for completion and the notebook sidebar."""
+        self.ensure_one()
+        Table = self.env["devops.data.source.table"].sudo()
+        tables = Table.search_read(
+            [("data_source_id", "=", self.id)],
+            ["schema_name", "name", "table_type", "row_count"],
+        )
+        columns = {}
+        for column in self.env["devops.data.source.column"].sudo().search_read(
+            [("table_id", "in", [table["id"] for table in tables])],
+            ["table_id", "name", "data_type"],
+        ):
+            columns.setdefault(column["table_id"][0], []).append(
+                [column["name"], column["data_type"]]
+            )
+        return {
+            "refreshed_at": self.catalog_refreshed_at,
+            "tables": [
+                {
+                    "schema": table["schema_name"] or "",
+                    "name": table["name"],
+                    "type": table["table_type"],
+                    "rows": table["row_count"],
+                    "columns": columns.get(table["id"], []),
+                }
+                for table in tables
+            ],
+        }
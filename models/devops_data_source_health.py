@@ -0,0 +1,231 @@
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import timedelta
+
+from odoo import _, api, fields, models
+
+from .data_source_drivers import SourceUnavailable, endpoint_health, get_driver
+
+
+def _probe(source_type, params):
+    """Connect and ask the server version; runs in a worker thread, no ORM."""
+    driver = get_driver(source_type)
+    start = time.monotonic()
+    conn = driver.connect(params)
+    connected = time.monotonic()
+    try:
+        version = driver.version(conn)
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    done = time.monotonic()
+    return (connected - start) * 1000.0, (done - connected) * 1000.0, str(version or "")[:256]
+
+
+class DevOpsDataSourceHealth(models.Model):
+    _name = "devops.data.source.health"
+    _description = "Data Source Health Check"
+    _order = "check_time desc, id desc"
+
+    data_source_id = fields.Many2one(
+        "devops.data.source", required=True, ondelete="cascade", index=True
+    )
+    endpoint_id = fields.Many2one("devops.data.source.endpoint", ondelete="cascade")
+    check_time = fields.Datetime(required=True, default=fields.Datetime.now, index=True)
+    state = fields.Selection([("up", "Up"), ("down", "Down")], required=True)
+    connect_ms = fields.Float(string="Connect (ms)")
+    query_ms = fields.Float(string="Query (ms)")
+    server_version = fields.Char()
+    error = fields.Text()
+
+
+class DevOpsDataSource(models.Model):
+    _inherit = "devops.data.source"
+
+    health_state = fields.Selection(
+        [("unknown", "Unknown"), ("up", "Healthy"), ("down", "Unhealthy")],
+        default="unknown",
+        readonly=True,
+        copy=False,
+    )
+    health_checked_at = fields.Datetime(readonly=True, copy=False)
+    health_error = fields.Text(readonly=True, copy=False)
+    circuit_open_until = fields.Datetime(
+        readonly=True,
+        copy=False,
+        help="While set in the future, notebook runs do not try to reach this source.",
+    )
+    health_ids = fields.One2many("devops.data.source.health", "data_source_id")
+
+    def _health_params(self):
+        ICP = self.env["ir.config_parameter"].sudo()
+        return {
+            "workers": int(ICP.get_param("devops.health_check_workers") or 4),
+            "timeout": int(ICP.get_param("devops.health_check_timeout") or 10),
+            "open_seconds": int(ICP.get_param("devops.circuit_open_seconds") or 300),
+        }
+
+    def _probe_targets(self, timeout):
+        """``(source, endpoint, host_port, params)`` to probe, read in the main thread."""
+        targets = []
+        for source in self:
+            if source.source_type == "none":
+                continue
+            if source.source_type == "postgresql" and not source._build_postgres_dsn():
+                # Runs on the Odoo database itself: nothing to probe.
+                continue
+            params = dict(source._driver_params(), connect_timeout=timeout)
+            targets.append((source, False, (source.host, source.port), params))
+            if source.source_type in self._LOCAL_TYPES or not source.host:
+                continue
+            for endpoint in source.endpoint_ids.filtered("active"):
+                host_port = (endpoint.host, endpoint.port)
+                params = dict(source._driver_params(host_port), connect_timeout=timeout)
+                targets.append((source, endpoint, host_port, params))
+        return targets
+
+    def _run_health_checks(self):
+        """Probe the sources concurrently and record the results.
+
+        Each probe gets ``devops.health_check_timeout`` seconds; a probe still
+        hanging after that is reported down and left to finish on its own.
+        """
+        settings = self._health_params()
+        targets = self._probe_targets(settings["timeout"])
+        if not targets:
+            return self.env["devops.data.source.health"]
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, settings["workers"]), thread_name_prefix="devops-health"
+        )
+        try:
+            futures = [
+                executor.submit(_probe, source.source_type, params)
+                for source, _endpoint, _host_port, params in targets
+            ]
+            deadline = time.monotonic() + settings["timeout"]
+            results = []
+            for future in futures:
+                try:
+                    # Probes run in parallel, so they share one deadline.
+                    results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+                except FutureTimeout:
+                    results.append(TimeoutError("no answer within %ss" % settings["timeout"]))
+                except Exception as exc:
+                    results.append(exc)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        now = fields.Datetime.now()
+        vals_list = []
+        by_source = {}
+        for (source, endpoint, host_port, params), result in zip(targets, results):
+            vals = {
+                "data_source_id": source.id,
+                "endpoint_id": endpoint.id if endpoint else False,
+                "check_time": now,
+            }
+            if isinstance(result, Exception):
+                vals.update(state="down", error=str(result) or result.__class__.__name__)
+            else:
+                connect_ms, query_ms, version = result
+                vals.update(
+                    state="up", connect_ms=connect_ms, query_ms=query_ms, server_version=version
+                )
+            vals_list.append(vals)
+            health_key = (source.source_type,) + host_port
+            if vals["state"] == "up":
+                endpoint_health.mark_up(health_key)
+            elif host_port[0]:
+                endpoint_health.mark_down(health_key, settings["open_seconds"])
+            by_source.setdefault(source, []).append(vals)
+        for source, checks in by_source.items():
+            # Routing fails over between endpoints, so the source is only
+            # unavailable once none of them answers.
+            up = any(check["state"] == "up" for check in checks)
+            errors = [check["error"] for check in checks if check["state"] == "down"]
+            source.write(
+                {
+                    "health_state": "up" if up else "down",
+                    "health_checked_at": now,
+                    "health_error": "\n".join(errors) or False,
+                    "circuit_open_until": False
+                    if up
+                    else now + timedelta(seconds=settings["open_seconds"]),
+                }
+            )
+        return self.env["devops.data.source.health"].create(vals_list)
+
+    def action_test_connection(self):
+        """Probe the selected sources side by side and report every result."""
+        checks = self._run_health_checks()
+        failed = checks.filtered(lambda check: check.state == "down")
+        lines = [
+            "%s%s: %s"
+            % (
+                check.data_source_id.name,
+                " (%s)" % check.endpoint_id.host if check.endpoint_id else "",
+                check.error
+                if check.state == "down"
+                else _("%(version)s, connect %(ms).0f ms")
+                % {"version": check.server_version, "ms": check.connect_ms},
+            )
+            for check in checks
+        ]
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Connection Test"),
+                "message": "\n".join(lines) or _("Nothing to check."),
+                "type": "danger" if failed else "success",
+                "sticky": bool(failed),
+            },
+        }
+
+    def action_open_health_history(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Health History"),
+            "res_model": "devops.data.source.health",
+            "view_mode": "list,graph",
+            "domain": [("data_source_id", "=", self.id)],
+        }
+
+    @contextlib.contextmanager
+    def _connection(self, readonly=False, timeout=0):
+        if self._circuit_open():
+            raise SourceUnavailable(
+                _("Data source %(name)s failed its last health check (%(error)s); skipped until %(until)s.")
+                % {
+                    "name": self.name,
+                    "error": self.health_error or "",
+                    "until": self.circuit_open_until,
+                }
+            )
+        with super()._connection(readonly=readonly, timeout=timeout) as handles:
+            yield handles
+
+    def _circuit_open(self):
+        """True while a failed health check keeps the source out of notebook runs."""
+        self.ensure_one()
+        return bool(
+            self.health_state == "down"
+            and self.circuit_open_until
+            and self.circuit_open_until > fields.Datetime.now()
+        )
+
+    @api.model
+    def _cron_check_health(self):
+        sources = self.search([("source_type", "!=", "none")])
+        sources._run_health_checks()
+        days = int(
+            self.env["ir.config_parameter"].sudo().get_param("devops.health_history_days") or 7
+        )
+        self.env["devops.data.source.health"].search(
+            [("check_time", "<", fields.Datetime.now() - timedelta(days=days))]
+        ).unlink()
+        return len(sources)
@@ -3,16 +3,65 @@ import builtins
 import contextlib
 import csv
 import io
+import logging
 import re
 import time
 import traceback
 import pickle
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from io import StringIO
+from urllib.parse import urlencode
 
-from odoo import _, api, fields, models
-from odoo.exceptions import UserError
+import psycopg2
+import pytz
+
+from odoo import _, api, fields, models, tools
+from odoo.exceptions import UserError, ValidationError
 from odoo.tools import html_escape
 from odoo.tools.safe_eval import safe_eval
+from odoo.addons.base.models.res_partner import _tz_get
+
+from .chart_downsampling import lttb, minmax
+from .data_source_drivers import SourceUnavailable, is_read_only
+from . import federated_query
+from .cron_expression import CronExpression
+
+_logger = logging.getLogger(__name__)
+
+
+class NotebookRunCancelled(UserError):
+    """A newer run asked the running one to stop (``cancel_previous`` policy)."""
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _chart_axis(values):
+    """Return ``(kind, xs)``: numeric x values for numbers and timestamps,
+    row indexes for categories; None where a value is missing."""
+    present = [value for value in values if value not in (None, "")]
+    if present and all(_to_float(value) is not None for value in present):
+        return "number", [_to_float(value) if value not in (None, "") else None for value in values]
+    try:
+        stamps = [
+            datetime.fromisoformat(str(value)).replace(tzinfo=None)
+            if value not in (None, "")
+            else None
+            for value in values
+        ]
+    except ValueError:
+        return "category", list(range(len(values)))
+    return "time", [
+        (stamp - datetime(1970, 1, 1)).total_seconds() * 1000 if stamp else None
+        for stamp in stamps
+    ]
 
 
 class DevOpsNotebookCategory(models.Model):
@@ -61,6 +110,17 @@ class DevOpsNotebook(models.Model):
         string="Execution Mode",
         default="immediate",
     )
+    cancel_mails_on_error = fields.Boolean(
+        string="Cancel Mails On Error",
+        help="Cancel the mails queued by email cells instead of sending them "
+        "when any cell of the run fails.",
+    )
+    unhealthy_source_policy = fields.Selection(
+        [("fail", "Fail Fast"), ("skip", "Skip Cell")],
+        string="Unhealthy Source",
+        default="fail",
+        help="What SQL cells do while their data source failed its last health check.",
+    )
     schedule_ids = fields.One2many(
         "devops.notebook.schedule", "notebook_id", string="Schedules"
     )
@@ -72,6 +132,16 @@ class DevOpsNotebook(models.Model):
     execution_count = fields.Integer(compute="_compute_stats", store=True)
     failed_cells = fields.Integer(compute="_compute_stats", store=True)
     kernel_state = fields.Binary(string="Kernel State", attachment=True)
+    run_retention_days = fields.Integer(
+        string="Keep Run Details (days)",
+        help="Runs older than this are rolled up into daily summaries. "
+        "0 falls back to the project or global setting.",
+    )
+    run_summary_retention_days = fields.Integer(
+        string="Keep Daily Summaries (days)",
+        help="Daily run summaries older than this are purged. "
+        "0 falls back to the project or global setting.",
+    )
 
     def copy(self, default=None):
         default = dict(default or {})
@@ -124,6 +194,11 @@ class DevOpsNotebook(models.Model):
                         "sticky": False,
                     },
                 }
+            if not notebook._try_run_lock():
+                raise UserError(
+                    _("Notebook %s is already running. Please wait for it to finish.")
+                    % notebook.name
+                )
             start_dt = fields.Datetime.now()
             run_record = run_model.create(
                 {
@@ -137,11 +212,43 @@ class DevOpsNotebook(models.Model):
             )
             run_state = "success"
             error_message = False
-            execution_context = {"results": [], "by_id": {}, "by_sequence": {}}
+            execution_context = {
+                "results": [],
+                "by_id": {},
+                "by_sequence": {},
+                "mail_queue": [],
+            }
             shared_locals = {}
+            mail_sent = mail_failed = 0
             try:
+                polled_at = time.monotonic()
                 for cell in notebook.cell_ids.sorted("sequence"):
+                    if time.monotonic() - polled_at >= self._CANCEL_POLL_SECONDS:
+                        polled_at = time.monotonic()
+                        if notebook._cancel_requested(start_dt):
+                            raise NotebookRunCancelled(
+                                _("Notebook %s was cancelled by a newer run.") % notebook.name
+                            )
                     cell._run_cell(execution_context=execution_context, shared_locals=shared_locals)
+                notebook._notify_cells_changed(notebook.cell_ids.ids)
+                # Mails are only sent once every cell has run, in one batch.
+                if notebook.cancel_mails_on_error and notebook.cell_ids.filtered(
+                    lambda c: c.status == "error"
+                ):
+                    cancelled = notebook._cancel_queued_mails(execution_context["mail_queue"])
+                    sent = failed = self.env["mail.mail"]
+                    if cancelled:
+                        error_message = _(
+                            "%s queued mails were cancelled because cells failed."
+                        ) % len(cancelled)
+                else:
+                    sent, failed = notebook._send_queued_mails(execution_context["mail_queue"])
+                mail_sent, mail_failed = len(sent), len(failed)
+                if failed:
+                    error_message = _("%s mails failed:") % mail_failed + "".join(
+                        "\n%s: %s" % (mail.email_to, mail.failure_reason or "")
+                        for mail in failed[:50]
+                    )
                 end_dt = fields.Datetime.now()
                 notebook.last_run = end_dt
             except Exception:
@@ -170,9 +277,69 @@ class DevOpsNotebook(models.Model):
                         "result_cell_total": notebook.cell_total,
                         "result_failed_cells": notebook.failed_cells,
                         "mail_ids": sent_mail_ids and [(6, 0, sent_mail_ids)] or False,
+                        "mail_sent_count": mail_sent,
+                        "mail_failed_count": mail_failed,
                     }
                 )
 
+    def _send_queued_mails(self, mail_ids):
+        """Send the mails queued by email cells in one batch.
+
+        ``mail.mail.send`` groups mails by outgoing server and sender and
+        reuses one SMTP connection per group. Returns ``(sent, failed)``.
+        """
+        mails = self.env["mail.mail"].sudo().browse(mail_ids).exists()
+        outgoing = mails.filtered(lambda mail: mail.state == "outgoing")
+        if outgoing:
+            outgoing.send(raise_exception=False)
+        return (
+            mails.filtered(lambda mail: mail.state == "sent"),
+            mails.filtered(lambda mail: mail.state == "exception"),
+        )
+
+    def _cancel_queued_mails(self, mail_ids):
+        """Cancel the mails queued by email cells that were not sent yet."""
+        mails = self.env["mail.mail"].sudo().browse(mail_ids).exists()
+        outgoing = mails.filtered(lambda mail: mail.state == "outgoing")
+        outgoing.write({"state": "cancel"})
+        return outgoing
+
+    # Advisory lock namespace held by a transaction while it runs a notebook.
+    _RUN_LOCK_NAMESPACE = 0x4E42
+
+    def _try_run_lock(self):
+        """Take the notebook's run lock for the current transaction, without waiting."""
+        self.ensure_one()
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_xact_lock(%s, %s)", (self._RUN_LOCK_NAMESPACE, self.id)
+        )
+        return self.env.cr.fetchone()[0]
+
+    # Seconds between two checks for cancel requests during a run.
+    _CANCEL_POLL_SECONDS = 5
+
+    def _request_cancel(self):
+        """Ask the run currently holding this notebook to stop before its next cell."""
+        self.ensure_one()
+        self.env["devops.notebook.cancel.request"].sudo().create({"notebook_id": self.id})
+
+    def _cancel_requested(self, since):
+        """Consume the cancel requests made since the run started at ``since``.
+
+        Read on a separate cursor: the run's own transaction cannot see
+        requests committed after it started.
+        """
+        self.ensure_one()
+        with self.pool.cursor() as cr:
+            requests = (
+                self.env(cr=cr)["devops.notebook.cancel.request"]
+                .sudo()
+                .search([("notebook_id", "=", self.id)])
+            )
+            pending = requests.filtered(lambda request: request.requested_at >= since)
+            requests.unlink()
+        return bool(pending)
+
     @api.model
     def _default_data_source(self):
         default_project_id = self.env.context.get("default_project_id")
@@ -187,12 +354,30 @@ class DevOpsNotebook(models.Model):
         )
         return int(param) if param else False
 
+    def _get_run_retention(self, default_days=0, default_summary_days=0):
+        """Return the effective (detail, summary) retention in days; 0 keeps forever."""
+        self.ensure_one()
+        project = self.project_id
+        days = (
+            self.run_retention_days
+            or project.notebook_run_retention_days
+            or default_days
+        )
+        summary_days = (
+            self.run_summary_retention_days
+            or project.notebook_run_summary_retention_days
+            or default_summary_days
+        )
+        return days, summary_days
+
     def _compute_mail_count(self):
-        Mail = self.env["mail.mail"]
-        for rec in self:
-            rec.mail_count = Mail.search_count(
-                [("model", "=", "devops.notebook"), ("res_id", "=", rec.id)]
+        counts = dict(
+            self.env["mail.mail"]._read_group(
+                [("notebook_id", "in", self.ids)], ["notebook_id"], ["__count"]
             )
+        )
+        for rec in self:
+            rec.mail_count = counts.get(rec, 0)
 
     def action_run_now(self):
         self.ensure_one()
@@ -222,6 +407,18 @@ class DevOpsNotebook(models.Model):
         result["context"] = ctx
         return result
 
+    def get_catalog(self):
+        """Stored catalog of the notebook's data source (no source round-trip)."""
+        self.ensure_one()
+        source = self.data_source_id.sudo()
+        if not source:
+            return {"refreshed_at": False, "tables": []}
+        return source._get_catalog()
+
+    def action_refresh_catalog(self):
+        self.data_source_id.sudo().action_refresh_catalog()
+        return True
+
     def action_export_notebook(self):
         self.ensure_one()
         return {
@@ -232,10 +429,16 @@ class DevOpsNotebook(models.Model):
             "context": {"active_id": self.id},
         }
 
-    def action_clear_all_outputs(self):
-        for notebook in self:
-            notebook.cell_ids.action_clear_output()
-        return True
+    def action_export_notebooks(self, filename=None):
+        """Download all notebooks of the recordset as one zip archive."""
+        params = {"ids": ",".join(str(notebook_id) for notebook_id in self.ids)}
+        if filename:
+            params["filename"] = filename
+        return {
+            "type": "ir.actions.act_url",
+            "url": "/devops/notebooks/export?%s" % urlencode(params),
+            "target": "self",
+        }
 
     def action_clear_all_outputs(self):
         for notebook in self:
@@ -270,7 +473,7 @@ class DevOpsNotebook(models.Model):
         for key, value in locals_dict.items():
             if key.startswith("__") or key in [
                 "env", "notebook", "cell", "recordset", "print", "cell_results", 
-                "last_result", "get_cell_result", "send_mail"
+                "last_result", "get_cell_result", "send_mail", "set_result"
             ]:
                 continue
             try:
@@ -286,19 +489,46 @@ class DevOpsNotebook(models.Model):
         return True
 
     def action_add_cell_inline(self):
-        """Create a new cell directly and reload the notebook view."""
+        """Append a new cell; the form only re-reads the light cell list."""
         for notebook in self:
-            next_seq = max(notebook.mapped("cell_ids.sequence") or [0]) + 10
-            notebook.cell_ids.create(
+            notebook.add_cell()
+        return True
+
+    def add_cell(self, cell_type="richtext", after_cell_id=None):
+        """Create a cell after ``after_cell_id`` (or at the end) and return
+        its light data, so the notebook widget can insert it in place."""
+        self.ensure_one()
+        Cell = self.env["devops.notebook.cell"]
+        vals = {"notebook_id": self.id, "cell_type": cell_type, "input_source": ""}
+        after = Cell.browse(after_cell_id).exists() if after_cell_id else Cell
+        if after:
+            following = self.cell_ids.filtered(lambda cell: cell.sequence > after.sequence)
+            next_sequence = min(following.mapped("sequence") or [after.sequence + 20])
+            if next_sequence - after.sequence < 2:
+                # No room left between the two cells: shift the rest down.
+                for cell in following:
+                    cell.sequence += 20
+                next_sequence += 20
+            vals["sequence"] = (after.sequence + next_sequence) // 2
+        cell = Cell.create(vals)
+        self._notify_cells_changed(structure=True)
+        return cell._read_light()[0]
+
+    def _notify_cells_changed(self, cell_ids=None, structure=False):
+        """Tell open notebook views which cells to re-fetch.
+
+        ``structure`` means cells were added, removed or reordered.
+        """
+        for notebook in self:
+            self.env["bus.bus"]._sendone(
+                f"devops_notebook_{notebook.id}",
+                "devops_notebook/cells",
                 {
                     "notebook_id": notebook.id,
-                    "sequence": next_seq,
-                    "cell_type": "richtext",
-                    "cell_label": f"Cell {next_seq}",
-                    "input_source": "",
-                }
+                    "cell_ids": list(cell_ids or []),
+                    "structure": structure,
+                },
             )
-        return {"type": "ir.actions.client", "tag": "reload"}
 
     def action_open_run_history(self):
         self.ensure_one()
@@ -332,7 +562,7 @@ class DevOpsNotebook(models.Model):
         if not action:
             return False
         result = action.read()[0]
-        result["domain"] = [("model", "=", "devops.notebook"), ("res_id", "=", self.id)]
+        result["domain"] = [("notebook_id", "=", self.id)]
         return result
 
     def action_configure_schedule(self):
@@ -370,6 +600,7 @@ class DevOpsNotebookCell(models.Model):
             ("python", "Python"),
             ("email_python", "Email (Python)"),
             ("sql", "SQL"),
+            ("federated", "Federated SQL"),
             ("richtext", "Rich Text"),
         ],
         required=True,
@@ -383,23 +614,51 @@ class DevOpsNotebookCell(models.Model):
     cell_label = fields.Char(compute="_compute_label", store=True)
     last_run = fields.Datetime()
     status = fields.Selection(
-        [("pending", "Pending"), ("success", "Success"), ("error", "Error")],
+        [("pending", "Pending"), ("success", "Success"), ("error", "Error"), ("skipped", "Skipped")],
         default="pending",
     )
     elapsed_ms = fields.Float(string="Elapsed (ms)")
+    render_hash = fields.Char(readonly=True, copy=False)
+    output_schema = fields.Json(string="Result Schema", readonly=True)
+    chart_type = fields.Selection(
+        [("line", "Line"), ("bar", "Bar"), ("scatter", "Scatter")],
+        string="Chart",
+        help="Plot the structured result of SQL cells, or of Python cells calling set_result().",
+    )
+    chart_x = fields.Char(string="X Column")
+    chart_y = fields.Char(string="Y Columns", help="Comma-separated column names.")
+    chart_max_points = fields.Integer(
+        string="Max Points",
+        default=2000,
+        help="Series with more points are downsampled on the server.",
+    )
+    output_chart = fields.Json(string="Chart Data", readonly=True)
+
+    _CHART_FIELDS = {"chart_type", "chart_x", "chart_y", "chart_max_points"}
+
+    # Rows rendered in the HTML preview of a query result.
+    _HTML_PREVIEW_ROWS = 200
+    # Upper bound of rows returned by one get_result_page call.
+    _RESULT_PAGE_MAX = 1000
+
+    # Cells whose output only depends on their input; they are re-rendered
+    # only when the input or _RENDER_VERSION changes.
+    _DOC_CELL_TYPES = ("richtext",)
+    # Bump when the rendering of documentation cells changes.
+    _RENDER_VERSION = 1
 
     @api.onchange("cell_type")
     def _onchange_cell_type(self):
         if self.cell_type == "email_python" and not self.input_source:
             self.input_source = (
                 "# Sample Email Code\n"
-                "mail = env['mail.mail'].sudo().create({\n"
-                "    'subject': 'Test Subject',\n"
-                "    'email_to': 'test@example.com',\n"
-                "    'body_html': '<p>Hello from Odoo Notebook!</p>',\n"
-                "})\n"
-                "mail.send()\n"
-                "print(f'Mail sent: {mail.id}')"
+                "# Mails are queued and sent in one batch after the run.\n"
+                "mail = send_mail(\n"
+                "    subject='Test Subject',\n"
+                "    email_to='test@example.com',\n"
+                "    body_html='<p>Hello from Odoo Notebook!</p>',\n"
+                ")\n"
+                "print(f'Mail queued: {mail.id}')"
             )
 
     def action_toggle_input(self):
@@ -423,17 +682,63 @@ class DevOpsNotebookCell(models.Model):
             return max_seq + 10
         return 10
 
-    @api.model
-    def create(self, vals):
-        if not vals.get("sequence") and vals.get("notebook_id"):
-            notebook = self.env["devops.notebook"].browse(vals["notebook_id"])
-            max_seq = max(notebook.cell_ids.mapped("sequence") or [0])
-            vals["sequence"] = max_seq + 10
-        return super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Read the last sequence of each notebook once, then keep appending.
+        notebook_ids = {
+            vals["notebook_id"]
+            for vals in vals_list
+            if not vals.get("sequence") and vals.get("notebook_id")
+        }
+        last_sequence = {}
+        if notebook_ids:
+            last_sequence = {
+                notebook.id: max_sequence or 0
+                for notebook, max_sequence in self._read_group(
+                    [("notebook_id", "in", list(notebook_ids))],
+                    ["notebook_id"],
+                    ["sequence:max"],
+                )
+            }
+        for vals in vals_list:
+            notebook_id = vals.get("notebook_id")
+            if notebook_id not in notebook_ids:
+                continue
+            if not vals.get("sequence"):
+                vals["sequence"] = last_sequence.get(notebook_id, 0) + 10
+            last_sequence[notebook_id] = max(last_sequence.get(notebook_id, 0), vals["sequence"])
+        return super().create(vals_list)
+
+    # Fields the notebook widget loads for every cell; outputs are read lazily.
+    _LIGHT_FIELDS = ["sequence", "cell_label", "cell_type", "status", "write_date"]
 
     def action_run(self):
         for cell in self:
             cell._run_cell()
+        for notebook in self.notebook_id:
+            notebook._notify_cells_changed(self.filtered(lambda c: c.notebook_id == notebook).ids)
+
+    def _read_light(self):
+        return self.read(self._LIGHT_FIELDS)
+
+    def move_cell(self, offset):
+        """Swap the cell with its neighbour ``offset`` places away (-1 or 1)
+        and return the light data of both cells."""
+        self.ensure_one()
+        siblings = self.notebook_id.cell_ids.sorted(lambda cell: (cell.sequence, cell.id))
+        index = list(siblings).index(self)
+        target = index + (1 if offset > 0 else -1)
+        if not 0 <= target < len(siblings):
+            return self._read_light()
+        other = siblings[target]
+        if other.sequence == self.sequence:
+            # Equal sequences only sort by id: renumber before swapping.
+            for position, cell in enumerate(siblings):
+                if cell.sequence != (position + 1) * 10:
+                    cell.sequence = (position + 1) * 10
+        self.sequence, other.sequence = other.sequence, self.sequence
+        self.notebook_id._notify_cells_changed(structure=True)
+        return (self | other)._read_light()
 
     def action_clear_output(self):
         """Clear outputs of selected cells."""
@@ -444,12 +749,16 @@ class DevOpsNotebookCell(models.Model):
                 "output_file": False,
                 "output_filename": False,
                 "output_data": False,
+                "output_schema": False,
+                "output_chart": False,
                 "status": "pending",
             }
         )
 
     def action_delete_cell(self):
+        notebooks = self.notebook_id
         self.unlink()
+        notebooks._notify_cells_changed(structure=True)
 
     @api.depends("sequence")
     def _compute_label(self):
@@ -464,31 +773,66 @@ class DevOpsNotebookCell(models.Model):
         export_file = False
         export_filename = False
         structured_data = None
+        payload_extra = {}
+        if self.cell_type in self._DOC_CELL_TYPES:
+            render_hash = self._get_render_hash()
+            if self.status == "success" and self.render_hash == render_hash:
+                # Unchanged documentation: keep the stored output as is.
+                self._register_result(execution_context, self._make_result_entry())
+                return
         try:
-            if self.cell_type in ["python", "email_python"]:
-                output_text = self._exec_python(execution_context=execution_context, shared_locals=shared_locals)
+            if self.cell_type == "python":
+                captured = {}
+                output_text = self._exec_python(
+                    execution_context=execution_context,
+                    shared_locals=shared_locals,
+                    extra_locals={"set_result": lambda data: captured.update(data=data)},
+                )
+                output_html = "<pre>%s</pre>" % html_escape(output_text or "")
+                if "data" in captured:
+                    structured_data, schema = self._normalize_result(captured["data"])
+                    payload_extra["output_schema"] = schema
+            elif self.cell_type == "email_python":
+                output_text, structured_data = self._exec_mail(
+                    execution_context=execution_context, shared_locals=shared_locals
+                )
                 output_html = "<pre>%s</pre>" % html_escape(output_text or "")
             elif self.cell_type == "richtext":
                 # Treat input as HTML; render directly and keep raw text
                 output_text = self.input_source or ""
                 output_html = self.input_source or ""
-            elif self.cell_type == "sql":
-                sql_result = self._exec_sql()
+                payload_extra["render_hash"] = render_hash
+            elif self.cell_type in ("sql", "federated"):
+                if self.cell_type == "sql":
+                    sql_result = self._exec_sql()
+                else:
+                    sql_result = self._exec_federated(execution_context)
                 if isinstance(sql_result, dict):
                     output_text = sql_result.get("text", "")
                     output_html = sql_result.get("html", "")
                     structured_data = sql_result.get("data")
+                    payload_extra["output_schema"] = sql_result.get("schema") or False
                     export_file = sql_result.get("file")
                     export_filename = sql_result.get("filename")
                 else:
                     output_text = sql_result
                     output_html = "<pre>%s</pre>" % html_escape(output_text or "")
+        except SourceUnavailable as exc:
+            skip = self.notebook_id.unhealthy_source_policy == "skip"
+            status = "skipped" if skip else "error"
+            output_text = str(exc)
+            output_html = "<pre class='%s'>%s</pre>" % (
+                "text-warning" if skip else "text-danger",
+                html_escape(output_text),
+            )
         except Exception as exc:  # pragma: no cover - best effort logging
             status = "error"
             output_text = str(exc)
             output_html = "<pre class='text-danger'>%s</pre>" % html_escape(
                 output_text
             )
+        if status == "success" and self.chart_type:
+            payload_extra["output_chart"] = self._build_chart(structured_data)
         elapsed = (time.time() - start) * 1000.0
         payload = {
             "status": status,
@@ -499,6 +843,9 @@ class DevOpsNotebookCell(models.Model):
             "last_run": fields.Datetime.now(),
             "elapsed_ms": elapsed,
             "output_data": structured_data,
+            "output_schema": False,
+            "output_chart": False,
+            **payload_extra,
         }
         if status == "success" and self.cell_type == "markdown":
             payload["output_text"] = self.input_source or ""
@@ -511,16 +858,9 @@ class DevOpsNotebookCell(models.Model):
             filename=export_filename,
         )
         self.write(payload)
-        if execution_context is not None:
-            execution_context.setdefault("results", []).append(entry)
-            execution_context.setdefault("by_id", {})[self.id] = entry
-            execution_context.setdefault("by_sequence", {})[self.sequence] = entry
-            execution_context.setdefault("by_label", {})
-            if self.cell_label:
-                execution_context["by_label"][self.cell_label] = entry
-            execution_context["last_result"] = entry
-
-        if status == "success" and self.cell_type == "sql":
+        self._register_result(execution_context, entry)
+
+        if status == "success" and self.cell_type in ("sql", "federated"):
             val = structured_data
             try:
                 import pandas as pd
@@ -536,7 +876,24 @@ class DevOpsNotebookCell(models.Model):
                 kernel_locals["_"] = val
                 self.notebook_id._set_kernel_locals(kernel_locals)
 
-    def _exec_python(self, execution_context=None, shared_locals=None):
+    def _register_result(self, execution_context, entry):
+        if execution_context is None:
+            return
+        execution_context.setdefault("results", []).append(entry)
+        execution_context.setdefault("by_id", {})[self.id] = entry
+        execution_context.setdefault("by_sequence", {})[self.sequence] = entry
+        execution_context.setdefault("by_label", {})
+        if self.cell_label:
+            execution_context["by_label"][self.cell_label] = entry
+        execution_context["last_result"] = entry
+
+    def _get_render_hash(self):
+        """Identify the rendered output of a documentation cell."""
+        self.ensure_one()
+        source = f"{self._RENDER_VERSION}:{self.cell_type}:{self.input_source or ''}"
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def _exec_python(self, execution_context=None, shared_locals=None, extra_locals=None):
         localdict = {
             "env": self.env,
             "notebook": self.notebook_id,
@@ -563,6 +920,8 @@ class DevOpsNotebookCell(models.Model):
         localdict["get_cell_result"] = lambda identifier: self._get_cell_result_helper(
             identifier, execution_context
         )
+        if extra_locals:
+            localdict.update(extra_locals)
         globals_env = {"__builtins__": builtins}
         with contextlib.redirect_stdout(buffer):
             exec(compile(code, "<notebook>", "exec"), globals_env, localdict)
@@ -572,7 +931,8 @@ class DevOpsNotebookCell(models.Model):
             for key, value in localdict.items():
                 if key not in [
                     "env", "notebook", "cell", "recordset", "print", "cell_results", 
-                    "last_result", "get_cell_result", "__builtins__", "send_mail"
+                    "last_result", "get_cell_result", "__builtins__", "send_mail",
+                    "set_result",
                 ]:
                     shared_locals[key] = value
         else:
@@ -582,19 +942,20 @@ class DevOpsNotebookCell(models.Model):
         stdout = buffer.getvalue()
         return stdout.strip()
 
-    def _exec_mail(self, execution_context=None):
+    def _exec_mail(self, execution_context=None, shared_locals=None):
+        """Run an email cell: Python code with a ``send_mail`` helper.
+
+        Mails are queued and sent in one batch once the notebook run is
+        over (or at the end of the cell when it runs on its own), so a
+        cell mailing hundreds of reports does not open one SMTP session
+        per message. ``auto_send=False`` leaves a mail to the mail queue cron.
+        """
         Mail = self.env["mail.mail"].sudo()
         sent_ids = []
-        buffer = StringIO()
-        localdict = {
-            "env": self.env,
-            "notebook": self.notebook_id,
-            "cell": self,
-            "recordset": self.env[self._name].browse(self.id),
-            "cell_results": execution_context or {},
-            "last_result": (execution_context or {}).get("last_result"),
-        }
-        localdict.setdefault("print", builtins.print)
+        if execution_context is not None:
+            mail_queue = execution_context.setdefault("mail_queue", [])
+        else:
+            mail_queue = []
 
         def normalize_addresses(value):
             if not value:
@@ -615,14 +976,12 @@ class DevOpsNotebookCell(models.Model):
                     name, content = item[0], item[1]
                 if not name or content is None:
                     continue
-                data = content
                 if isinstance(content, bytes):
-                    data = base64.b64encode(content).decode("ascii")
+                    prepared.append({"name": name, "raw": content})
                 elif isinstance(content, str):
-                    data = content
+                    prepared.append({"name": name, "datas": content})
                 else:
-                    data = base64.b64encode(str(content).encode("utf-8")).decode("ascii")
-                prepared.append((name, data))
+                    prepared.append({"name": name, "raw": str(content).encode("utf-8")})
             return prepared
 
         def send_mail(
@@ -647,36 +1006,27 @@ class DevOpsNotebookCell(models.Model):
                 "email_to": normalize_addresses(email_to),
                 "email_cc": normalize_addresses(email_cc),
                 "email_bcc": normalize_addresses(email_bcc),
+                # Keep sent mails so the run can link and count them.
+                "auto_delete": False,
             }
             prepared_attachments = prepare_attachments(attachments)
             if prepared_attachments:
-                vals["attachment_ids"] = [
-                    (
-                        0,
-                        0,
-                        {
-                            "name": name,
-                            "datas": data,
-                        },
-                    )
-                    for name, data in prepared_attachments
-                ]
+                vals["attachment_ids"] = [(0, 0, att) for att in prepared_attachments]
             mail = Mail.create(vals)
             if auto_send:
-                mail.send()
+                mail_queue.append(mail.id)
             sent_ids.append(mail.id)
             return mail
 
-        localdict["send_mail"] = send_mail
-        localdict["get_cell_result"] = lambda identifier: self._get_cell_result_helper(
-            identifier, execution_context
+        output = self._exec_python(
+            execution_context=execution_context,
+            shared_locals=shared_locals,
+            extra_locals={"send_mail": send_mail},
         )
-        code = self.input_source or ""
-        globals_env = {"__builtins__": builtins}
-        with contextlib.redirect_stdout(buffer):
-            exec(compile(code, "<notebook mail>", "exec"), globals_env, localdict)
-        stdout = buffer.getvalue().strip()
-        summary = stdout or _("Sent %s mails") % len(sent_ids)
+        summary = output or _("Queued %s mails") % len(sent_ids)
+        if execution_context is None and mail_queue:
+            sent, failed = self.notebook_id._send_queued_mails(mail_queue)
+            summary = output or _("Sent %s mails, %s failed") % (len(sent), len(failed))
         data = {"sent_mail_ids": sent_ids}
         return summary, data
 
@@ -737,86 +1087,122 @@ class DevOpsNotebookCell(models.Model):
                 target = candidates.filtered(lambda c: c.cell_label == stripped)[:1]
         return target
 
-    def _exec_sql(self):
-        query = (self.input_source or "").strip()
-        if not query:
-            return ""
+    def _get_sql_source(self):
         source = self.notebook_id.data_source_id
         if not source:
             raise ValueError("No data source configured for this notebook.")
         if source.source_type == "none":
             raise ValueError("SQL cells require a real data source (not 'No Data Source').")
-        if source.source_type == "postgresql":
-            conn_str = source._build_postgres_dsn()
-            if conn_str:
-                import psycopg2
-
-                with psycopg2.connect(conn_str) as conn:
-                    with conn.cursor() as cur:
-                        cur.execute(query)
-                        if cur.description:
-                            return self._format_query_result(cur)
-                        return "%s row(s) affected" % cur.rowcount
-            cr = self.env.cr
-            cr.execute(query)
-            if cr.description:
-                return self._format_query_result(cr)
-            return "%s row(s) affected" % cr.rowcount
-        elif source.source_type == "mssql":
-            try:
-                import pyodbc
-            except ImportError as exc:
-                raise ValueError("pyodbc not installed: %s" % exc) from exc
-
-            conn_str = source._build_mssql_dsn()
-            with pyodbc.connect(conn_str, timeout=5) as conn:
-                cur = conn.cursor()
-                cur.execute(query)
-                if cur.description:
-                    return self._format_query_result(cur)
-                return "%s row(s) affected" % cur.rowcount
-        elif source.source_type == "oracle":
-            try:
-                oracledb = source._load_oracle_driver()
-            except ImportError as exc:
-                raise ValueError("python-oracledb not installed: %s" % exc) from exc
-
-            dsn = source._build_oracle_dsn()
-            with oracledb.connect(
-                user=source.username or "",
-                password=source.password or "",
-                dsn=dsn,
-            ) as conn:
-                cur = conn.cursor()
-                cur.execute(query)
-                if cur.description:
-                    return self._format_query_result(cur)
-                return "%s row(s) affected" % cur.rowcount
-        elif source.source_type == "csv":
-            path = source.csv_path
-            if not path:
-                return "CSV path not configured."
-            import csv
-
-            with open(path, newline="", encoding="utf-8") as csvfile:
-                reader = csv.reader(csvfile)
-                rows = list(reader)
-            text_rows = ["\t".join(row) for row in rows]
-            html_rows = "".join(
-                "<tr>" + "".join(f"<td>{html_escape(col)}</td>" for col in row) + "</tr>"
-                for row in rows
+        return source
+
+    def _exec_sql(self):
+        query = (self.input_source or "").strip()
+        if not query:
+            return ""
+        source = self._get_sql_source()
+        driver = source._get_driver()
+        timeout = int(
+            self.env["ir.config_parameter"].sudo().get_param("devops.sql_timeout_seconds") or 0
+        )
+        readonly = is_read_only(query)
+        with source._connection(readonly=readonly, timeout=timeout) as (_conn, cursor):
+            driver.execute(cursor, query)
+            if not cursor.description:
+                return "%s row(s) affected" % cursor.rowcount
+            rows = [row for batch in driver.fetch_batches(cursor) for row in batch]
+            types = [driver.column_type(desc[1]) for desc in cursor.description]
+            return self._format_query_result(cursor, rows=rows, types=types)
+
+    def _exec_federated(self, execution_context=None):
+        """Run a federated SQL cell; see ``federated_query``."""
+        query = (self.input_source or "").strip()
+        if not query:
+            return ""
+        sources = {
+            source.sql_alias.lower(): source
+            for source in self.env["devops.data.source"].search([("sql_alias", "!=", False)])
+        }
+        refs = federated_query.find_source_refs(query, sources)
+        max_rows = int(
+            self.env["ir.config_parameter"].sudo().get_param("devops.federated_max_rows")
+            or 1000000
+        )
+        by_table = {}
+        for ref in refs:
+            by_table.setdefault(federated_query.local_name(ref), []).append(ref)
+        engine = federated_query.LocalEngine()
+        fetched = []
+        try:
+            for name, table_refs in by_table.items():
+                ref = table_refs[0]
+                source = sources[ref.alias]
+                columns = source._catalog_columns(ref.schema, ref.table)
+                filters = []
+                if len(table_refs) == 1:
+                    # A table joined to itself gets each copy filtered differently.
+                    filters = federated_query.pushdown_filters(query, ref, columns)
+                remote = federated_query.remote_query(
+                    ref, federated_query.needed_columns(query, table_refs, columns), filters
+                )
+                driver = source._get_driver()
+                with source._connection(readonly=True) as (_conn, cursor):
+                    driver.execute(cursor, remote)
+                    headers = [desc[0] for desc in cursor.description]
+                    count = engine.load(name, headers, driver.fetch_batches(cursor), max_rows)
+                fetched.append((source.name, remote, count))
+            for sequence in federated_query.referenced_cells(query):
+                entry = self._get_cell_result_helper(sequence, execution_context)
+                if not entry or not isinstance(entry.get("data"), list):
+                    raise ValueError("cell_%s has no tabular result yet." % sequence)
+                engine.load_records("cell_%s" % sequence, entry["data"], max_rows)
+            cursor = engine.execute(federated_query.rewrite_query(query, refs))
+            if not cursor.description:
+                return "Statement executed."
+            result = self._format_query_result(cursor)
+        finally:
+            engine.close()
+        if fetched:
+            result["html"] += "<details class='text-muted'><summary>%s</summary>%s</details>" % (
+                html_escape(_("Source queries")),
+                "".join(
+                    "<div><b>%s</b> (%s rows): <code>%s</code></div>"
+                    % (html_escape(name), count, html_escape(remote))
+                    for name, remote, count in fetched
+                ),
             )
-            html = f"<table class='o_devops_table'><tbody>{html_rows}</tbody></table>"
-            return "\n".join(text_rows), html
-        return "Data source type %s not supported yet." % source.source_type
+        return result
 
-    def _format_query_result(self, cursor):
-        rows = cursor.fetchall()
+    def action_explain(self):
+        """Show the execution plan of the SQL cell in its output."""
+        self.ensure_one()
+        query = (self.input_source or "").strip()
+        try:
+            source = self._get_sql_source()
+            with source._connection(readonly=is_read_only(query)) as (_conn, cursor):
+                lines = source._get_driver().explain(cursor, query)
+        except Exception as exc:
+            raise UserError(_("Explain failed: %s") % exc)
+        plan = "\n".join(lines)
+        self.write(
+            {
+                "output_text": plan,
+                "output_html": "<pre>%s</pre>" % html_escape(plan),
+                "output_schema": False,
+                "output_chart": False,
+            }
+        )
+        return True
+
+    def _format_query_result(self, cursor, rows=None, types=None):
+        if rows is None:
+            rows = cursor.fetchall()
         headers = [desc[0] for desc in cursor.description]
         text_lines = [", ".join(headers)]
         text_lines += [
             ", ".join([self._stringify_value(col) for col in row]) for row in rows
         ]
+        # The full result is browsed through the grid widget; the HTML is
+        # only a preview.
         html_header = "".join(f"<th>{html_escape(self._stringify_value(h))}</th>" for h in headers)
         html_body = "".join(
             "<tr>"
@@ -825,13 +1211,18 @@ class DevOpsNotebookCell(models.Model):
                 for col in row
             )
             + "</tr>"
-            for row in rows
+            for row in rows[: self._HTML_PREVIEW_ROWS]
         )
         html = (
             "<table class='o_devops_table'>"
             f"<thead><tr>{html_header}</tr></thead>"
             f"<tbody>{html_body}</tbody></table>"
         )
+        if len(rows) > self._HTML_PREVIEW_ROWS:
+            html += "<p class='text-muted'>%s</p>" % html_escape(
+                _("Showing %(shown)s of %(total)s rows.")
+                % {"shown": self._HTML_PREVIEW_ROWS, "total": len(rows)}
+            )
         data_rows = []
         for row in rows:
             record = {}
@@ -842,8 +1233,126 @@ class DevOpsNotebookCell(models.Model):
             "text": "\n".join(text_lines),
             "html": html,
             "data": data_rows,
+            "schema": self._result_schema(headers, rows, types),
+        }
+
+    def _result_schema(self, headers, rows, types=None):
+        """Column names, value types and display widths of a query result.
+
+        ``types`` are the driver's column types; unknown ones are inferred
+        from the values.
+        """
+        sample = rows[: self._HTML_PREVIEW_ROWS]
+        schema = []
+        for index, header in enumerate(headers):
+            values = [row[index] for row in sample if row[index] is not None]
+            if types and types[index]:
+                col_type = types[index]
+            elif values and all(isinstance(v, bool) for v in values):
+                col_type = "boolean"
+            elif values and all(isinstance(v, (int, float, Decimal)) for v in values):
+                col_type = "number"
+            elif values and all(isinstance(v, (date, datetime)) for v in values):
+                col_type = "datetime"
+            else:
+                col_type = "string"
+            chars = max([len(str(header))] + [len(self._stringify_value(v)) for v in values])
+            schema.append(
+                {"name": header, "type": col_type, "width": min(max(chars, 4), 40) * 8 + 16}
+            )
+        return schema
+
+    def _normalize_result(self, data):
+        """Turn a set_result() value into JSON rows and their schema."""
+        if hasattr(data, "to_json"):
+            # pandas DataFrame
+            data = json.loads(data.to_json(orient="records", date_format="iso"))
+        rows = json.loads(json.dumps(data, default=str))
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            return rows, False
+        headers = list(dict.fromkeys(key for row in rows for key in row))
+        schema = self._result_schema(headers, [tuple(row.get(h) for h in headers) for row in rows])
+        return rows, schema
+
+    def _build_chart(self, rows):
+        """Chart payload for the stored result, downsampled to chart_max_points."""
+        y_columns = [col.strip() for col in (self.chart_y or "").split(",") if col.strip()]
+        if not self.chart_type or not self.chart_x or not y_columns:
+            return False
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            return False
+        x_kind, xs = _chart_axis([row.get(self.chart_x) for row in rows])
+        threshold = self.chart_max_points or 2000
+        downsample = lttb if self.chart_type == "line" else minmax
+        series = []
+        for column in y_columns:
+            points = []
+            for index, row in enumerate(rows):
+                y = _to_float(row.get(column))
+                if y is not None and xs[index] is not None:
+                    points.append((xs[index], y))
+            if x_kind != "category":
+                points.sort(key=lambda point: point[0])
+            sampled = downsample(points, threshold)
+            if x_kind == "category":
+                sampled = [(str(rows[int(x)].get(self.chart_x)), y) for x, y in sampled]
+            series.append(
+                {"name": column, "total": len(points), "points": [list(p) for p in sampled]}
+            )
+        return {
+            "type": self.chart_type,
+            "x": self.chart_x,
+            "x_kind": x_kind,
+            "series": series,
         }
 
+    def write(self, vals):
+        res = super().write(vals)
+        if self._CHART_FIELDS.intersection(vals) and "output_chart" not in vals:
+            # Rebuild from the stored result; nothing is re-queried.
+            for cell in self.filtered("output_data"):
+                cell.output_chart = cell._build_chart(cell.output_data)
+        return res
+
+    def get_result_page(self, offset=0, limit=100, order=None, filters=None):
+        """Return one page of the stored result for the result grid widget.
+
+        ``order`` is a column name optionally followed by ``desc``;
+        ``filters`` maps column names to case-insensitive substrings.
+        """
+        self.ensure_one()
+        schema = self.output_schema or []
+        names = [col["name"] for col in schema]
+        rows = self.output_data if isinstance(self.output_data, list) else []
+        for name, needle in (filters or {}).items():
+            if needle and name in names:
+                needle = str(needle).lower()
+                rows = [row for row in rows if needle in str(row.get(name, "")).lower()]
+        if order:
+            name, _sep, direction = order.partition(" ")
+            if name in names:
+                numeric = schema[names.index(name)]["type"] == "number"
+                rows = sorted(
+                    rows,
+                    key=lambda row: self._grid_sort_key(row.get(name), numeric),
+                    reverse=direction.strip().lower() == "desc",
+                )
+        offset = max(int(offset or 0), 0)
+        limit = min(max(int(limit or 100), 1), self._RESULT_PAGE_MAX)
+        return {
+            "total": len(rows),
+            "rows": [[row.get(name) for name in names] for row in rows[offset:offset + limit]],
+        }
+
+    @staticmethod
+    def _grid_sort_key(value, numeric):
+        if numeric:
+            try:
+                return (0, float(value))
+            except (TypeError, ValueError):
+                return (1, 0.0)
+        return (0, str(value or ""))
+
     def _stringify_value(self, value):
         if value is None:
             return ""
@@ -951,6 +1460,14 @@ class ProjectProject(models.Model):
         string="Default Notebook Data Source",
         help="Default data source when creating notebooks under this project.",
     )
+    notebook_run_retention_days = fields.Integer(
+        string="Keep Notebook Run Details (days)",
+        help="Default run detail retention for notebooks of this project; 0 uses the global setting.",
+    )
+    notebook_run_summary_retention_days = fields.Integer(
+        string="Keep Notebook Run Summaries (days)",
+        help="Default daily summary retention for notebooks of this project; 0 uses the global setting.",
+    )
 
 
 class DevOpsNotebookSchedule(models.Model):
@@ -971,6 +1488,33 @@ class DevOpsNotebookSchedule(models.Model):
         string="Start", required=True, default=lambda self: fields.Datetime.now()
     )
     end_datetime = fields.Datetime(string="End")
+    schedule_type = fields.Selection(
+        [("interval", "Fixed Interval"), ("cron", "Cron Expression")],
+        string="Schedule Type",
+        default="interval",
+        required=True,
+    )
+    cron_expression = fields.Char(
+        help="Five fields: minute hour day-of-month month day-of-week, "
+        "e.g. '0 7 * * 1-5' for weekdays at 07:00.",
+    )
+    tz = fields.Selection(
+        _tz_get,
+        string="Timezone",
+        default=lambda self: self.env.user.tz or "UTC",
+        help="Wall-clock timezone for cron expressions and day/week/month intervals.",
+    )
+    catchup_policy = fields.Selection(
+        [
+            ("once", "Run Once"),
+            ("all", "Run Every Missed Slot"),
+            ("skip", "Skip Missed Runs"),
+        ],
+        string="After Downtime",
+        default="once",
+        required=True,
+        help="What to do when slots were missed, e.g. because the server was down.",
+    )
     interval_number = fields.Integer(string="Every", default=1, required=True)
     interval_type = fields.Selection(
         [
@@ -987,22 +1531,144 @@ class DevOpsNotebookSchedule(models.Model):
     active = fields.Boolean(default=True)
     last_run = fields.Datetime(readonly=True)
     run_count = fields.Integer(readonly=True)
+    stagger_seconds = fields.Integer(
+        string="Stagger Window (s)",
+        default=lambda self: int(
+            self.env["ir.config_parameter"].sudo().get_param("devops.schedule_stagger_seconds") or 0
+        ),
+        help="Shift this schedule's runs by a fixed offset within this window, "
+        "so schedules created together do not all fire at the same second.",
+    )
+    overlap_policy = fields.Selection(
+        [
+            ("skip", "Skip New Run"),
+            ("queue", "Wait For Previous Run"),
+            ("cancel_previous", "Cancel Previous Run"),
+        ],
+        string="If Still Running",
+        default="skip",
+        required=True,
+        help="What to do when this notebook is still running as the next run is due.",
+    )
 
-    @api.depends("start_datetime", "interval_number", "interval_type", "last_run", "active")
+    _OVERLAP_RETRY_SECONDS = 60
+    _DISPATCHER_CRONS = (
+        "project_notebook.ir_cron_devops_notebook_schedule",
+        "project_notebook.ir_cron_devops_notebook_schedule_worker_2",
+        "project_notebook.ir_cron_devops_notebook_schedule_worker_3",
+    )
+    _ARM_FIELDS = {
+        "active",
+        "start_datetime",
+        "end_datetime",
+        "interval_number",
+        "interval_type",
+        "schedule_type",
+        "cron_expression",
+        "tz",
+        "stagger_seconds",
+        "last_run",
+        "next_run",
+    }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self._arm_dispatchers()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self._ARM_FIELDS.intersection(vals):
+            self._arm_dispatchers()
+        return res
+
+    @api.depends(
+        "start_datetime",
+        "interval_number",
+        "interval_type",
+        "schedule_type",
+        "cron_expression",
+        "tz",
+        "stagger_seconds",
+        "last_run",
+        "active",
+    )
     def _compute_next_run(self):
         for rec in self:
-            if not rec.active:
+            if not rec.active or not rec.start_datetime:
+                rec.next_run = False
+                continue
+            if rec.schedule_type == "cron" and not rec.cron_expression:
                 rec.next_run = False
                 continue
             now = fields.Datetime.now()
-            base = rec.last_run or rec.start_datetime
             # If first run and start is in the past/now, run immediately
-            if not rec.last_run and base and base <= now:
-                rec.next_run = now
+            if rec.schedule_type == "interval" and not rec.last_run and rec.start_datetime <= now:
+                rec.next_run = now + timedelta(seconds=rec._get_stagger_offset())
             else:
-                rec.next_run = rec._add_interval(base)
+                rec.next_run = rec._next_run_from(
+                    max(now, rec.start_datetime - timedelta(seconds=1))
+                )
+
+    @api.constrains("schedule_type", "cron_expression")
+    def _check_cron_expression(self):
+        for rec in self:
+            if rec.schedule_type != "cron":
+                continue
+            try:
+                CronExpression(rec.cron_expression).next_after(fields.Datetime.now())
+            except ValueError as exc:
+                raise ValidationError(
+                    _("Invalid cron expression %r: %s") % (rec.cron_expression, exc)
+                )
 
-    def _add_interval(self, dt):
+    def _get_stagger_offset(self):
+        """Stable per-schedule offset (seconds) within the stagger window."""
+        window = max(self.stagger_seconds or 0, 0)
+        if not window or not self.id:
+            return 0
+        digest = hashlib.sha1(f"{self._name},{self.id}".encode()).hexdigest()
+        return int(digest, 16) % window
+
+    def _next_run_from(self, dt):
+        """First run after ``dt``: the next wall-clock slot plus the stagger offset."""
+        if not dt:
+            return False
+        offset = timedelta(seconds=self._get_stagger_offset())
+        return self._next_slot_after(dt - offset) + offset
+
+    def _next_slot_after(self, dt):
+        """First slot strictly after the UTC datetime ``dt``.
+
+        Slots are wall-clock times (cron matches, or start + k * interval), so
+        they do not drift with run durations.
+        """
+        if self.schedule_type == "cron":
+            tz = pytz.timezone(self.tz or "UTC")
+            local = pytz.utc.localize(dt).astimezone(tz).replace(tzinfo=None)
+            slot = CronExpression(self.cron_expression).next_after(local)
+            return tz.localize(slot).astimezone(pytz.utc).replace(tzinfo=None)
+        start = self.start_datetime
+        if dt < start:
+            return start
+        # Calendar units follow the local clock (07:00 stays 07:00 across DST).
+        calendar = self.interval_type in ("days", "weeks", "months")
+        tz = pytz.timezone(self.tz or "UTC") if calendar else pytz.utc
+        local_start = pytz.utc.localize(start).astimezone(tz).replace(tzinfo=None)
+        local_dt = pytz.utc.localize(dt).astimezone(tz).replace(tzinfo=None)
+        step = self._add_interval(local_start) - local_start
+        count = max(int((local_dt - local_start) / step), 0)
+        slot = self._add_interval(local_start, count)
+        while slot <= local_dt:
+            count += 1
+            slot = self._add_interval(local_start, count)
+        while count > 0 and self._add_interval(local_start, count - 1) > local_dt:
+            count -= 1
+            slot = self._add_interval(local_start, count)
+        return tz.localize(slot).astimezone(pytz.utc).replace(tzinfo=None)
+
+    def _add_interval(self, dt, count=1):
         if not dt:
             return False
         itype = self.interval_type
@@ -1011,9 +1677,20 @@ class DevOpsNotebookSchedule(models.Model):
             # Guard for legacy records; normalize to minutes
             itype = "minutes"
             inum = self._normalize_interval_to_minutes(inum)
-        delta_args = {itype: inum}
+        delta_args = {itype: inum * count}
         return fields.Datetime.add(dt, **delta_args)
 
+    def _due_slot(self):
+        """Slot currently being served, or None when the schedule is not due."""
+        if not self.next_run or self.next_run > fields.Datetime.now():
+            return None
+        return self.next_run - timedelta(seconds=self._get_stagger_offset())
+
+    def _is_catching_up(self):
+        """True when at least one more slot passed since the due one (downtime)."""
+        slot = self._due_slot()
+        return slot is not None and self._next_slot_after(slot) <= fields.Datetime.now()
+
     def action_run_now(self):
         for schedule in self:
             schedule._run_once()
@@ -1021,6 +1698,9 @@ class DevOpsNotebookSchedule(models.Model):
     def _run_once(self):
         if not self.notebook_id:
             return
+        # Replaying every missed slot continues from the one just served;
+        # otherwise the next run is the first slot after now.
+        catch_up_from = self.catchup_policy == "all" and self._due_slot() and self.next_run
         ctx = dict(self.env.context, from_schedule=True, schedule_id=self.id)
         self.notebook_id.with_context(ctx).action_run_all()
         now = fields.Datetime.now()
@@ -1028,23 +1708,155 @@ class DevOpsNotebookSchedule(models.Model):
             {
                 "last_run": now,
                 "run_count": (self.run_count or 0) + 1,
-                "next_run": self._add_interval(now),
+                "next_run": self._next_run_from(catch_up_from or now),
             }
         )
 
     @api.model
-    def _cron_run_schedules(self):
+    def _cron_run_schedules(self, limit=200):
+        """Run due schedules, each claimed and executed in its own transaction.
+
+        Schedules are claimed with ``FOR UPDATE SKIP LOCKED``, so the
+        dispatcher crons can drain the queue side by side without picking
+        the same schedule twice, and a failing notebook only rolls back its
+        own run.
+        """
+        if self._due_count() > 1:
+            # More than one schedule is due: wake the helper dispatchers too.
+            for cron in self._get_dispatcher_crons():
+                cron._trigger()
+        processed = 0
+        while processed < limit:
+            with self.pool.cursor() as cr:
+                schedule = self.with_env(self.env(cr=cr))._claim_due_schedule()
+                if not schedule:
+                    break
+                schedule._dispatch()
+            processed += 1
+        self.env["ir.cron"]._notify_progress(done=processed, remaining=self._due_count())
+        self._arm_dispatchers()
+        return processed
+
+    @api.model
+    def _due_count(self):
+        return self.search_count(
+            [("active", "=", True), ("next_run", "!=", False), ("next_run", "<=", fields.Datetime.now())]
+        )
+
+    @api.model
+    def _get_dispatcher_crons(self):
+        crons = self.env["ir.cron"].sudo()
+        for xmlid in self._DISPATCHER_CRONS:
+            # Schedule users cannot read ir.cron: check it as superuser.
+            cron = self.env.ref(xmlid, raise_if_not_found=False)
+            cron = cron and cron.sudo()
+            if cron and cron.active:
+                crons |= cron
+        return crons
+
+    @api.model
+    def _arm_dispatchers(self):
+        """Wake the primary dispatcher exactly when the earliest schedule is due.
+
+        The dispatcher crons only poll as a daily safety net; wakeups come from
+        ``ir.cron`` triggers armed here whenever a schedule changes or runs.
+        """
+        first = self.sudo().search(
+            [("active", "=", True), ("next_run", "!=", False)], order="next_run", limit=1
+        )
+        cron = self._get_dispatcher_crons()[:1]
+        if not first or not cron:
+            return
+        call_at = max(first.next_run, fields.Datetime.now())
+        if cron.nextcall <= call_at:
+            return
+        pending = self.env["ir.cron.trigger"].sudo().search_count(
+            [("cron_id", "=", cron.id), ("call_at", "<=", call_at)], limit=1
+        )
+        if not pending:
+            cron._trigger(call_at)
+
+    @api.model
+    def _claim_due_schedule(self):
+        """Lock and return the most overdue schedule no other worker holds."""
+        self.env.cr.execute(
+            """
+            SELECT id
+              FROM devops_notebook_schedule
+             WHERE active AND next_run IS NOT NULL AND next_run <= %s
+          ORDER BY next_run
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+            """,
+            (fields.Datetime.now(),),
+        )
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+
+    def _dispatch(self):
+        """Run a claimed schedule, recording a failed run instead of raising."""
+        self.ensure_one()
         now = fields.Datetime.now()
-        domain = [
-            ("active", "=", True),
-            ("next_run", "!=", False),
-            ("next_run", "<=", now),
-        ]
-        for schedule in self.search(domain, limit=200):
-            if schedule.end_datetime and schedule.end_datetime < now:
-                schedule.active = False
-                continue
-            schedule._run_once()
+        if self.end_datetime and self.end_datetime < now:
+            self.active = False
+            return
+        if self.catchup_policy == "skip" and self._is_catching_up():
+            self._record_run("skipped", _("Skipped: runs missed during downtime are not replayed."))
+            self.next_run = self._next_run_from(now)
+            return
+        notebook = self.notebook_id
+        if not notebook._try_run_lock():
+            self._handle_overlap()
+            return
+        if not notebook.data_source_id._try_acquire_run_slot():
+            # Source is at its concurrency cap: try again shortly.
+            self._postpone()
+            return
+        try:
+            with self.env.cr.savepoint():
+                self._run_once()
+        except Exception as exc:
+            _logger.exception("Scheduled run of notebook %s failed", notebook.id)
+            self.env.invalidate_all()
+            cancelled = isinstance(exc, (psycopg2.errors.QueryCanceled, NotebookRunCancelled))
+            self._record_run("cancelled" if cancelled else "failed", traceback.format_exc())
+            now = fields.Datetime.now()
+            self.write(
+                {
+                    "last_run": now,
+                    "run_count": (self.run_count or 0) + 1,
+                    "next_run": self._next_run_from(now),
+                }
+            )
+
+    def _record_run(self, state, message):
+        now = fields.Datetime.now()
+        return self.env["devops.notebook.run"].sudo().create(
+            {
+                "name": f"{self.notebook_id.name} - {fields.Datetime.to_string(now)}",
+                "notebook_id": self.notebook_id.id,
+                "schedule_id": self.id,
+                "trigger_type": "schedule",
+                "user_id": self.env.user.id,
+                "start_datetime": now,
+                "end_datetime": now,
+                "state": state,
+                "message": message,
+            }
+        )
+
+    def _postpone(self):
+        self.next_run = fields.Datetime.now() + timedelta(seconds=self._OVERLAP_RETRY_SECONDS)
+
+    def _handle_overlap(self):
+        """Apply the overlap policy while the previous run still holds the notebook."""
+        if self.overlap_policy == "skip":
+            self._record_run("skipped", _("Skipped: the previous run was still in progress."))
+            self.next_run = self._next_run_from(fields.Datetime.now())
+            return
+        if self.overlap_policy == "cancel_previous":
+            self.notebook_id._request_cancel()
+        self._postpone()
 
     def _normalize_interval_to_minutes(self, interval_number=None):
         number = interval_number if interval_number is not None else self.interval_number
@@ -1078,13 +1890,25 @@ class DevOpsNotebookSchedule(models.Model):
                 raise ValueError(_("A notebook can only have one active schedule."))
 
 
+class DevOpsNotebookCancelRequest(models.Model):
+    _name = "devops.notebook.cancel.request"
+    _description = "Notebook Run Cancel Request"
+
+    notebook_id = fields.Many2one(
+        "devops.notebook", required=True, ondelete="cascade", index=True
+    )
+    requested_at = fields.Datetime(required=True, default=fields.Datetime.now)
+
+
 class DevOpsNotebookRun(models.Model):
     _name = "devops.notebook.run"
     _description = "Notebook Run History"
     _order = "start_datetime desc"
 
     name = fields.Char(required=True)
-    notebook_id = fields.Many2one("devops.notebook", required=True, ondelete="cascade")
+    notebook_id = fields.Many2one(
+        "devops.notebook", required=True, ondelete="cascade", index=True
+    )
     schedule_id = fields.Many2one("devops.notebook.schedule", ondelete="set null")
     trigger_type = fields.Selection(
         [("manual", "Manual"), ("schedule", "Scheduled")],
@@ -1099,11 +1923,16 @@ class DevOpsNotebookRun(models.Model):
         readonly=True,
     )
     state = fields.Selection(
-        [("success", "Success"), ("failed", "Failed")],
+        [
+            ("success", "Success"),
+            ("failed", "Failed"),
+            ("skipped", "Skipped"),
+            ("cancelled", "Cancelled"),
+        ],
         string="Status",
         default="success",
     )
-    start_datetime = fields.Datetime(required=True)
+    start_datetime = fields.Datetime(required=True, index=True)
     end_datetime = fields.Datetime()
     duration_seconds = fields.Float(string="Duration (s)")
     user_id = fields.Many2one("res.users", string="Triggered By")
@@ -1118,6 +1947,17 @@ class DevOpsNotebookRun(models.Model):
         string="Mails",
         readonly=True,
     )
+    mail_sent_count = fields.Integer(string="Mails Sent", readonly=True)
+    mail_failed_count = fields.Integer(string="Mails Failed", readonly=True)
+
+    def init(self):
+        # Serves both the per-notebook history list and the retention cron.
+        tools.create_index(
+            self._cr,
+            "devops_notebook_run_notebook_start_idx",
+            self._table,
+            ["notebook_id", "start_datetime DESC"],
+        )
 
     def action_open_mails(self):
         self.ensure_one()
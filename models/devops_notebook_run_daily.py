@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+class DevOpsNotebookRunDaily(models.Model):
+    _name = "devops.notebook.run.daily"
+    _description = "Notebook Run Daily Summary"
+    _order = "date desc, notebook_id"
+
+    notebook_id = fields.Many2one(
+        "devops.notebook", required=True, ondelete="cascade", index=True
+    )
+    project_id = fields.Many2one(
+        "project.project",
+        string="Project",
+        related="notebook_id.project_id",
+        store=True,
+        readonly=True,
+    )
+    date = fields.Date(required=True, index=True)
+    run_count = fields.Integer(string="Runs")
+    failed_count = fields.Integer(string="Failed Runs")
+    duration_total = fields.Float(string="Total Duration (s)")
+    duration_avg = fields.Float(string="Avg Duration (s)")
+    duration_p50 = fields.Float(string="P50 Duration (s)")
+    duration_p90 = fields.Float(string="P90 Duration (s)")
+    duration_p99 = fields.Float(string="P99 Duration (s)")
+    duration_max = fields.Float(string="Max Duration (s)")
+
+    _sql_constraints = [
+        (
+            "notebook_date_uniq",
+            "unique(notebook_id, date)",
+            "Only one daily summary per notebook and day is allowed.",
+        ),
+    ]
+
+    @api.model
+    def _get_retention_params(self):
+        ICP = self.env["ir.config_parameter"].sudo()
+        return (
+            int(ICP.get_param("devops.run_retention_days") or 0),
+            int(ICP.get_param("devops.run_summary_retention_days") or 0),
+        )
+
+    @api.model
+    def _cron_compact_run_history(self, bucket_limit=50, batch_size=5000):
+        """Roll up expired run history into daily summaries, then purge.
+
+        Every call handles at most ``bucket_limit`` (notebook, day) buckets or
+        ``batch_size`` runs, so the cron transaction stays short; remaining
+        work is reported to the cron so it is picked up again right away.
+        """
+        default_days, default_summary_days = self._get_retention_params()
+        today = fields.Date.context_today(self)
+        by_cutoff = {}
+        summary_by_cutoff = {}
+        for notebook in self.env["devops.notebook"].sudo().with_context(active_test=False).search([]):
+            days, summary_days = notebook._get_run_retention(default_days, default_summary_days)
+            if days > 0:
+                by_cutoff.setdefault(today - timedelta(days=days), []).append(notebook.id)
+            if summary_days > 0:
+                summary_by_cutoff.setdefault(
+                    today - timedelta(days=summary_days), []
+                ).append(notebook.id)
+
+        buckets = []
+        for cutoff, notebook_ids in by_cutoff.items():
+            self.env.cr.execute(
+                """
+                SELECT notebook_id, start_datetime::date AS day, COUNT(*)
+                  FROM devops_notebook_run
+                 WHERE notebook_id = ANY(%s) AND start_datetime < %s
+              GROUP BY 1, 2
+              ORDER BY 2
+                 LIMIT %s
+                """,
+                (notebook_ids, cutoff, bucket_limit + 1),
+            )
+            buckets += self.env.cr.fetchall()
+        buckets.sort(key=lambda bucket: bucket[1])
+
+        done = rows = 0
+        for notebook_id, day, count in buckets[:bucket_limit]:
+            if done and rows + count > batch_size:
+                break
+            self._compact_bucket(notebook_id, day)
+            done += 1
+            rows += count
+        remaining = len(buckets) - done
+
+        Summary = self.sudo()
+        for cutoff, notebook_ids in summary_by_cutoff.items():
+            expired = Summary.search(
+                [("notebook_id", "in", notebook_ids), ("date", "<", cutoff)],
+                limit=batch_size,
+            )
+            if len(expired) == batch_size:
+                remaining += 1
+            done += len(expired)
+            expired.unlink()
+
+        self.env["ir.cron"]._notify_progress(done=done, remaining=remaining)
+        return done
+
+    def _compact_bucket(self, notebook_id, day):
+        """Merge the runs of one notebook/day into its summary and delete them."""
+        start = fields.Datetime.to_datetime(day)
+        end = start + timedelta(days=1)
+        self.env.cr.execute(
+            """
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE state = 'failed'),
+                   COALESCE(SUM(duration_seconds), 0),
+                   COALESCE(MAX(duration_seconds), 0),
+                   COALESCE(percentile_cont(0.5) WITHIN GROUP (ORDER BY duration_seconds), 0),
+                   COALESCE(percentile_cont(0.9) WITHIN GROUP (ORDER BY duration_seconds), 0),
+                   COALESCE(percentile_cont(0.99) WITHIN GROUP (ORDER BY duration_seconds), 0)
+              FROM devops_notebook_run
+             WHERE notebook_id = %s AND start_datetime >= %s AND start_datetime < %s
+            """,
+            (notebook_id, start, end),
+        )
+        count, failed, total, dmax, p50, p90, p99 = self.env.cr.fetchone()
+        if not count:
+            return
+        vals = {
+            "run_count": count,
+            "failed_count": failed,
+            "duration_total": total,
+            "duration_max": dmax,
+            "duration_p50": p50,
+            "duration_p90": p90,
+            "duration_p99": p99,
+        }
+        summary = self.sudo().search(
+            [("notebook_id", "=", notebook_id), ("date", "=", day)], limit=1
+        )
+        if summary:
+            # Runs compacted earlier for the same day (e.g. after the retention
+            # was shortened): counts add up exactly, percentiles are weighted.
+            old, new = summary.run_count, count
+            weight = old + new
+            for key in ("duration_p50", "duration_p90", "duration_p99"):
+                vals[key] = (summary[key] * old + vals[key] * new) / weight
+            vals.update(
+                {
+                    "run_count": weight,
+                    "failed_count": summary.failed_count + failed,
+                    "duration_total": summary.duration_total + total,
+                    "duration_max": max(summary.duration_max, dmax),
+                }
+            )
+        vals["duration_avg"] = vals["duration_total"] / vals["run_count"]
+        if summary:
+            summary.write(vals)
+        else:
+            self.sudo().create(dict(vals, notebook_id=notebook_id, date=day))
+        self.env["devops.notebook.run"].sudo().search(
+            [
+                ("notebook_id", "=", notebook_id),
+                ("start_datetime", ">=", start),
+                ("start_datetime", "<", end),
+            ]
+        ).unlink()
@@ -0,0 +1,224 @@
+"""Federated SQL cells: join data source tables and cell results locally.
+
+A federated cell is SQL run on an embedded engine (DuckDB when it and
+pyarrow are installed, SQLite otherwise). After FROM/JOIN,
+``<alias>.<table>`` or ``<alias>.<schema>.<table>`` names a table of the
+data source with that SQL alias, and ``cell_<sequence>`` names the result
+of an earlier cell.
+
+Each source table is fetched once. Only the columns the query mentions
+are fetched (known from the stored catalog). Simple comparisons of the
+WHERE clause are pushed down to the source. Rows are loaded into the
+engine column by column.
+"""
+import re
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+
+from .data_source_drivers import strip_sql_noise
+
+_IDENT = r"[A-Za-z_][A-Za-z0-9_$]*"
+_SOURCE_REF = re.compile(
+    rf"\b(?:from|join)\s+({_IDENT})\.((?:{_IDENT}\.)?{_IDENT})\b(?:\s+(?:as\s+)?({_IDENT}))?",
+    re.I,
+)
+_CELL_REF = re.compile(r"\bcell_(\d+)\b", re.I)
+_KEYWORDS = {
+    "where", "join", "on", "left", "right", "inner", "outer", "full", "cross", "natural",
+    "group", "order", "limit", "offset", "fetch", "having", "union", "except", "intersect",
+    "using", "window",
+}
+_LITERAL = r"-?\d+(?:\.\d+)?|'(?:[^']|'')*'"
+_TEXT_TYPES = ("char", "text", "string", "clob")
+
+SourceRef = namedtuple("SourceRef", "alias schema table qualifier start end")
+
+
+def find_source_refs(query, aliases):
+    """References to tables of the data sources whose alias is in ``aliases``."""
+    refs = []
+    for match in _SOURCE_REF.finditer(strip_sql_noise(query)):
+        alias = match.group(1).lower()
+        if alias not in aliases:
+            continue
+        parts = match.group(2).split(".")
+        schema, table = (parts[0], parts[1]) if len(parts) == 2 else (None, parts[0])
+        qualifier = match.group(3)
+        if not qualifier or qualifier.lower() in _KEYWORDS:
+            qualifier = table
+        refs.append(SourceRef(alias, schema, table, qualifier, match.start(1), match.end(2)))
+    return refs
+
+
+def local_name(ref):
+    return "__".join(part for part in (ref.alias, ref.schema, ref.table) if part).lower()
+
+
+def rewrite_query(query, refs):
+    """Replace source references by the names of their local copies."""
+    for ref in sorted(refs, key=lambda ref: ref.start, reverse=True):
+        query = query[: ref.start] + local_name(ref) + query[ref.end :]
+    return query
+
+
+def referenced_cells(query):
+    return sorted({int(number) for number in _CELL_REF.findall(strip_sql_noise(query))})
+
+
+def needed_columns(query, refs, columns):
+    """Catalog columns the query can use, or ``None`` to fetch them all."""
+    text = strip_sql_noise(query)
+    if not columns or re.search(r"\bselect\s+(?:distinct\s+)?\*", text, re.I):
+        return None
+    for ref in refs:
+        if re.search(rf"\b{re.escape(ref.qualifier)}\s*\.\s*\*", text, re.I):
+            return None
+    if not all(re.fullmatch(r"\w+", name) for name, _type in columns):
+        return None
+    words = {word.lower() for word in re.findall(_IDENT, text)}
+    # COUNT(*) and friends still need rows: keep one column at least.
+    return [name for name, _type in columns if name.lower() in words] or [columns[0][0]]
+
+
+def pushdown_filters(query, ref, columns):
+    """Top-level ``qualifier.column <op> literal`` conditions safe to push down.
+
+    Only plain AND-ed comparisons of a single-SELECT query qualify; they
+    reject NULLs, so filtering the source early cannot change the result
+    even on the outer side of a join.
+    """
+    text = strip_sql_noise(query)
+    lowered = text.lower()
+    if (
+        len(re.findall(r"\bwhere\b", lowered)) != 1
+        or len(re.findall(r"\bselect\b", lowered)) != 1
+        or re.search(r"\b(?:or|not|between)\b", lowered)
+    ):
+        return []
+    match = re.search(
+        r"\bwhere\b(.*?)(?:\bgroup\s+by\b|\border\s+by\b|\blimit\b|\bhaving\b|\bwindow\b"
+        r"|\boffset\b|\bfetch\b|;|$)",
+        lowered,
+        re.S,
+    )
+    start, end = match.span(1)
+    cuts = [start]
+    for cut in re.finditer(r"\band\b", lowered[start:end]):
+        cuts += [start + cut.start(), start + cut.end()]
+    cuts.append(end)
+    types = {name.lower(): (name, (data_type or "").lower()) for name, data_type in columns}
+    qualifier = re.escape(ref.qualifier)
+    comparison = re.compile(
+        rf"\s*{qualifier}\.({_IDENT})\s*(=|<>|!=|<=|>=|<|>)\s*({_LITERAL})\s*", re.I
+    )
+    membership = re.compile(
+        rf"\s*{qualifier}\.({_IDENT})\s+in\s*\(\s*((?:{_LITERAL})(?:\s*,\s*(?:{_LITERAL}))*)\s*\)\s*",
+        re.I,
+    )
+    filters = []
+    for conjunct_start, conjunct_end in zip(cuts[::2], cuts[1::2]):
+        conjunct = query[conjunct_start:conjunct_end]
+        found = comparison.fullmatch(conjunct)
+        if found:
+            column, operator, literals = found.group(1), found.group(2), [found.group(3)]
+            operator = "<>" if operator == "!=" else operator
+        else:
+            found = membership.fullmatch(conjunct)
+            if not found:
+                continue
+            column, operator = found.group(1), "IN"
+            literals = re.findall(_LITERAL, found.group(2))
+        name, data_type = types.get(column.lower(), (None, ""))
+        if not name:
+            continue
+        is_text = any(marker in data_type for marker in _TEXT_TYPES)
+        if any(literal.startswith("'") for literal in literals) != is_text:
+            # Only compare numbers with numbers and text with text, so the
+            # source never applies its own implicit casts.
+            continue
+        if operator == "IN":
+            filters.append("%s IN (%s)" % (name, ", ".join(literals)))
+        else:
+            filters.append("%s %s %s" % (name, operator, literals[0]))
+    return filters
+
+
+def remote_query(ref, columns, filters):
+    table = "%s.%s" % (ref.schema, ref.table) if ref.schema else ref.table
+    query = "SELECT %s FROM %s" % (", ".join(columns) if columns else "*", table)
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+    return query
+
+
+class LocalEngine:
+    """Embedded database the federated query finally runs on."""
+
+    def __init__(self):
+        try:
+            # Tables are handed to DuckDB as Arrow tables, so both are needed.
+            import duckdb
+            import pyarrow  # noqa: F401
+        except ImportError:
+            import sqlite3
+
+            self.kind = "sqlite"
+            self.conn = sqlite3.connect(":memory:")
+        else:
+            self.kind = "duckdb"
+            self.conn = duckdb.connect()
+
+    def close(self):
+        self.conn.close()
+
+    def load(self, name, headers, batches, max_rows):
+        """Create table ``name`` from row batches; returns the row count."""
+        columns = [[] for _header in headers]
+        count = 0
+        for batch in batches:
+            count += len(batch)
+            if count > max_rows:
+                raise ValueError(
+                    "%s returned more than %s rows; add filters to the query." % (name, max_rows)
+                )
+            for values, column in zip(zip(*batch), columns):
+                column.extend(values)
+        self._create(name, list(headers), columns)
+        return count
+
+    def load_records(self, name, records, max_rows):
+        """Create table ``name`` from a list of dicts (a cell result)."""
+        headers = []
+        for record in records[:1000]:
+            headers += [key for key in record if key not in headers]
+        headers = headers or ["value"]
+        rows = [tuple(record.get(header) for header in headers) for record in records]
+        return self.load(name, headers, [rows] if rows else [], max_rows)
+
+    def _create(self, name, headers, columns):
+        if self.kind == "duckdb":
+            import pyarrow
+
+            self.conn.register(name, pyarrow.table(dict(zip(headers, columns))))
+            return
+        quoted = ", ".join('"%s"' % header.replace('"', '""') for header in headers)
+        self.conn.execute('CREATE TABLE "%s" (%s)' % (name, quoted))
+        placeholders = ", ".join("?" * len(headers))
+        columns = [[self._sqlite_value(value) for value in column] for column in columns]
+        self.conn.executemany(
+            'INSERT INTO "%s" VALUES (%s)' % (name, placeholders), list(zip(*columns))
+        )
+
+    @staticmethod
+    def _sqlite_value(value):
+        if value is None or isinstance(value, (int, float, str, bytes)):
+            return value
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return str(value)
+
+    def execute(self, query):
+        return self.conn.execute(query)
@@ -1,4 +1,5 @@
-from odoo import api, fields, models
+from odoo import api, fields, models, tools
+from odoo.tools import frozendict
 
 
 class MailMail(models.Model):
@@ -8,15 +9,38 @@ class MailMail(models.Model):
         "devops.notebook",
         string="Notebook",
         compute="_compute_notebook",
-        store=False,
+        store=True,
+        index=True,
+        ondelete="set null",
     )
 
-    @api.depends("res_model", "res_id")
+    @api.depends("model", "res_id")
     def _compute_notebook(self):
-        notebooks = self.env["devops.notebook"].browse()
+        linked = self.filtered(lambda mail: mail.model == "devops.notebook" and mail.res_id)
+        existing = set(self.env["devops.notebook"].browse(set(linked.mapped("res_id"))).exists().ids)
         for mail in self:
-            notebook = notebooks.browse()
-            if mail.res_model == "devops.notebook" and mail.res_id:
-                nb = notebooks.browse(mail.res_id).exists()
-                notebook = nb if nb else notebooks.browse()
-            mail.notebook_id = notebook
+            mail.notebook_id = mail.res_id if mail in linked and mail.res_id in existing else False
+
+    @api.model
+    @tools.ormcache()
+    def _devops_mail_api_settings(self):
+        """Mail API settings, cached per database until settings are saved."""
+        ICP = self.env["ir.config_parameter"].sudo()
+
+        def to_int(key, default=0):
+            try:
+                return int(ICP.get_param(key) or default)
+            except ValueError:
+                return default
+
+        rate = to_int("devops.mail_api_rate_limit")
+        return frozendict(
+            {
+                "token": ICP.get_param("devops.mail_api_token") or "devops-mail-token",
+                "sender_user_id": to_int("devops.mail_sender_user_id"),
+                "mail_server_id": to_int("devops.mail_server_id"),
+                "rate_per_minute": rate,
+                "rate_burst": to_int("devops.mail_api_rate_burst") or rate,
+                "max_payload_bytes": to_int("devops.mail_api_max_payload_mb", 25) * 1024 * 1024,
+            }
+        )
@@ -1,4 +1,5 @@
-from odoo import fields, models
+from odoo import _, fields, models
+from odoo.exceptions import UserError
 from odoo.tools.safe_eval import safe_eval
 
 
@@ -40,3 +41,11 @@ class ProjectProject(models.Model):
         )
         action["context"] = ctx
         return action
+
+    def action_export_notebooks(self):
+        """Download every notebook of the selected projects as one archive."""
+        notebooks = self.env["devops.notebook"].search([("project_id", "in", self.ids)])
+        if not notebooks:
+            raise UserError(_("The selected projects have no notebooks."))
+        filename = "%s-notebooks.zip" % (self.name if len(self) == 1 else "projects")
+        return notebooks.action_export_notebooks(filename=filename)
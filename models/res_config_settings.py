@@ -11,6 +11,24 @@ class ResConfigSettings(models.TransientModel):
         config_parameter="devops.default_data_source_id",
     )
 
+    devops_run_retention_days = fields.Integer(
+        string="Keep Run Details (days)",
+        config_parameter="devops.run_retention_days",
+        help="Runs older than this are rolled up into daily summaries; 0 keeps them forever.",
+    )
+
+    devops_run_summary_retention_days = fields.Integer(
+        string="Keep Daily Summaries (days)",
+        config_parameter="devops.run_summary_retention_days",
+        help="Daily run summaries older than this are purged; 0 keeps them forever.",
+    )
+
+    devops_schedule_stagger_seconds = fields.Integer(
+        string="Default Schedule Stagger (s)",
+        config_parameter="devops.schedule_stagger_seconds",
+        help="Default stagger window for new schedules, spreading their runs over this many seconds.",
+    )
+
     devops_mail_api_token = fields.Char(
         string="DevOps Mail API Token",
         config_parameter="devops.mail_api_token",
@@ -18,6 +36,25 @@ class ResConfigSettings(models.TransientModel):
         help="用于 /mail/api/send_mail 接口的校验，不填则使用默认值。",
     )
 
+    devops_mail_api_rate_limit = fields.Integer(
+        string="API Rate Limit (per minute)",
+        config_parameter="devops.mail_api_rate_limit",
+        help="每个 token/客户端每分钟允许的请求数，超出返回 429；0 表示不限制。",
+    )
+
+    devops_mail_api_rate_burst = fields.Integer(
+        string="API Rate Burst",
+        config_parameter="devops.mail_api_rate_burst",
+        help="允许的瞬时突发请求数；0 表示与每分钟限额相同。",
+    )
+
+    devops_mail_api_max_payload_mb = fields.Integer(
+        string="API Max Payload (MB)",
+        config_parameter="devops.mail_api_max_payload_mb",
+        default=25,
+        help="单个请求的请求体及附件总大小上限，超出返回 413；0 表示不限制。",
+    )
+
     devops_mail_sender_user_id = fields.Many2one(
         "res.users",
         string="API Mail Sender (User)",
@@ -31,3 +68,9 @@ class ResConfigSettings(models.TransientModel):
         config_parameter="devops.mail_server_id",
         help="可选：指定已有的外发服务器；未指定则回退到系统默认。",
     )
+
+    def set_values(self):
+        super().set_values()
+        # The mail API caches these settings (see mail.mail); drop the cache
+        # in every worker once they are saved.
+        self.env.registry.clear_cache()
@@ -0,0 +1,229 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, onWillUpdateProps, useRef, useState } from "@odoo/owl";
+import { browser } from "@web/core/browser/browser";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+import { standardWidgetProps } from "@web/views/widgets/standard_widget_props";
+
+// Catalogs are kept per notebook for this long before being read again.
+const CATALOG_TTL = 5 * 60 * 1000;
+const MAX_SUGGESTIONS = 20;
+const SQL_KEYWORDS = new Set(["where", "on", "join", "left", "right", "inner", "outer", "group", "order", "limit"]);
+
+const catalogs = new Map();
+
+/** Stored catalog of the notebook's data source; never queries the source. */
+export function loadCatalog(orm, notebookId, { force = false } = {}) {
+    const cached = catalogs.get(notebookId);
+    if (!force && cached && Date.now() - cached.time < CATALOG_TTL) {
+        return cached.promise;
+    }
+    const promise = orm.call("devops.notebook", "get_catalog", [[notebookId]]);
+    catalogs.set(notebookId, { time: Date.now(), promise });
+    promise.catch(() => catalogs.delete(notebookId));
+    return promise;
+}
+
+/** Browsable tree of the tables and columns of the notebook's data source. */
+export class DevopsCatalogSidebar extends Component {
+    static template = "project_notebook.DevopsCatalogSidebar";
+    static props = { ...standardWidgetProps };
+
+    setup() {
+        this.orm = useService("orm");
+        this.notification = useService("notification");
+        this.state = useState({ tables: [], refreshedAt: false, filter: "", open: {}, loading: false });
+        onWillStart(() => this.load(this.props));
+        onWillUpdateProps((nextProps) => {
+            const source = (props) => props.record.data.data_source_id?.id;
+            if (source(nextProps) !== source(this.props)) {
+                return this.load(nextProps, { force: true });
+            }
+        });
+    }
+
+    async load(props, options = {}) {
+        if (!props.record.resId) {
+            return;
+        }
+        const catalog = await loadCatalog(this.orm, props.record.resId, options);
+        this.state.tables = catalog.tables;
+        this.state.refreshedAt = catalog.refreshed_at;
+    }
+
+    get visibleTables() {
+        const filter = this.state.filter.trim().toLowerCase();
+        if (!filter) {
+            return this.state.tables;
+        }
+        return this.state.tables.filter(
+            (table) =>
+                table.name.toLowerCase().includes(filter) ||
+                table.columns.some(([name]) => name.toLowerCase().includes(filter))
+        );
+    }
+
+    tableKey(table) {
+        return table.schema ? `${table.schema}.${table.name}` : table.name;
+    }
+
+    toggle(table) {
+        const key = this.tableKey(table);
+        this.state.open[key] = !this.state.open[key];
+    }
+
+    async copy(text) {
+        await browser.navigator.clipboard?.writeText(text);
+        this.notification.add(text, { type: "info" });
+    }
+
+    async refresh() {
+        this.state.loading = true;
+        try {
+            await this.orm.call("devops.notebook", "action_refresh_catalog", [[this.props.record.resId]]);
+            await this.load(this.props, { force: true });
+        } finally {
+            this.state.loading = false;
+        }
+    }
+}
+
+registry.category("view_widgets").add("devops_catalog_sidebar", {
+    component: DevopsCatalogSidebar,
+});
+
+/**
+ * Plain textarea for cell inputs that suggests table and column names from
+ * the stored catalog while typing SQL. ``alias.`` completes the columns of
+ * the table the alias points to.
+ */
+export class DevopsSqlInputField extends Component {
+    static template = "project_notebook.DevopsSqlInputField";
+    static props = { ...standardFieldProps, placeholder: { type: String, optional: true } };
+
+    setup() {
+        this.orm = useService("orm");
+        this.textarea = useRef("textarea");
+        this.state = useState({ suggestions: [], active: 0 });
+        this.catalog = null;
+    }
+
+    get value() {
+        return this.props.record.data[this.props.name] || "";
+    }
+
+    get isSql() {
+        return ["sql", "federated"].includes(this.props.record.data.cell_type);
+    }
+
+    async getCatalog() {
+        const notebook = this.props.record.data.notebook_id;
+        if (!notebook) {
+            return { tables: [] };
+        }
+        if (!this.catalog) {
+            this.catalog = await loadCatalog(this.orm, notebook.id);
+        }
+        return this.catalog;
+    }
+
+    onInput(ev) {
+        this.props.record.update({ [this.props.name]: ev.target.value });
+        if (this.isSql) {
+            this.suggest(ev.target);
+        }
+    }
+
+    /** Tables referenced in FROM/JOIN, keyed by lower-cased alias and name. */
+    referencedTables(text, tables) {
+        const byName = new Map();
+        for (const table of tables) {
+            byName.set(table.name.toLowerCase(), table);
+            if (table.schema) {
+                byName.set(`${table.schema}.${table.name}`.toLowerCase(), table);
+            }
+        }
+        const referenced = new Map();
+        const pattern = /\b(?:from|join)\s+([\w$."]+)(?:\s+(?:as\s+)?([\w$]+))?/gi;
+        for (const [, name, alias] of text.matchAll(pattern)) {
+            const table = byName.get(name.replaceAll('"', "").toLowerCase());
+            if (!table) {
+                continue;
+            }
+            referenced.set(table.name.toLowerCase(), table);
+            if (alias && !SQL_KEYWORDS.has(alias.toLowerCase())) {
+                referenced.set(alias.toLowerCase(), table);
+            }
+        }
+        return referenced;
+    }
+
+    async suggest(textarea) {
+        const before = textarea.value.slice(0, textarea.selectionStart);
+        const match = before.match(/(?:([\w$]+)\.)?([\w$]*)$/);
+        const [, qualifier, partial] = match;
+        if (!qualifier && partial.length < 2) {
+            this.state.suggestions = [];
+            return;
+        }
+        const { tables } = await this.getCatalog();
+        const needle = partial.toLowerCase();
+        let candidates;
+        if (qualifier) {
+            const table = this.referencedTables(textarea.value, tables).get(qualifier.toLowerCase());
+            const schemaTables = tables.filter((t) => t.schema.toLowerCase() === qualifier.toLowerCase());
+            candidates = [
+                ...(table ? table.columns.map(([name, type]) => ({ label: name, detail: type })) : []),
+                ...schemaTables.map((t) => ({ label: t.name, detail: t.type })),
+            ];
+        } else {
+            candidates = tables.map((t) => ({ label: t.name, detail: t.schema || t.type }));
+            const used = new Set(this.referencedTables(textarea.value, tables).values());
+            for (const table of used) {
+                candidates.push(...table.columns.map(([name, type]) => ({ label: name, detail: type })));
+            }
+        }
+        const seen = new Set();
+        this.state.suggestions = candidates
+            .filter((c) => c.label.toLowerCase().startsWith(needle) && !seen.has(c.label) && seen.add(c.label))
+            .slice(0, MAX_SUGGESTIONS);
+        this.state.active = 0;
+        this.partialLength = partial.length;
+    }
+
+    onKeydown(ev) {
+        const suggestions = this.state.suggestions;
+        if (!suggestions.length) {
+            return;
+        }
+        if (ev.key === "ArrowDown" || ev.key === "ArrowUp") {
+            const step = ev.key === "ArrowDown" ? 1 : -1;
+            this.state.active = (this.state.active + step + suggestions.length) % suggestions.length;
+        } else if (ev.key === "Enter" || ev.key === "Tab") {
+            this.accept(suggestions[this.state.active]);
+        } else if (ev.key === "Escape") {
+            this.state.suggestions = [];
+        } else {
+            return;
+        }
+        ev.preventDefault();
+        ev.stopPropagation();
+    }
+
+    accept(suggestion) {
+        const el = this.textarea.el;
+        const start = el.selectionStart - this.partialLength;
+        el.setRangeText(suggestion.label, start, el.selectionStart, "end");
+        this.state.suggestions = [];
+        this.props.record.update({ [this.props.name]: el.value });
+        el.focus();
+    }
+}
+
+registry.category("fields").add("devops_sql_input", {
+    component: DevopsSqlInputField,
+    supportedTypes: ["text"],
+    extractProps: ({ placeholder }) => ({ placeholder }),
+});
@@ -0,0 +1,332 @@
+/** @odoo-module **/
+
+import {
+    Component,
+    markup,
+    onMounted,
+    onWillStart,
+    onWillUnmount,
+    onWillUpdateProps,
+    useRef,
+    useState,
+} from "@odoo/owl";
+import { ConfirmationDialog } from "@web/core/confirmation_dialog/confirmation_dialog";
+import { serializeDateTime } from "@web/core/l10n/dates";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+import { DevopsResultChart } from "./result_chart";
+import { DevopsResultGrid } from "./result_grid";
+
+// Heavy per-cell fields, read only once a cell scrolls into view.
+const CONTENT_FIELDS = ["input_source", "output_html", "output_schema", "output_chart", "elapsed_ms"];
+// Fields every cell carries; matches devops.notebook.cell._LIGHT_FIELDS.
+const LIGHT_FIELDS = ["sequence", "cell_label", "cell_type", "status", "write_date"];
+// Start loading cells this far before they become visible.
+const PRELOAD_MARGIN = "800px 0px";
+
+function bySequence(a, b) {
+    return a.sequence - b.sequence || a.id - b.id;
+}
+
+export class NotebookCell extends Component {
+    static template = "project_notebook.NotebookCell";
+    static components = { DevopsResultChart, DevopsResultGrid };
+    static props = {
+        cell: Object,
+        content: { type: Object, optional: true },
+        collapsed: Boolean,
+        observe: Function,
+        unobserve: Function,
+        onToggle: Function,
+        onMove: Function,
+        onInsert: Function,
+        onRun: Function,
+        onEdit: Function,
+        onDelete: Function,
+    };
+
+    setup() {
+        this.root = useRef("root");
+        onMounted(() => this.props.observe(this.root.el, this.props.cell.id));
+        onWillUnmount(() => this.props.unobserve(this.root.el));
+    }
+
+    get data() {
+        return this.props.cell;
+    }
+
+    get inputHtml() {
+        return markup(this.props.content.input_source || "");
+    }
+
+    get outputHtml() {
+        return markup(this.props.content.output_html || "");
+    }
+
+    /** Minimal record shape expected by the result field widgets. */
+    outputRecord(fieldName) {
+        return {
+            resId: this.props.cell.id,
+            data: { [fieldName]: this.props.content[fieldName] },
+        };
+    }
+}
+
+/**
+ * Renders the cells of a notebook. Only light fields come with the form;
+ * inputs and outputs are read in batches as cells approach the viewport.
+ * Adding, moving, deleting and running cells patch the local cell list and
+ * re-read only the affected cells; changes made elsewhere (other tabs,
+ * scheduled runs) arrive on the notebook's bus channel.
+ */
+export class NotebookCellsField extends Component {
+    static template = "project_notebook.NotebookCells";
+    static components = { NotebookCell };
+    static props = { ...standardFieldProps };
+
+    setup() {
+        this.orm = useService("orm");
+        this.action = useService("action");
+        this.dialog = useService("dialog");
+        this.busService = useService("bus_service");
+        this.state = useState({
+            cells: [],
+            content: {},
+            collapsed: {},
+            allCollapsed: false,
+            newCellType: "richtext",
+        });
+        this.cellTypes = [];
+        this.pending = new Set();
+        this.elements = new WeakMap();
+        this.observer = new IntersectionObserver(this.onIntersect.bind(this), {
+            rootMargin: PRELOAD_MARGIN,
+        });
+        this.syncFromRecord(this.props);
+        this.onBusNotification = this.onBusNotification.bind(this);
+
+        onWillStart(async () => {
+            const fields = await this.orm.call("devops.notebook.cell", "fields_get", [["cell_type"]], {
+                attributes: ["selection"],
+            });
+            this.cellTypes = fields.cell_type.selection;
+        });
+        onWillUpdateProps((nextProps) => this.syncFromRecord(nextProps));
+        onMounted(() => {
+            if (this.channel) {
+                this.busService.addChannel(this.channel);
+            }
+            this.busService.subscribe("devops_notebook/cells", this.onBusNotification);
+        });
+        onWillUnmount(() => {
+            this.observer.disconnect();
+            this.busService.unsubscribe("devops_notebook/cells", this.onBusNotification);
+            if (this.channel) {
+                this.busService.deleteChannel(this.channel);
+            }
+        });
+    }
+
+    get cells() {
+        return this.state.cells;
+    }
+
+    get channel() {
+        return this.props.record.resId ? `devops_notebook_${this.props.record.resId}` : null;
+    }
+
+    /**
+     * Take the cell list from the form record, but only when the record was
+     * actually (re)loaded: the x2many keeps its old values after in-place
+     * edits, and any re-render of the form would otherwise undo them.
+     */
+    syncFromRecord(props) {
+        const records = props.record.data[props.name].records;
+        const cells = records.map((record) => ({
+            id: record.resId,
+            sequence: record.data.sequence,
+            cell_label: record.data.cell_label,
+            cell_type: record.data.cell_type,
+            status: record.data.status,
+            write_date: record.data.write_date && serializeDateTime(record.data.write_date),
+        }));
+        const signature = cells.map((cell) => `${cell.id}:${cell.write_date}`).join(",");
+        if (signature === this.recordSignature) {
+            return;
+        }
+        this.recordSignature = signature;
+        this.setCells(cells);
+    }
+
+    /**
+     * Replace the cell list. Loaded cells that changed are read again: their
+     * elements are no longer observed, so scrolling would not reload them.
+     */
+    setCells(cells) {
+        const previous = new Map(this.state.cells.map((cell) => [cell.id, cell]));
+        const stale = [];
+        for (const cell of cells) {
+            const old = previous.get(cell.id);
+            if (old && old.write_date !== cell.write_date && cell.id in this.state.content) {
+                stale.push(cell.id);
+            }
+        }
+        this.state.cells = [...cells].sort(bySequence);
+        return stale.length ? this.loadContent(stale) : Promise.resolve();
+    }
+
+    /** Merge freshly read light data into the list. */
+    patchCells(records) {
+        const byId = new Map(records.map((record) => [record.id, record]));
+        const cells = this.state.cells.map((cell) => byId.get(cell.id) || cell);
+        for (const record of records) {
+            if (!this.state.cells.some((cell) => cell.id === record.id)) {
+                cells.push(record);
+            }
+        }
+        return this.setCells(cells);
+    }
+
+    observe(el, cellId) {
+        if (el) {
+            this.elements.set(el, cellId);
+            this.observer.observe(el);
+        }
+    }
+
+    unobserve(el) {
+        if (el) {
+            this.observer.unobserve(el);
+        }
+    }
+
+    onIntersect(entries) {
+        for (const entry of entries) {
+            const cellId = this.elements.get(entry.target);
+            if (entry.isIntersecting && cellId && !(cellId in this.state.content)) {
+                this.pending.add(cellId);
+                this.observer.unobserve(entry.target);
+            }
+        }
+        if (this.pending.size) {
+            const ids = [...this.pending];
+            this.pending.clear();
+            this.loadContent(ids);
+        }
+    }
+
+    async loadContent(ids) {
+        const records = await this.orm.read("devops.notebook.cell", ids, CONTENT_FIELDS);
+        for (const record of records) {
+            this.state.content[record.id] = record;
+        }
+    }
+
+    /** Re-read the given cells only: light data always, content if it was shown and changed. */
+    async refreshCells(cellIds) {
+        const ids = cellIds.filter((id) => this.state.cells.some((cell) => cell.id === id));
+        if (!ids.length) {
+            return;
+        }
+        const records = await this.orm.read("devops.notebook.cell", ids, LIGHT_FIELDS);
+        const found = new Set(records.map((record) => record.id));
+        this.state.cells = this.state.cells.filter((cell) => !ids.includes(cell.id) || found.has(cell.id));
+        await this.patchCells(records);
+    }
+
+    /** Re-read the light cell list after structural changes made elsewhere. */
+    async reloadCells() {
+        const records = await this.orm.searchRead(
+            "devops.notebook.cell",
+            [["notebook_id", "=", this.props.record.resId]],
+            LIGHT_FIELDS
+        );
+        await this.setCells(records);
+    }
+
+    onBusNotification(payload) {
+        if (payload.notebook_id !== this.props.record.resId) {
+            return;
+        }
+        if (payload.structure) {
+            this.reloadCells();
+        } else {
+            this.refreshCells(payload.cell_ids);
+        }
+    }
+
+    toggleCell(cellId) {
+        this.state.collapsed[cellId] = !this.isCollapsed(cellId);
+    }
+
+    toggleAll() {
+        this.state.allCollapsed = !this.state.allCollapsed;
+        this.state.collapsed = {};
+    }
+
+    isCollapsed(cellId) {
+        return this.state.collapsed[cellId] ?? this.state.allCollapsed;
+    }
+
+    async addCell(afterCellId = false) {
+        const cell = await this.orm.call("devops.notebook", "add_cell", [[this.props.record.resId]], {
+            cell_type: this.state.newCellType,
+            after_cell_id: afterCellId,
+        });
+        if (afterCellId) {
+            // Cells after the insertion point may have been renumbered.
+            await this.reloadCells();
+        } else {
+            this.patchCells([cell]);
+        }
+        this.editCell(cell.id);
+    }
+
+    async moveCell(cellId, offset) {
+        const records = await this.orm.call("devops.notebook.cell", "move_cell", [[cellId], offset]);
+        this.patchCells(records);
+    }
+
+    async runCell(cellId) {
+        await this.orm.call("devops.notebook.cell", "action_run", [[cellId]]);
+        await this.refreshCells([cellId]);
+    }
+
+    editCell(cellId) {
+        this.action.doAction(
+            {
+                type: "ir.actions.act_window",
+                res_model: "devops.notebook.cell",
+                res_id: cellId,
+                views: [[false, "form"]],
+                target: "new",
+            },
+            { onClose: () => this.refreshCells([cellId]) }
+        );
+    }
+
+    deleteCell(cellId) {
+        this.dialog.add(ConfirmationDialog, {
+            body: "确认删除该单元格？",
+            confirm: async () => {
+                await this.orm.call("devops.notebook.cell", "action_delete_cell", [[cellId]]);
+                this.state.cells = this.state.cells.filter((cell) => cell.id !== cellId);
+                delete this.state.content[cellId];
+            },
+            cancel: () => {},
+        });
+    }
+}
+
+registry.category("fields").add("devops_notebook_cells", {
+    component: NotebookCellsField,
+    supportedTypes: ["one2many"],
+    relatedFields: [
+        { name: "sequence", type: "integer" },
+        { name: "cell_label", type: "char" },
+        { name: "cell_type", type: "selection" },
+        { name: "status", type: "selection" },
+        { name: "write_date", type: "datetime" },
+    ],
+});
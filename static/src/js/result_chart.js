@@ -0,0 +1,78 @@
+/** @odoo-module **/
+
+import { Component, onMounted, onWillStart, onWillUnmount, onPatched, useRef } from "@odoo/owl";
+import { loadBundle } from "@web/core/assets";
+import { registry } from "@web/core/registry";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+
+const COLORS = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f", "#edc948"];
+
+/**
+ * Renders the chart payload cached on a cell (output_chart). Series are
+ * already downsampled on the server, so this only hands them to Chart.js.
+ */
+export class DevopsResultChart extends Component {
+    static template = "project_notebook.DevopsResultChart";
+    static props = { ...standardFieldProps };
+
+    setup() {
+        this.canvas = useRef("canvas");
+        this.chart = null;
+        onWillStart(() => loadBundle("web.chartjs_lib"));
+        onMounted(() => this.renderChart());
+        onPatched(() => this.renderChart());
+        onWillUnmount(() => this.chart?.destroy());
+    }
+
+    get payload() {
+        return this.props.record.data[this.props.name] || {};
+    }
+
+    get downsampledNote() {
+        const series = this.payload.series || [];
+        const shown = series.reduce((sum, s) => sum + s.points.length, 0);
+        const total = series.reduce((sum, s) => sum + s.total, 0);
+        return total > shown ? `${shown} / ${total}` : "";
+    }
+
+    renderChart() {
+        this.chart?.destroy();
+        const payload = this.payload;
+        if (!payload.series || !this.canvas.el) {
+            return;
+        }
+        const category = payload.x_kind === "category";
+        const datasets = payload.series.map((series, index) => ({
+            label: series.name,
+            data: series.points.map(([x, y]) => ({ x, y })),
+            borderColor: COLORS[index % COLORS.length],
+            backgroundColor: COLORS[index % COLORS.length],
+            pointRadius: payload.type === "scatter" ? 2 : 0,
+            showLine: payload.type === "line",
+        }));
+        const xAxis = category ? { type: "category" } : { type: "linear" };
+        if (payload.x_kind === "time") {
+            xAxis.ticks = {
+                callback: (value) => new Date(value).toISOString().slice(0, 16).replace("T", " "),
+            };
+        }
+        this.chart = new Chart(this.canvas.el, {
+            type: payload.type === "bar" ? "bar" : "scatter",
+            data: {
+                labels: category ? payload.series[0]?.points.map(([x]) => x) : undefined,
+                datasets,
+            },
+            options: {
+                animation: false,
+                maintainAspectRatio: false,
+                parsing: category ? { xAxisKey: "x", yAxisKey: "y" } : false,
+                scales: { x: { ...xAxis, title: { display: true, text: payload.x } } },
+            },
+        });
+    }
+}
+
+registry.category("fields").add("devops_result_chart", {
+    component: DevopsResultChart,
+    supportedTypes: ["json"],
+});
@@ -0,0 +1,150 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, onWillUpdateProps, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { debounce } from "@web/core/utils/timing";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+
+const ROW_HEIGHT = 28;
+const HEADER_HEIGHT = ROW_HEIGHT * 2;
+const PAGE_SIZE = 200;
+const OVERSCAN = 10;
+
+/**
+ * Virtualized grid over the structured result of a cell. Only the rows in
+ * view are rendered; they are fetched page by page from get_result_page,
+ * which also sorts and filters on the server.
+ */
+export class DevopsResultGrid extends Component {
+    static template = "project_notebook.DevopsResultGrid";
+    static props = {
+        ...standardFieldProps,
+        height: { type: Number, optional: true },
+    };
+    static defaultProps = { height: 320 };
+
+    setup() {
+        this.orm = useService("orm");
+        this.pages = new Map();
+        this.generation = 0;
+        this.state = useState({
+            total: 0,
+            scrollTop: 0,
+            order: null,
+            filters: {},
+            loaded: 0,
+        });
+        this.onFilterInput = debounce(this.reload.bind(this), 300);
+        onWillStart(() => this.loadPage(0));
+        onWillUpdateProps((nextProps) => {
+            if (nextProps.record.data[nextProps.name] !== this.props.record.data[this.props.name]) {
+                this.reset();
+                return this.loadPage(0, nextProps);
+            }
+        });
+    }
+
+    get rowHeight() {
+        return ROW_HEIGHT;
+    }
+
+    get columns() {
+        return this.props.record.data[this.props.name] || [];
+    }
+
+    get totalWidth() {
+        return this.columns.reduce((width, col) => width + col.width, 0);
+    }
+
+    get range() {
+        const offset = Math.max(this.state.scrollTop - HEADER_HEIGHT, 0);
+        const start = Math.max(Math.floor(offset / ROW_HEIGHT) - OVERSCAN, 0);
+        const count = Math.ceil(this.props.height / ROW_HEIGHT) + 2 * OVERSCAN;
+        return [start, Math.min(start + count, this.state.total)];
+    }
+
+    get visibleRows() {
+        // Depend on "loaded" so newly fetched pages are rendered.
+        this.state.loaded;
+        const [start, end] = this.range;
+        const rows = [];
+        for (let index = start; index < end; index++) {
+            const page = this.pages.get(Math.floor(index / PAGE_SIZE));
+            rows.push({ index, cells: page ? page[index % PAGE_SIZE] : null });
+        }
+        return rows;
+    }
+
+    reset() {
+        this.generation++;
+        this.pages.clear();
+        this.state.scrollTop = 0;
+    }
+
+    async loadPage(pageIndex, props = this.props) {
+        if (this.pages.has(pageIndex) || !props.record.resId) {
+            return;
+        }
+        const generation = this.generation;
+        this.pages.set(pageIndex, null);
+        const result = await this.orm.call(
+            "devops.notebook.cell",
+            "get_result_page",
+            [[props.record.resId]],
+            {
+                offset: pageIndex * PAGE_SIZE,
+                limit: PAGE_SIZE,
+                order: this.state.order,
+                filters: this.state.filters,
+            }
+        );
+        if (generation !== this.generation) {
+            return;
+        }
+        this.pages.set(pageIndex, result.rows);
+        this.state.total = result.total;
+        this.state.loaded++;
+    }
+
+    reload() {
+        this.reset();
+        return this.loadPage(0);
+    }
+
+    onScroll(ev) {
+        this.state.scrollTop = ev.target.scrollTop;
+        const [start, end] = this.range;
+        if (end <= start) {
+            return;
+        }
+        const first = Math.floor(start / PAGE_SIZE);
+        const last = Math.floor((end - 1) / PAGE_SIZE);
+        for (let page = first; page <= last; page++) {
+            this.loadPage(page);
+        }
+    }
+
+    onSort(column) {
+        const order = this.state.order;
+        this.state.order = order === column.name ? `${column.name} desc` : column.name;
+        this.reload();
+    }
+
+    sortIcon(column) {
+        if (this.state.order === column.name) {
+            return "fa-sort-asc";
+        }
+        return this.state.order === `${column.name} desc` ? "fa-sort-desc" : "";
+    }
+
+    onFilter(column, ev) {
+        this.state.filters[column.name] = ev.target.value;
+        this.onFilterInput();
+    }
+}
+
+registry.category("fields").add("devops_result_grid", {
+    component: DevopsResultGrid,
+    supportedTypes: ["json"],
+});
@@ -1 +1,12 @@
 from . import test_notebook_sql_pandas
+from . import test_run_retention
+from . import test_notebook_schedule
+from . import test_mail_api
+from . import test_notebook_mail
+from . import test_notebook_transfer
+from . import test_notebook_render
+from . import test_data_source_catalog
+from . import test_data_source_drivers
+from . import test_data_source_routing
+from . import test_federated_query
+from . import test_data_source_health
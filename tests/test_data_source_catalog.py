@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+from odoo.tests import TransactionCase
+
+
+class TestDataSourceCatalog(TransactionCase):
+    def _write_csv(self, header):
+        with open(self.path, "w", encoding="utf-8") as csvfile:
+            csvfile.write(header + "\n1,2,3\n4,5,6\n")
+
+    def setUp(self):
+        super().setUp()
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        self.addCleanup(os.unlink, self.path)
+        self._write_csv("id,name,amount")
+        self.source = self.env["devops.data.source"].create(
+            {"name": "Orders", "source_type": "csv", "csv_path": self.path}
+        )
+
+    def test_refresh_is_incremental(self):
+        self.source.action_refresh_catalog()
+        table = self.source.catalog_table_ids
+        self.assertEqual(table.row_count, 2)
+        self.assertEqual(table.column_ids.mapped("name"), ["id", "name", "amount"])
+        columns = table.column_ids
+
+        self.source.action_refresh_catalog()
+        self.assertEqual(self.source.catalog_table_ids, table)
+        self.assertEqual(table.column_ids, columns, "unchanged tables keep their columns")
+
+        self._write_csv("id,name,total")
+        self.source.action_refresh_catalog()
+        self.assertEqual(self.source.catalog_table_ids, table)
+        self.assertEqual(table.column_ids.mapped("name"), ["id", "name", "total"])
+
+    def test_notebook_catalog_and_errors(self):
+        notebook = self.env["devops.notebook"].create(
+            {"name": "Catalog", "data_source_id": self.source.id}
+        )
+        notebook.action_refresh_catalog()
+        catalog = notebook.get_catalog()
+        self.assertEqual(len(catalog["tables"]), 1)
+        self.assertIn(["amount", "text"], catalog["tables"][0]["columns"])
+
+        broken = self.env["devops.data.source"].create(
+            {"name": "Broken", "source_type": "mssql", "host": "localhost"}
+        )
+        self.assertFalse(broken._refresh_catalog())
+        self.assertTrue(broken.catalog_error)
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from odoo.tests import TransactionCase
+
+from odoo.addons.project_notebook.models.data_source_drivers import OracleDriver, get_driver
+
+
+class TestDataSourceDrivers(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(handle)
+        self.addCleanup(os.unlink, self.path)
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, amount REAL)")
+            conn.execute("CREATE INDEX orders_amount ON orders (amount)")
+            conn.executemany("INSERT INTO orders (amount) VALUES (?)", [(10.5,), (2.0,)])
+        self.source = self.env["devops.data.source"].create(
+            {"name": "Local", "source_type": "sqlite", "database": self.path}
+        )
+        self.notebook = self.env["devops.notebook"].create(
+            {"name": "Drivers", "data_source_id": self.source.id}
+        )
+
+    def _cell(self, query):
+        return self.env["devops.notebook.cell"].create(
+            {"notebook_id": self.notebook.id, "cell_type": "sql", "input_source": query}
+        )
+
+    def test_sqlite_query_and_explain(self):
+        cell = self._cell("SELECT id, amount FROM orders ORDER BY amount")
+        result = cell._exec_sql()
+        self.assertEqual([row["amount"] for row in result["data"]], ["2.0", "10.5"])
+        self.assertEqual(result["schema"][1]["type"], "number")
+
+        self.assertIn("row(s) affected", self._cell("UPDATE orders SET amount = 1")._exec_sql())
+        cell.action_explain()
+        self.assertIn("orders", cell.output_text)
+
+    def test_sqlite_catalog(self):
+        self.source.action_refresh_catalog()
+        table = self.source.catalog_table_ids
+        self.assertEqual(table.name, "orders")
+        self.assertEqual(table.column_ids.mapped("name"), ["id", "amount"])
+        self.assertEqual(table.indexes[0][0], "orders_amount")
+
+    def test_csv_is_queryable(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as csvfile:
+            csvfile.write("region,total\nnorth,3\nsouth,5\n")
+        self.addCleanup(os.unlink, path)
+        self.source.write({"source_type": "csv", "csv_path": path})
+        result = self._cell("SELECT region FROM csv WHERE total = '5'")._exec_sql()
+        self.assertEqual(result["data"], [{"region": "south"}])
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            get_driver("none")
+
+    def test_oracle_client_loaded_once_and_pooled(self):
+        driver = OracleDriver()
+        driver.configure(lib_dir=tempfile.gettempdir(), stmtcachesize="40")
+        oracledb = MagicMock()
+        oracledb.is_thin_mode.return_value = True
+        with patch.dict("sys.modules", {"oracledb": oracledb}):
+            driver.load()
+            driver.load()
+            self.assertEqual(driver.mode, "thin")
+            params = {"host": "db", "port": "1521", "username": "scott", "password": "tiger"}
+            pool, conn = driver.acquire(params)
+            self.assertIs(driver.acquire(dict(params))[0], pool)
+            driver.release(pool, conn)
+            driver.release(pool, conn, broken=True)
+        oracledb.init_oracle_client.assert_called_once_with(lib_dir=tempfile.gettempdir())
+        self.assertEqual(oracledb.defaults.stmtcachesize, 40)
+        oracledb.create_pool.assert_called_once()
+        pool.release.assert_called_once_with(conn)
+        pool.drop.assert_called_once_with(conn)
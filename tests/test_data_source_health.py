@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import TransactionCase
+
+from odoo.addons.project_notebook.models.data_source_drivers import endpoint_health
+
+
+class TestDataSourceHealth(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        handle, path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(handle)
+        self.addCleanup(os.unlink, path)
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY)")
+        Source = self.env["devops.data.source"]
+        self.good = Source.create({"name": "Good", "source_type": "sqlite", "database": path})
+        self.bad = Source.create(
+            {"name": "Bad", "source_type": "sqlite", "database": "/nonexistent/dir/db.sqlite"}
+        )
+        self.notebook = self.env["devops.notebook"].create(
+            {"name": "Health", "data_source_id": self.bad.id}
+        )
+
+    def test_checks_run_together_and_keep_history(self):
+        action = (self.good | self.bad).action_test_connection()
+        self.assertEqual(action["params"]["type"], "danger")
+        self.assertEqual(self.good.health_state, "up")
+        self.assertFalse(self.good.circuit_open_until)
+        self.assertEqual(self.bad.health_state, "down")
+        self.assertTrue(self.bad._circuit_open())
+        self.assertEqual(self.good.health_ids.state, "up")
+        self.assertTrue(self.good.health_ids.server_version)
+        self.assertTrue(self.bad.health_ids.error)
+
+    def test_open_circuit_fails_or_skips_cells(self):
+        self.bad._run_health_checks()
+        cell = self.env["devops.notebook.cell"].create(
+            {"notebook_id": self.notebook.id, "cell_type": "sql", "input_source": "SELECT 1"}
+        )
+        cell._run_cell()
+        self.assertEqual(cell.status, "error")
+        self.assertIn("health check", cell.output_text)
+
+        self.notebook.unhealthy_source_policy = "skip"
+        cell._run_cell()
+        self.assertEqual(cell.status, "skipped")
+
+        self.bad.circuit_open_until = fields.Datetime.now() - timedelta(seconds=1)
+        self.assertFalse(self.bad._circuit_open())
+
+    def test_live_replica_keeps_circuit_closed(self):
+        source = self.env["devops.data.source"].create(
+            {
+                "name": "Warehouse",
+                "source_type": "postgresql",
+                "host": "127.0.0.1",
+                "port": "1",
+                "database": "dwh",
+                "endpoint_ids": [(0, 0, {"role": "replica", "host": "127.0.0.1", "port": "2"})],
+            }
+        )
+        for port in "12":
+            self.addCleanup(endpoint_health.mark_up, ("postgresql", "127.0.0.1", port))
+
+        def probe(source_type, params):
+            if params["port"] == "1":
+                raise OSError("primary down")
+            return 1.0, 1.0, "PostgreSQL 16"
+
+        with patch(
+            "odoo.addons.project_notebook.models.devops_data_source_health._probe", probe
+        ):
+            source._run_health_checks()
+        self.assertEqual(source.health_state, "up")
+        self.assertIn("primary down", source.health_error)
+        self.assertFalse(source._circuit_open())
+        self.assertEqual(sorted(source.health_ids.mapped("state")), ["down", "up"])
+        self.assertFalse(endpoint_health.is_up(("postgresql", "127.0.0.1", "1")))
+        self.assertEqual(source._route_endpoints(readonly=True)[0], ("127.0.0.1", "2"))
@@ -0,0 +1,67 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from odoo.tests import TransactionCase
+
+from odoo.addons.project_notebook.models.data_source_drivers import (
+    PostgresDriver,
+    endpoint_health,
+    is_read_only,
+)
+
+
+class TestDataSourceRouting(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self.env["devops.data.source"].create(
+            {
+                "name": "Warehouse",
+                "source_type": "postgresql",
+                "host": "127.0.0.1",
+                "port": "1",
+                "database": "dwh",
+                "endpoint_ids": [
+                    (0, 0, {"role": "replica", "host": "127.0.0.1", "port": "2", "sequence": 1}),
+                    (0, 0, {"role": "replica", "host": "127.0.0.1", "port": "3", "sequence": 2}),
+                    (0, 0, {"role": "primary", "host": "127.0.0.1", "port": "4", "sequence": 3}),
+                ],
+            }
+        )
+        for port in "1234":
+            self.addCleanup(endpoint_health.mark_up, ("postgresql", "127.0.0.1", port))
+
+    def test_reads_prefer_healthy_replicas(self):
+        ports = lambda endpoints: [port for _host, port in endpoints]
+        self.assertEqual(ports(self.source._route_endpoints(readonly=True)), ["2", "3", "1", "4"])
+        self.assertEqual(ports(self.source._route_endpoints()), ["1", "4"])
+        endpoint_health.mark_down(("postgresql", "127.0.0.1", "2"), 60)
+        self.assertEqual(ports(self.source._route_endpoints(readonly=True)), ["3", "1", "4", "2"])
+
+    def test_failover_marks_dead_endpoints(self):
+        with self.assertRaises(ConnectionError):
+            with self.source._connection():
+                pass
+        self.assertFalse(endpoint_health.is_up(("postgresql", "127.0.0.1", "1")))
+        self.assertFalse(endpoint_health.is_up(("postgresql", "127.0.0.1", "4")))
+        self.assertTrue(endpoint_health.is_up(("postgresql", "127.0.0.1", "2")))
+
+    def test_timeout_cancels_on_the_connected_endpoint(self):
+        def acquire(driver, params):
+            if "port=1" in params["dsn"]:
+                raise OSError("primary down")
+            return None, MagicMock()
+
+        cancelled = threading.Event()
+        cancel = MagicMock(side_effect=lambda *args: cancelled.set())
+        with patch.object(PostgresDriver, "acquire", acquire), patch.object(
+            PostgresDriver, "release"
+        ), patch.object(PostgresDriver, "cancel", cancel):
+            with self.source._connection(timeout=0.01):
+                self.assertTrue(cancelled.wait(5))
+        params = cancel.call_args.args[0]
+        self.assertEqual((params["host"], params["port"]), ("127.0.0.1", "4"))
+
+    def test_read_only_detection(self):
+        self.assertTrue(is_read_only("-- report\nSELECT 'delete' FROM orders"))
+        self.assertFalse(is_read_only("SELECT * FROM orders FOR UPDATE"))
+        self.assertFalse(is_read_only("WITH gone AS (DELETE FROM t RETURNING *) SELECT * FROM gone"))
@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase
+
+from odoo.addons.project_notebook.models import federated_query
+
+
+class TestFederatedQuery(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        handle, path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(handle)
+        self.addCleanup(os.unlink, path)
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE orders (id INTEGER, amount REAL, note TEXT)")
+            conn.executemany(
+                "INSERT INTO orders VALUES (?, ?, ?)", [(1, 10.0, "a"), (2, 3.0, "b"), (3, 8.0, "c")]
+            )
+        self.source = self.env["devops.data.source"].create(
+            {"name": "Shop", "source_type": "sqlite", "database": path, "sql_alias": "shop"}
+        )
+        self.source.action_refresh_catalog()
+
+    def test_join_source_with_cell_result(self):
+        notebook = self.env["devops.notebook"].create({"name": "Federated"})
+        Cell = self.env["devops.notebook.cell"]
+        Cell.create(
+            {
+                "notebook_id": notebook.id,
+                "sequence": 10,
+                "cell_type": "python",
+                "input_source": "set_result([{'id': 1, 'tier': 'gold'}, {'id': 2, 'tier': 'silver'}])",
+            }
+        )
+        federated = Cell.create(
+            {
+                "notebook_id": notebook.id,
+                "sequence": 20,
+                "cell_type": "federated",
+                "input_source": "SELECT o.id, t.tier FROM shop.orders o "
+                "JOIN cell_10 t ON t.id = o.id WHERE o.amount > 5 ORDER BY o.id",
+            }
+        )
+        notebook.action_run_all()
+        self.assertEqual(federated.status, "success", federated.output_text)
+        self.assertEqual(federated.output_data, [{"id": "1", "tier": "gold"}])
+        self.assertIn("SELECT id, amount FROM orders WHERE amount &gt; 5", federated.output_html)
+
+    def test_engine_without_pyarrow_falls_back_to_sqlite(self):
+        with patch.dict("sys.modules", {"pyarrow": None}):
+            engine = federated_query.LocalEngine()
+            try:
+                self.assertEqual(engine.kind, "sqlite")
+                engine.load("t", ["a", "b"], [[(1, "x"), (2, "y")]], 10)
+                self.assertEqual(engine.execute("SELECT b FROM t WHERE a = 2").fetchall(), [("y",)])
+            finally:
+                engine.close()
+
+    def test_pushdown_is_conservative(self):
+        columns = [("id", "INTEGER"), ("note", "TEXT")]
+        query = "SELECT o.id FROM shop.orders o WHERE o.id = 1 OR o.note = 'x'"
+        ref = federated_query.find_source_refs(query, {"shop"})[0]
+        self.assertEqual(federated_query.pushdown_filters(query, ref, columns), [])
+        query = "SELECT o.id FROM shop.orders o WHERE o.id = '1' AND o.note IN ('x', 'y')"
+        ref = federated_query.find_source_refs(query, {"shop"})[0]
+        self.assertEqual(
+            federated_query.pushdown_filters(query, ref, columns), ["note IN ('x', 'y')"]
+        )
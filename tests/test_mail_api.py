@@ -0,0 +1,127 @@
+import base64
+import json
+from unittest.mock import patch
+
+from odoo.tests import HttpCase, TransactionCase, tagged
+
+from odoo.addons.project_notebook.controllers.devops_mail_api import (
+    _AttachmentStore,
+    _PayloadTooLarge,
+    _TokenBucketLimiter,
+)
+
+
+class TestMailApi(TransactionCase):
+    def test_settings_cache_follows_config(self):
+        self.env["ir.config_parameter"].sudo().set_param("devops.mail_api_token", "first")
+        Mail = self.env["mail.mail"]
+        self.assertEqual(Mail._devops_mail_api_settings()["token"], "first")
+        # Bypass set_param so nothing invalidates the cache: it keeps serving "first".
+        self.env.cr.execute(
+            "UPDATE ir_config_parameter SET value = 'stale' WHERE key = 'devops.mail_api_token'"
+        )
+        self.env["ir.config_parameter"].invalidate_model()
+        self.assertEqual(Mail._devops_mail_api_settings()["token"], "first")
+        # Saving the settings refreshes it.
+        self.env["res.config.settings"].create({"devops_mail_api_token": "second"}).set_values()
+        self.assertEqual(Mail._devops_mail_api_settings()["token"], "second")
+
+    def test_token_bucket(self):
+        limiter = _TokenBucketLimiter()
+        with patch("time.monotonic", return_value=100.0):
+            self.assertEqual(limiter.consume("k", 60, 2), 0)
+            self.assertEqual(limiter.consume("k", 60, 2), 0)
+            self.assertEqual(limiter.consume("k", 60, 2), 1)
+            # Other clients have their own bucket.
+            self.assertEqual(limiter.consume("other", 60, 2), 0)
+        with patch("time.monotonic", return_value=101.0):
+            self.assertEqual(limiter.consume("k", 60, 2), 0)
+
+    def test_attachment_store_dedup_and_budget(self):
+        data = base64.b64encode(b"daily report").decode()
+        store = _AttachmentStore(self.env, 1024)
+        first = store.from_base64("report.csv", data)
+        self.assertEqual(store.from_base64("report.csv", data), first)
+        self.assertNotEqual(store.from_base64("other.csv", data), first)
+        self.assertEqual(self.env["ir.attachment"].browse(first).raw, b"daily report")
+        with self.assertRaises(_PayloadTooLarge):
+            _AttachmentStore(self.env, 4).from_base64("report.csv", data)
+
+
+@tagged("post_install", "-at_install")
+class TestMailApiHttp(HttpCase):
+    def _post(self, route, payload):
+        return self.url_open(
+            "%s?db=%s" % (route, self.env.cr.dbname),
+            data=json.dumps(dict(payload, token="secret")),
+            headers={"Content-Type": "application/json"},
+        )
+
+    def test_send_batch_reports_each_message(self):
+        self.env["ir.config_parameter"].sudo().set_param("devops.mail_api_token", "secret")
+        messages = [
+            {"subject": "A", "email_to": "a@x.com", "body": "first"},
+            {"subject": "B"},
+            {"subject": "C", "email_to": "c@x.com", "body": "third"},
+        ]
+        response = self._post("/mail/api/send_batch", {"messages": messages})
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data["queued"], 2)
+        results = data["results"]
+        self.assertEqual([r["index"] for r in results], [0, 1, 2])
+        self.assertEqual(results[1], {"index": 1, "error": "subject and email_to are required"})
+        mails = self.env["mail.mail"].browse([results[0]["mail_id"], results[2]["mail_id"]])
+        self.assertEqual(mails.mapped("subject"), ["A", "C"])
+        self.assertEqual(mails.mapped("email_to"), ["a@x.com", "c@x.com"])
+        self.assertEqual(set(mails.mapped("state")), {"outgoing"})
+
+    def test_send_mail_queues_and_reports_status(self):
+        self.env["ir.config_parameter"].sudo().set_param("devops.mail_api_token", "secret")
+        message = {"subject": "Report", "email_to": "a@x.com", "body": "done"}
+        response = self._post("/mail/api/send_mail", message)
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data["status"], "queued")
+        mail_id = data["mail_id"]
+        missing_id = mail_id + 100000
+
+        response = self._post("/mail/api/status", {"ids": [mail_id, missing_id]})
+        self.assertEqual(response.status_code, 200)
+        mails = response.json()["mails"]
+        self.assertEqual(mails[0]["id"], mail_id)
+        self.assertEqual(mails[0]["state"], "outgoing")
+        self.assertEqual(mails[1], {"id": missing_id, "state": "not_found"})
+
+        self.env["mail.mail"].browse(mail_id).send()
+        response = self._post("/mail/api/status", {"ids": str(mail_id)})
+        self.assertEqual(response.json()["mails"][0]["state"], "sent")
+
+    def test_send_mail_sync(self):
+        self.env["ir.config_parameter"].sudo().set_param("devops.mail_api_token", "secret")
+        message = {"subject": "Report", "email_to": "a@x.com", "body": "done", "sync": True}
+        response = self._post("/mail/api/send_mail", message)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["status"], "sent")
+        self.assertEqual(data["state"], "sent")
+        self.assertEqual(self.env["mail.mail"].browse(data["mail_id"]).state, "sent")
+
+    def test_oversized_body_rejected_before_parsing(self):
+        ICP = self.env["ir.config_parameter"].sudo()
+        ICP.set_param("devops.mail_api_token", "secret")
+        ICP.set_param("devops.mail_api_max_payload_mb", "1")
+        self.env.registry.clear_cache()
+        body = json.dumps(
+            {"token": "secret", "subject": "s", "email_to": "a@x.com", "body": "x" * (2 << 20)}
+        )
+        controller = "odoo.addons.project_notebook.controllers.devops_mail_api.DevOpsMailApiController"
+        with patch(f"{controller}._read_payload") as read_payload:
+            response = self.url_open(
+                "/mail/api/send_mail?db=%s" % self.env.cr.dbname,
+                data=body,
+                headers={"Content-Type": "application/json"},
+            )
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()["error"], "payload too large")
+        read_payload.assert_not_called()
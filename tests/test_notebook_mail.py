@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase
+
+
+class TestNotebookMail(TransactionCase):
+    def test_email_cell_mails_are_sent_in_one_batch(self):
+        notebook = self.env["devops.notebook"].create({"name": "Mail Notebook"})
+        self.env["devops.notebook.cell"].create(
+            {
+                "notebook_id": notebook.id,
+                "cell_type": "email_python",
+                "input_source": (
+                    "for idx in range(3):\n"
+                    "    send_mail(subject=f'Report {idx}', email_to='ops@example.com')\n"
+                    "send_mail(subject='Later', email_to='ops@example.com', auto_send=False)\n"
+                ),
+            }
+        )
+        Mail = self.env["mail.mail"]
+        batches = []
+
+        def fake_send(mails, *args, **kwargs):
+            batches.append(mails.ids)
+            mails.write({"state": "sent"})
+
+        with patch.object(type(Mail), "send", fake_send):
+            notebook.action_run_all()
+        run = self.env["devops.notebook.run"].search([("notebook_id", "=", notebook.id)])
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0]), 3)
+        self.assertEqual(len(run.mail_ids), 4)
+        self.assertEqual(run.mail_sent_count, 3)
+        self.assertEqual(run.mail_failed_count, 0)
+
+    def test_failing_cell_cancels_queued_mails_only_when_asked(self):
+        notebook = self.env["devops.notebook"].create({"name": "Failing Mail Notebook"})
+        Cell = self.env["devops.notebook.cell"]
+        Cell.create(
+            {
+                "notebook_id": notebook.id,
+                "cell_type": "email_python",
+                "input_source": "send_mail(subject='Report', email_to='ops@example.com')\n",
+            }
+        )
+        Cell.create({"notebook_id": notebook.id, "cell_type": "python", "input_source": "1 / 0"})
+        Mail = self.env["mail.mail"]
+        Run = self.env["devops.notebook.run"]
+
+        def fake_send(mails, *args, **kwargs):
+            mails.write({"state": "sent"})
+
+        with patch.object(type(Mail), "send", fake_send):
+            notebook.action_run_all()
+        run = Run.search([("notebook_id", "=", notebook.id)], order="id desc", limit=1)
+        self.assertEqual(run.mail_ids.mapped("state"), ["sent"])
+        self.assertEqual(run.mail_sent_count, 1)
+
+        notebook.cancel_mails_on_error = True
+        with patch.object(type(Mail), "send") as send:
+            notebook.action_run_all()
+        send.assert_not_called()
+        run = Run.search([("notebook_id", "=", notebook.id)], order="id desc", limit=1)
+        self.assertEqual(run.mail_ids.mapped("state"), ["cancel"])
+        self.assertEqual(run.mail_sent_count, 0)
+        self.assertIn("cancelled", run.message)
+
+    def test_mail_notebook_link_is_stored(self):
+        notebooks = self.env["devops.notebook"].create([{"name": "A"}, {"name": "B"}])
+        Mail = self.env["mail.mail"]
+        Mail.create(
+            [
+                {"subject": "one", "model": "devops.notebook", "res_id": notebooks[0].id},
+                {"subject": "two", "model": "devops.notebook", "res_id": notebooks[0].id},
+                {"subject": "other", "model": "res.partner", "res_id": notebooks[1].id},
+            ]
+        )
+        self.assertEqual(Mail.search_count([("notebook_id", "=", notebooks[0].id)]), 2)
+        self.assertEqual(notebooks.mapped("mail_count"), [2, 0])
@@ -0,0 +1,81 @@
+from odoo.tests import TransactionCase
+
+
+class TestNotebookRender(TransactionCase):
+    def test_unchanged_richtext_cell_is_skipped(self):
+        notebook = self.env["devops.notebook"].create({"name": "Docs"})
+        cell = self.env["devops.notebook.cell"].create(
+            {"notebook_id": notebook.id, "cell_type": "richtext", "input_source": "<p>v1</p>"}
+        )
+        notebook.action_run_all()
+        self.assertEqual(cell.output_html, "<p>v1</p>")
+        cell.write({"output_html": "<p>stored</p>"})
+        notebook.action_run_all()
+        self.assertEqual(cell.output_html, "<p>stored</p>")
+        cell.input_source = "<p>v2</p>"
+        notebook.action_run_all()
+        self.assertEqual(cell.output_html, "<p>v2</p>")
+
+    def test_add_and_move_cells_in_place(self):
+        notebook = self.env["devops.notebook"].create({"name": "Edit"})
+        first = notebook.add_cell()
+        second = notebook.add_cell()
+        inserted = notebook.add_cell(cell_type="sql", after_cell_id=first["id"])
+        self.assertEqual(inserted["cell_type"], "sql")
+        self.assertEqual(
+            notebook.cell_ids.sorted("sequence").ids, [first["id"], inserted["id"], second["id"]]
+        )
+        moved = self.env["devops.notebook.cell"].browse(second["id"]).move_cell(-1)
+        self.assertEqual(len(moved), 2)
+        self.assertEqual(
+            notebook.cell_ids.sorted("sequence").ids, [first["id"], second["id"], inserted["id"]]
+        )
+
+    def test_result_page_sort_and_filter(self):
+        notebook = self.env["devops.notebook"].create({"name": "Grid"})
+        cell = self.env["devops.notebook.cell"].create(
+            {
+                "notebook_id": notebook.id,
+                "cell_type": "python",
+                "input_source": "pass",
+                "output_schema": [
+                    {"name": "name", "type": "string", "width": 80},
+                    {"name": "qty", "type": "number", "width": 48},
+                ],
+                "output_data": [
+                    {"name": "bolt", "qty": "10"},
+                    {"name": "nut", "qty": "9"},
+                    {"name": "washer", "qty": "100"},
+                ],
+            }
+        )
+        page = cell.get_result_page(offset=0, limit=2, order="qty desc")
+        self.assertEqual(page["total"], 3)
+        self.assertEqual(page["rows"], [["washer", "100"], ["bolt", "10"]])
+        page = cell.get_result_page(filters={"name": "T"})
+        self.assertEqual([row[0] for row in page["rows"]], ["bolt", "nut"])
+
+    def test_chart_is_downsampled_and_cached(self):
+        notebook = self.env["devops.notebook"].create({"name": "Chart"})
+        cell = self.env["devops.notebook.cell"].create(
+            {
+                "notebook_id": notebook.id,
+                "cell_type": "python",
+                "input_source": (
+                    "set_result([{'t': i, 'v': (i * 7) % 13} for i in range(5000)])"
+                ),
+                "chart_type": "line",
+                "chart_x": "t",
+                "chart_y": "v",
+                "chart_max_points": 500,
+            }
+        )
+        cell.action_run()
+        series = cell.output_chart["series"][0]
+        self.assertEqual(series["total"], 5000)
+        self.assertEqual(len(series["points"]), 500)
+        self.assertEqual(cell.output_schema[0]["type"], "number")
+        # Changing the chart rebuilds it from the stored result.
+        cell.chart_type = "bar"
+        self.assertEqual(cell.output_chart["type"], "bar")
+        self.assertLessEqual(len(cell.output_chart["series"][0]["points"]), 500)
@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import TransactionCase, new_test_user
+
+from odoo.addons.project_notebook.models.cron_expression import CronExpression
+from odoo.addons.project_notebook.models.devops_notebook import (
+    DevOpsNotebook,
+    DevOpsNotebookCell,
+    NotebookRunCancelled,
+)
+
+
+class TestNotebookSchedule(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        past = fields.Datetime.now() - timedelta(hours=1)
+        self.nb_ok = self.env["devops.notebook"].create({"name": "Scheduled OK"})
+        self.nb_ko = self.env["devops.notebook"].create({"name": "Scheduled KO"})
+        self.Schedule = self.env["devops.notebook.schedule"]
+        self.sched_ok = self.Schedule.create(
+            {"notebook_id": self.nb_ok.id, "start_datetime": past, "interval_type": "hours"}
+        )
+        self.sched_ko = self.Schedule.create(
+            {"notebook_id": self.nb_ko.id, "start_datetime": past, "interval_type": "hours"}
+        )
+        self.Schedule.browse((self.sched_ok | self.sched_ko).ids).write({"next_run": past})
+        # The dispatcher runs each schedule on its own cursor: in test mode
+        # those share the test transaction instead of committing.
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+
+    def _dispatch_due(self):
+        self.env.flush_all()
+        self.Schedule._cron_run_schedules()
+        self.env.invalidate_all()
+
+    def test_failing_schedule_does_not_block_others(self):
+        original = DevOpsNotebook.action_run_all
+
+        def run_all(notebooks):
+            if notebooks.id == self.nb_ko.id:
+                raise RuntimeError("boom")
+            return original(notebooks)
+
+        with patch.object(DevOpsNotebook, "action_run_all", run_all):
+            self._dispatch_due()
+        for schedule in self.sched_ok | self.sched_ko:
+            self.assertEqual(schedule.run_count, 1)
+            self.assertGreater(schedule.next_run, fields.Datetime.now())
+        failed = self.env["devops.notebook.run"].search([("schedule_id", "=", self.sched_ko.id)])
+        self.assertEqual(failed.state, "failed")
+        self.assertIn("boom", failed.message)
+        ok = self.env["devops.notebook.run"].search([("schedule_id", "=", self.sched_ok.id)])
+        self.assertEqual(ok.state, "success")
+
+    def test_schedule_change_arms_dispatcher_trigger(self):
+        cron = self.env.ref("project_notebook.ir_cron_devops_notebook_schedule")
+        cron.nextcall = fields.Datetime.now() + timedelta(days=1)
+        (self.sched_ok | self.sched_ko).active = False
+        Trigger = self.env["ir.cron.trigger"]
+        Trigger.search([("cron_id", "=", cron.id)]).unlink()
+        due = fields.Datetime.now() + timedelta(hours=2)
+        self.sched_ok.write({"active": True, "next_run": due})
+        triggers = Trigger.search([("cron_id", "=", cron.id)])
+        self.assertEqual(triggers.mapped("call_at"), [due])
+        # An earlier pending trigger already covers later schedules.
+        self.sched_ok.next_run = due + timedelta(hours=1)
+        self.assertEqual(Trigger.search_count([("cron_id", "=", cron.id)]), 1)
+
+    def test_internal_user_can_save_schedules(self):
+        user = new_test_user(self.env, login="schedule_user", groups="base.group_user")
+        notebook = self.env["devops.notebook"].with_user(user).create({"name": "Mine"})
+        schedule = self.Schedule.with_user(user).create(
+            {
+                "notebook_id": notebook.id,
+                "start_datetime": fields.Datetime.now() + timedelta(hours=1),
+                "interval_type": "hours",
+            }
+        )
+        schedule.write({"interval_number": 2})
+        self.assertTrue(schedule.next_run)
+
+    def test_stagger_offset_is_stable_and_bounded(self):
+        self.sched_ok.stagger_seconds = 600
+        offset = self.sched_ok._get_stagger_offset()
+        self.assertTrue(0 <= offset < 600)
+        self.assertEqual(offset, self.sched_ok._get_stagger_offset())
+        start = self.sched_ok.start_datetime
+        self.assertEqual(
+            self.sched_ok._next_run_from(start + timedelta(minutes=30, seconds=offset)),
+            start + timedelta(hours=1, seconds=offset),
+        )
+
+    def test_overlapping_run_is_skipped_or_queued(self):
+        self.sched_ko.active = False
+        with patch.object(DevOpsNotebook, "_try_run_lock", lambda notebook: False):
+            self._dispatch_due()
+            skipped = self.env["devops.notebook.run"].search(
+                [("schedule_id", "=", self.sched_ok.id)]
+            )
+            self.assertEqual(skipped.state, "skipped")
+            self.assertEqual(self.sched_ok.run_count, 0)
+
+            self.sched_ok.write({"overlap_policy": "queue", "next_run": fields.Datetime.now()})
+            self._dispatch_due()
+            self.assertEqual(
+                self.env["devops.notebook.run"].search_count([("schedule_id", "=", self.sched_ok.id)]), 1
+            )
+            self.assertLessEqual(
+                self.sched_ok.next_run, fields.Datetime.now() + timedelta(minutes=1)
+            )
+
+    def test_cancel_previous_stops_running_notebook_between_cells(self):
+        self.sched_ko.active = False
+        self.sched_ok.overlap_policy = "cancel_previous"
+        with patch.object(DevOpsNotebook, "_try_run_lock", lambda notebook: False):
+            self._dispatch_due()
+        requests = self.env["devops.notebook.cancel.request"].search(
+            [("notebook_id", "=", self.nb_ok.id)]
+        )
+        self.assertEqual(len(requests), 1)
+        requests.unlink()
+
+        Cell = self.env["devops.notebook.cell"]
+        for code in ("a = 1", "b = 2"):
+            Cell.create({"notebook_id": self.nb_ok.id, "cell_type": "python", "input_source": code})
+        original = DevOpsNotebookCell._run_cell
+        ran = []
+
+        def run_cell(cell, **kwargs):
+            ran.append(cell.input_source)
+            # A newer run asks this one to stop while its first cell runs.
+            self.nb_ok._request_cancel()
+            return original(cell, **kwargs)
+
+        with patch.object(DevOpsNotebookCell, "_run_cell", run_cell), patch.object(
+            DevOpsNotebook, "_CANCEL_POLL_SECONDS", 0
+        ), self.assertRaises(NotebookRunCancelled):
+            self.nb_ok.action_run_all()
+        self.assertEqual(ran, ["a = 1"])
+
+    def test_cron_expression(self):
+        weekdays = CronExpression("0 7 * * 1-5")
+        friday = datetime(2026, 10, 16, 7, 0)
+        self.assertEqual(weekdays.next_after(friday), datetime(2026, 10, 19, 7, 0))
+        self.assertEqual(
+            CronExpression("*/15 * * * *").next_after(datetime(2026, 1, 1, 0, 14, 30)),
+            datetime(2026, 1, 1, 0, 15),
+        )
+        # Both day fields restricted: either one matches.
+        self.assertEqual(
+            CronExpression("0 0 13 * fri").next_after(datetime(2026, 1, 1)),
+            datetime(2026, 1, 2),
+        )
+        with self.assertRaises(ValueError):
+            CronExpression("0 7 * *")
+
+    def test_cron_expression_on_leap_day(self):
+        self.assertEqual(
+            CronExpression("0 7 * * *").next_after(datetime(2028, 2, 29, 3, 0)),
+            datetime(2028, 2, 29, 7, 0),
+        )
+        self.assertEqual(
+            CronExpression("0 0 29 2 *").next_after(datetime(2028, 2, 29, 0, 0)),
+            datetime(2032, 2, 29, 0, 0),
+        )
+
+    def test_cron_schedule_uses_local_wall_clock(self):
+        self.sched_ok.write(
+            {
+                "schedule_type": "cron",
+                "cron_expression": "0 7 * * 1-5",
+                "tz": "Asia/Shanghai",
+            }
+        )
+        # Friday 23:30 UTC is Saturday 07:30 in Shanghai: next is Monday 07:00 local.
+        slot = self.sched_ok._next_slot_after(datetime(2026, 10, 16, 23, 30))
+        self.assertEqual(slot, datetime(2026, 10, 18, 23, 0))
+
+    def test_interval_slots_do_not_drift(self):
+        start = datetime(2026, 1, 1, 0, 0)
+        self.sched_ok.write({"start_datetime": start, "interval_type": "hours", "interval_number": 2})
+        late = datetime(2026, 1, 1, 4, 7, 42)
+        self.assertEqual(self.sched_ok._next_slot_after(late), datetime(2026, 1, 1, 6, 0))
+
+    def test_catchup_skip_records_skipped_run(self):
+        self.sched_ko.active = False
+        self.sched_ok.write(
+            {
+                "catchup_policy": "skip",
+                "next_run": fields.Datetime.now() - timedelta(hours=5),
+            }
+        )
+        self._dispatch_due()
+        runs = self.env["devops.notebook.run"].search([("schedule_id", "=", self.sched_ok.id)])
+        self.assertEqual(runs.state, "skipped")
+        self.assertGreater(self.sched_ok.next_run, fields.Datetime.now())
@@ -0,0 +1,116 @@
+import base64
+import io
+import json
+import zipfile
+
+from odoo.tests import TransactionCase
+
+from odoo.addons.project_notebook.wizard.notebook_transfer import NotebookArchiveWriter
+
+
+def _hwnb(name, cell_count):
+    return json.dumps(
+        {
+            "version": "1.0",
+            "notebook": {"name": name, "execution_mode": "immediate"},
+            "cells": [
+                {"cell_type": "python", "input_source": f"print({idx})"}
+                for idx in range(cell_count)
+            ],
+        }
+    ).encode()
+
+
+class TestNotebookTransfer(TransactionCase):
+    def test_batch_create_allocates_sequences(self):
+        notebook = self.env["devops.notebook"].create({"name": "Seq"})
+        Cell = self.env["devops.notebook.cell"]
+        vals = {"notebook_id": notebook.id, "cell_type": "python", "input_source": "pass"}
+        Cell.create(dict(vals, sequence=30))
+        cells = Cell.create([dict(vals), dict(vals, sequence=100), dict(vals)])
+        self.assertEqual(cells.mapped("sequence"), [40, 100, 110])
+
+    def test_import_zip_of_notebooks(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("a.hwnb", _hwnb("Zip A", 3))
+            archive.writestr("b.hwnb", _hwnb("Zip B", 2))
+            archive.writestr("readme.txt", "ignored")
+        wizard = self.env["devops.notebook.import.wizard"].create(
+            {"data_file": base64.b64encode(buffer.getvalue()), "filename": "bundle.zip"}
+        )
+        action = wizard.action_import()
+        notebooks = self.env["devops.notebook"].search(action["domain"])
+        self.assertEqual(sorted(notebooks.mapped("name")), ["Zip A", "Zip B"])
+        cells = notebooks.filtered(lambda nb: nb.name == "Zip A").cell_ids.sorted("sequence")
+        self.assertEqual(cells.mapped("input_source"), ["print(0)", "print(1)", "print(2)"])
+
+    def _export_and_import(self, notebook, export_format):
+        wizard = self.env["devops.notebook.export.wizard"].create(
+            {
+                "notebook_id": notebook.id,
+                "export_format": export_format,
+                "include_outputs": True,
+                "include_kernel": True,
+            }
+        )
+        wizard.action_export()
+        importer = self.env["devops.notebook.import.wizard"].create(
+            {
+                "data_file": base64.b64encode(wizard.attachment_id.raw),
+                "filename": wizard.filename,
+                "restore_kernel": True,
+            }
+        )
+        action = importer.action_import()
+        return self.env["devops.notebook"].browse(action["res_id"])
+
+    def test_export_with_outputs_round_trip(self):
+        notebook = self.env["devops.notebook"].create({"name": "Outputs"})
+        notebook._set_kernel_locals({"answer": 42})
+        rows = [{"id": "1", "name": "a"}, {"id": "2", "name": "b"}]
+        self.env["devops.notebook.cell"].create(
+            {
+                "notebook_id": notebook.id,
+                "cell_type": "python",
+                "input_source": "print('hi')",
+                "status": "success",
+                "output_text": "hi",
+                "output_data": rows,
+            }
+        )
+        for export_format in ("gzip", "zip"):
+            imported = self._export_and_import(notebook, export_format)
+            cell = imported.cell_ids
+            self.assertEqual(cell.status, "success")
+            self.assertEqual(cell.output_text, "hi")
+            self.assertEqual(cell.output_data, rows)
+            self.assertEqual(imported._get_kernel_locals(), {"answer": 42})
+
+    def test_bulk_archive_import_remaps_data_sources(self):
+        DataSource = self.env["devops.data.source"]
+        old_ds = DataSource.create({"name": "Old Warehouse", "source_type": "none"})
+        new_ds = DataSource.create({"name": "New Warehouse", "source_type": "none"})
+        notebooks = self.env["devops.notebook"].create(
+            [
+                {"name": "Bulk A", "data_source_id": old_ds.id},
+                {"name": "Bulk B", "data_source_id": old_ds.id},
+            ]
+        )
+        buffer = io.BytesIO()
+        writer = NotebookArchiveWriter(buffer, "zip")
+        for notebook in notebooks:
+            writer.add(notebook)
+        writer.close()
+        wizard = self.env["devops.notebook.import.wizard"].create(
+            {
+                "data_file": base64.b64encode(buffer.getvalue()),
+                "mapping_ids": [
+                    (0, 0, {"source_name": "Old Warehouse", "data_source_id": new_ds.id})
+                ],
+            }
+        )
+        action = wizard.action_import()
+        imported = self.env["devops.notebook"].search(action["domain"])
+        self.assertEqual(len(imported), 2)
+        self.assertEqual(imported.data_source_id, new_ds)
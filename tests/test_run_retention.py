@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase
+
+
+class TestRunRetention(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.notebook = self.env["devops.notebook"].create(
+            {"name": "Retention Notebook", "run_retention_days": 7}
+        )
+        self.Run = self.env["devops.notebook.run"]
+        old_day = fields.Datetime.now() - timedelta(days=30)
+        for idx, (state, duration) in enumerate(
+            [("success", 1.0), ("success", 3.0), ("failed", 5.0)]
+        ):
+            self.Run.create(
+                {
+                    "name": f"old {idx}",
+                    "notebook_id": self.notebook.id,
+                    "state": state,
+                    "start_datetime": old_day + timedelta(minutes=idx),
+                    "duration_seconds": duration,
+                }
+            )
+        self.recent = self.Run.create(
+            {
+                "name": "recent",
+                "notebook_id": self.notebook.id,
+                "start_datetime": fields.Datetime.now(),
+                "duration_seconds": 2.0,
+            }
+        )
+        self.old_date = old_day.date()
+
+    def test_compaction_rolls_up_and_purges(self):
+        self.env["devops.notebook.run.daily"]._cron_compact_run_history()
+        runs = self.Run.search([("notebook_id", "=", self.notebook.id)])
+        self.assertEqual(runs, self.recent)
+        summary = self.env["devops.notebook.run.daily"].search(
+            [("notebook_id", "=", self.notebook.id)]
+        )
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary.date, self.old_date)
+        self.assertEqual(summary.run_count, 3)
+        self.assertEqual(summary.failed_count, 1)
+        self.assertAlmostEqual(summary.duration_avg, 3.0)
+        self.assertAlmostEqual(summary.duration_p50, 3.0)
+        self.assertAlmostEqual(summary.duration_max, 5.0)
+
+    def test_summary_purge(self):
+        self.notebook.run_summary_retention_days = 10
+        Daily = self.env["devops.notebook.run.daily"]
+        Daily._cron_compact_run_history()
+        self.assertFalse(Daily.search([("notebook_id", "=", self.notebook.id)]))
+
+    def test_no_retention_keeps_everything(self):
+        self.notebook.run_retention_days = 0
+        self.env["devops.notebook.run.daily"]._cron_compact_run_history()
+        self.assertEqual(
+            self.Run.search_count([("notebook_id", "=", self.notebook.id)]), 4
+        )
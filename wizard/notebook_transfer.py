@@ -1,51 +1,261 @@
 import base64
+import gzip
+import io
 import json
+import tempfile
 import time
+import zipfile
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
+from odoo.tools import split_every
 
 
-EXPORT_VERSION = "1.0"
+# 1.1 adds optional outputs, result blobs and the kernel snapshot.
+EXPORT_VERSION = "1.1"
+# Cells are created (and exported) in batches of this size.
+CELL_BATCH_SIZE = 500
+
+
+def _load_notebook_file(stream):
+    """Return ``(notebook_vals, cells)`` from a .hwnb file object.
+
+    With ijson installed the cells are parsed incrementally, so a large
+    notebook is never held in memory as one JSON document.
+    """
+    try:
+        import ijson
+    except ImportError:
+        payload = json.load(stream)
+        return payload.get("notebook") or {}, iter(payload.get("cells") or [])
+    notebook_vals = next(ijson.items(stream, "notebook", use_float=True), None) or {}
+    stream.seek(0)
+    return notebook_vals, ijson.items(stream, "cells.item", use_float=True)
+
+
+def _to_columnar(rows):
+    """Store a list of row dicts column by column; None if not tabular."""
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return None
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    return {"columns": columns, "data": [[row.get(col) for row in rows] for col in columns]}
+
+
+def _from_columnar(value):
+    return [dict(zip(value["columns"], row)) for row in zip(*value["data"])]
+
+
+class NotebookArchiveWriter:
+    """Write notebooks to a binary file object.
+
+    ``json`` and ``gzip`` hold a single notebook with results inline; ``zip``
+    holds any number of ``<name>.hwnb`` members whose results and kernel
+    snapshot are stored as separate ``<name>.data/`` entries. Cells are read
+    in batches and written as they go, so memory does not grow with the
+    notebook size.
+    """
+
+    def __init__(self, fileobj, export_format="json", include_outputs=False, include_kernel=False):
+        self.export_format = export_format
+        self.include_outputs = include_outputs
+        self.include_kernel = include_kernel
+        self._fileobj = fileobj
+        self._archive = None
+        self._names = set()
+        if export_format == "zip":
+            self._archive = zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED)
+
+    def add(self, notebook):
+        if self._archive is None:
+            if self.export_format == "gzip":
+                with gzip.GzipFile(fileobj=self._fileobj, mode="wb") as stream:
+                    self._write_notebook(notebook, stream)
+            else:
+                self._write_notebook(notebook, self._fileobj)
+            return
+        name = self._member_name(notebook)
+        blobs = []
+        with self._archive.open(f"{name}.hwnb", "w") as stream:
+            self._write_notebook(notebook, stream, blobs, f"{name}.data/")
+        # Blobs are read back one at a time once the JSON member is closed.
+        for path, read in blobs:
+            with self._archive.open(path, "w") as stream:
+                stream.write(read())
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+
+    def _member_name(self, notebook):
+        base = (notebook.name or "notebook").replace("/", "_")
+        name = base
+        if name in self._names:
+            name = f"{base}-{notebook.id}"
+        self._names.add(name)
+        return name
+
+    def _ref(self, blobs, path, read, inline):
+        """Queue ``read`` as a zip entry, or return the inline value."""
+        if blobs is None:
+            return inline()
+        blobs.append((path, read))
+        return {"path": path}
+
+    def _write_notebook(self, notebook, stream, blobs=None, blob_dir=""):
+        notebook_vals = {
+            "name": notebook.name,
+            "description": notebook.description,
+            "execution_mode": notebook.execution_mode,
+            "data_source": notebook.data_source_id.name or False,
+        }
+        if self.include_kernel and notebook.kernel_state:
+            notebook_vals["kernel_state"] = self._ref(
+                blobs,
+                f"{blob_dir}kernel.pkl",
+                lambda: base64.b64decode(notebook.kernel_state),
+                lambda: {"base64": notebook.kernel_state.decode()},
+            )
+        header = json.dumps(
+            {"version": EXPORT_VERSION, "exported_at": time.time(), "notebook": notebook_vals},
+            ensure_ascii=False,
+        )
+        # Open the header object and stream the cells list into it.
+        stream.write((header[:-1] + ', "cells": [').encode("utf-8"))
+        separator = b""
+        cells = notebook.cell_ids.sorted("sequence")
+        for cell_ids in split_every(CELL_BATCH_SIZE, cells.ids):
+            batch = cells.browse(cell_ids)
+            for cell in batch:
+                entry = self._cell_payload(cell, blobs, blob_dir)
+                stream.write(separator + json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+                separator = b", "
+            batch.invalidate_recordset()
+        stream.write(b"]}")
+
+    def _cell_payload(self, cell, blobs, blob_dir):
+        entry = {
+            "sequence": cell.sequence,
+            "cell_type": cell.cell_type,
+            "input_source": cell.input_source,
+        }
+        if cell.chart_type:
+            entry["chart"] = {
+                "type": cell.chart_type,
+                "x": cell.chart_x,
+                "y": cell.chart_y,
+                "max_points": cell.chart_max_points,
+            }
+        if not self.include_outputs:
+            return entry
+        entry.update(
+            {
+                "status": cell.status,
+                "output_text": cell.output_text,
+                "output_html": cell.output_html,
+                "elapsed_ms": cell.elapsed_ms,
+                "last_run": cell.last_run and fields.Datetime.to_string(cell.last_run),
+                "output_schema": cell.output_schema or False,
+                "output_chart": cell.output_chart or False,
+            }
+        )
+        if cell.output_data:
+            encoding = "columnar" if _to_columnar(cell.output_data) is not None else "json"
+
+            def encode(cell=cell, encoding=encoding):
+                data = cell.output_data
+                return _to_columnar(data) if encoding == "columnar" else data
+
+            entry["output_data"] = dict(
+                self._ref(
+                    blobs,
+                    f"{blob_dir}cell-{cell.id}.json",
+                    lambda: json.dumps(encode(), ensure_ascii=False).encode("utf-8"),
+                    lambda: {"value": encode()},
+                ),
+                encoding=encoding,
+            )
+        if cell.output_file:
+            entry["output_filename"] = cell.output_filename
+            entry["output_file"] = self._ref(
+                blobs,
+                f"{blob_dir}cell-{cell.id}.bin",
+                lambda cell=cell: base64.b64decode(cell.output_file),
+                lambda: {"base64": cell.output_file.decode()},
+            )
+        return entry
 
 
 class NotebookExportWizard(models.TransientModel):
     _name = "devops.notebook.export.wizard"
     _description = "Export Notebook"
 
-    data = fields.Binary(string="Export File", readonly=True)
+    notebook_id = fields.Many2one(
+        "devops.notebook",
+        required=True,
+        ondelete="cascade",
+        default=lambda self: self.env.context.get("active_id"),
+    )
+    export_format = fields.Selection(
+        [
+            ("json", "Notebook (.hwnb)"),
+            ("gzip", "Compressed (.hwnb.gz)"),
+            ("zip", "Archive (.zip)"),
+        ],
+        string="Format",
+        default="json",
+        required=True,
+    )
+    include_outputs = fields.Boolean(
+        string="Include Outputs",
+        help="Export cell outputs and result data so they can be viewed without re-running.",
+    )
+    include_kernel = fields.Boolean(
+        string="Include Kernel State",
+        help="Export the saved kernel variables of the notebook.",
+    )
+    attachment_id = fields.Many2one("ir.attachment", readonly=True)
     filename = fields.Char(readonly=True)
 
-    @api.model
-    def default_get(self, fields_list):
-        res = super().default_get(fields_list)
-        active_id = self.env.context.get("active_id")
-        if not active_id:
-            return res
-        notebook = self.env["devops.notebook"].browse(active_id).exists()
-        if not notebook:
-            return res
-        payload = {
-            "version": EXPORT_VERSION,
-            "exported_at": time.time(),
-            "notebook": {
-                "name": notebook.name,
-                "description": notebook.description,
-                "execution_mode": notebook.execution_mode,
-            },
-            "cells": [
-                {
-                    "sequence": cell.sequence,
-                    "cell_type": cell.cell_type,
-                    "input_source": cell.input_source,
-                }
-                for cell in notebook.cell_ids.sorted("sequence")
-            ],
+    _EXTENSIONS = {"json": ".hwnb", "gzip": ".hwnb.gz", "zip": ".zip"}
+
+    def action_export(self):
+        self.ensure_one()
+        filename = f"{self.notebook_id.name or 'notebook'}{self._EXTENSIONS[self.export_format]}"
+        with tempfile.TemporaryFile() as fileobj:
+            writer = NotebookArchiveWriter(
+                fileobj,
+                self.export_format,
+                include_outputs=self.include_outputs,
+                include_kernel=self.include_kernel,
+            )
+            writer.add(self.notebook_id)
+            writer.close()
+            fileobj.seek(0)
+            self._attach_export(filename, fileobj.read())
+        return self._download_action()
+
+    def _attach_export(self, filename, raw):
+        """Store the export on an attachment that lives as long as the wizard."""
+        self.attachment_id = self.env["ir.attachment"].create(
+            {
+                "name": filename,
+                "raw": raw,
+                "res_model": self._name,
+                "res_id": self.id,
+            }
+        )
+        self.filename = filename
+
+    def _download_action(self):
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/web/content/{self.attachment_id.id}?download=true",
+            "target": "self",
         }
-        dump = json.dumps(payload, ensure_ascii=False, indent=2)
-        res["data"] = base64.b64encode(dump.encode("utf-8"))
-        res["filename"] = f"{notebook.name or 'notebook'}.hwnb"
-        return res
+
+    def unlink(self):
+        self.attachment_id.sudo().unlink()
+        return super().unlink()
 
 
 class NotebookImportWizard(models.TransientModel):
@@ -56,25 +266,114 @@ class NotebookImportWizard(models.TransientModel):
     filename = fields.Char()
     project_id = fields.Many2one("project.project", string="Project")
     data_source_id = fields.Many2one("devops.data.source", string="Data Source")
+    mapping_ids = fields.One2many(
+        "devops.notebook.import.mapping", "wizard_id", string="Data Source Mapping"
+    )
+    restore_kernel = fields.Boolean(
+        string="Restore Kernel State",
+        help="Load the kernel variables saved in the file. Only enable this for "
+        "files from a trusted source: kernel state is unpickled when the notebook runs.",
+    )
+
+    @api.onchange("data_file")
+    def _onchange_data_file(self):
+        """List the data sources used by the uploaded notebooks for remapping."""
+        names = set()
+        if self.data_file:
+            try:
+                for stream, _read_blob in self._iter_notebook_files(base64.b64decode(self.data_file)):
+                    notebook_vals, _cells = _load_notebook_file(stream)
+                    if notebook_vals.get("data_source"):
+                        names.add(notebook_vals["data_source"])
+            except (ValueError, KeyError, OSError, zipfile.BadZipFile, UserError):
+                names = set()
+        DataSource = self.env["devops.data.source"]
+        self.mapping_ids = [(5, 0, 0)] + [
+            (
+                0,
+                0,
+                {
+                    "source_name": name,
+                    "data_source_id": DataSource.search([("name", "=", name)], limit=1).id,
+                },
+            )
+            for name in sorted(names)
+        ]
 
     def action_import(self):
         self.ensure_one()
         if not self.data_file:
             raise UserError(_("Please upload a .hwnb file."))
+        content = base64.b64decode(self.data_file)
+        notebooks = self.env["devops.notebook"]
         try:
-            content = base64.b64decode(self.data_file)
-            payload = json.loads(content.decode("utf-8"))
-        except Exception:
+            for stream, read_blob in self._iter_notebook_files(content):
+                notebooks |= self._import_notebook(stream, read_blob)
+        except (ValueError, KeyError, OSError, zipfile.BadZipFile):
             raise UserError(_("Invalid file format. Please upload a valid .hwnb file."))
 
-        notebook_vals = payload.get("notebook") or {}
+        action = self.env.ref("project_notebook.action_devops_notebook").read()[0]
+        if len(notebooks) > 1:
+            action["domain"] = [("id", "in", notebooks.ids)]
+            return action
+        action.update(
+            {
+                "res_id": notebooks.id,
+                "view_mode": "form",
+                "views": [(False, "form")],
+                "target": "current",
+                "res_model": "devops.notebook",
+            }
+        )
+        return action
+
+    def _iter_notebook_files(self, content):
+        """Yield ``(file object, read_blob)`` per notebook.
+
+        Accepts a plain or gzipped .hwnb, or a zip of .hwnb members whose
+        result blobs are read through ``read_blob(path)``.
+        """
+        if content[:2] == b"\x1f\x8b":
+            with gzip.GzipFile(fileobj=io.BytesIO(content)) as stream:
+                yield stream, None
+            return
+        if not zipfile.is_zipfile(io.BytesIO(content)):
+            yield io.BytesIO(content), None
+            return
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            names = sorted(name for name in archive.namelist() if name.endswith(".hwnb"))
+            if not names:
+                raise UserError(_("The archive does not contain any .hwnb file."))
+            for name in names:
+                with archive.open(name) as stream:
+                    yield stream, archive.read
+
+    def _resolve_data_source(self, source_name):
+        """Mapped data source first, then the wizard's, then the project's."""
+        mapping = self.mapping_ids.filtered(
+            lambda line: source_name and line.source_name == source_name
+        )[:1]
+        return (
+            mapping.data_source_id
+            or self.data_source_id
+            or self.project_id.notebook_data_source_id
+        )
+
+    def _read_ref(self, ref, read_blob):
+        """Return the bytes of an exported blob, inline or stored in the zip."""
+        if "base64" in ref:
+            return base64.b64decode(ref["base64"])
+        if read_blob is None:
+            raise ValueError("blob reference outside of an archive")
+        return read_blob(ref["path"])
+
+    def _import_notebook(self, stream, read_blob=None):
+        notebook_vals, cells = _load_notebook_file(stream)
         name = notebook_vals.get("name") or _("Imported Notebook")
         description = notebook_vals.get("description")
         execution_mode = notebook_vals.get("execution_mode", "immediate")
 
-        default_ds = self.data_source_id
-        if not default_ds and self.project_id and self.project_id.notebook_data_source_id:
-            default_ds = self.project_id.notebook_data_source_id
+        default_ds = self._resolve_data_source(notebook_vals.get("data_source"))
 
         notebook = self.env["devops.notebook"].create(
             {
@@ -86,27 +385,75 @@ class NotebookImportWizard(models.TransientModel):
             }
         )
 
-        for cell in payload.get("cells", []):
-            cell_type = cell.get("cell_type") or "richtext"
-            if cell_type == "markdown":
-                cell_type = "richtext"
-            self.env["devops.notebook.cell"].create(
+        if self.restore_kernel and notebook_vals.get("kernel_state"):
+            notebook.kernel_state = base64.b64encode(
+                self._read_ref(notebook_vals["kernel_state"], read_blob)
+            )
+
+        Cell = self.env["devops.notebook.cell"]
+        batch = []
+        for cell in cells:
+            batch.append(self._prepare_cell_vals(notebook, cell, read_blob))
+            if len(batch) >= CELL_BATCH_SIZE:
+                Cell.create(batch)
+                batch = []
+        if batch:
+            Cell.create(batch)
+        return notebook
+
+    def _prepare_cell_vals(self, notebook, cell, read_blob=None):
+        cell_type = cell.get("cell_type") or "richtext"
+        if cell_type == "markdown":
+            cell_type = "richtext"
+        vals = {
+            "notebook_id": notebook.id,
+            "cell_type": cell_type,
+            "input_source": cell.get("input_source") or "",
+        }
+        chart = cell.get("chart")
+        if chart:
+            vals.update(
+                {
+                    "chart_type": chart.get("type"),
+                    "chart_x": chart.get("x"),
+                    "chart_y": chart.get("y"),
+                    "chart_max_points": int(chart.get("max_points") or 2000),
+                }
+            )
+        # Cells without a sequence are appended in file order.
+        if cell.get("sequence"):
+            vals["sequence"] = int(cell["sequence"])
+        if cell.get("status"):
+            # Exported with outputs: restore them instead of re-running.
+            vals.update(
                 {
-                    "notebook_id": notebook.id,
-                    "sequence": cell.get("sequence") or 10,
-                    "cell_type": cell_type,
-                    "input_source": cell.get("input_source") or "",
+                    "status": cell["status"],
+                    "output_text": cell.get("output_text") or False,
+                    "output_html": cell.get("output_html") or False,
+                    "elapsed_ms": cell.get("elapsed_ms") or 0.0,
+                    "last_run": cell.get("last_run") or False,
+                    "output_schema": cell.get("output_schema") or False,
+                    "output_chart": cell.get("output_chart") or False,
                 }
             )
+        data = cell.get("output_data")
+        if data:
+            value = data["value"] if "value" in data else json.loads(self._read_ref(data, read_blob))
+            if data.get("encoding") == "columnar" and value:
+                value = _from_columnar(value)
+            vals["output_data"] = value
+        if cell.get("output_file"):
+            vals["output_file"] = base64.b64encode(self._read_ref(cell["output_file"], read_blob))
+            vals["output_filename"] = cell.get("output_filename")
+        return vals
 
-        action = self.env.ref("project_notebook.action_devops_notebook").read()[0]
-        action.update(
-            {
-                "res_id": notebook.id,
-                "view_mode": "form",
-                "views": [(False, "form")],
-                "target": "current",
-                "res_model": "devops.notebook",
-            }
-        )
-        return action
+
+class NotebookImportMapping(models.TransientModel):
+    _name = "devops.notebook.import.mapping"
+    _description = "Notebook Import Data Source Mapping"
+
+    wizard_id = fields.Many2one(
+        "devops.notebook.import.wizard", required=True, ondelete="cascade"
+    )
+    source_name = fields.Char(string="Exported Data Source", required=True)
+    data_source_id = fields.Many2one("devops.data.source", string="Import As")